@@ -1,8 +1,29 @@
 from translation import translate_dataframe
+from utils.llm_cache import get_cache
+from utils.ollama_client import get_client
+from utils.near_duplicates import mark_near_duplicates, propagate_results
+from utils.telemetry import timer
 import pandas as pd
 
+# Translate one article per near-duplicate cluster (syndicated copy) and copy its translation to the rest
+DEDUPE_NEAR_DUPLICATES = False
+
 df = pd.read_csv("~/webdav/ASCOR-FMG-5580-RESPOND-news-data (Projectfolder)/output/news_sample_10000.csv")
 print(len(df))
 df["text"] = df["combined_text"]
-df_translated = translate_dataframe(df)
-df_translated.to_csv("~/webdav/ASCOR-FMG-5580-RESPOND-news-data (Projectfolder)/output/news_sample_translated_10000.csv")
+
+if DEDUPE_NEAR_DUPLICATES:
+    df = mark_near_duplicates(df, text_column="combined_text", key_column="uri", by="country")
+    translated = translate_dataframe(df[df["is_representative"]])
+    added = [col for col in translated.columns if col not in df.columns]  # translated_text, detected_lang
+    df_translated = propagate_results(df.join(translated[added]), added)
+else:
+    df_translated = translate_dataframe(df)
+
+OUTPUT_FILE = "~/webdav/ASCOR-FMG-5580-RESPOND-news-data (Projectfolder)/output/news_sample_translated_10000.csv"
+with timer("io", stage="translation", op="write_csv", path=OUTPUT_FILE, rows=len(df_translated)):
+    df_translated.to_csv(OUTPUT_FILE)
+
+if get_cache():
+    get_cache().report()
+get_client().report()
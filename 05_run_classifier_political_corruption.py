@@ -1,66 +1,121 @@
-from utils.classifier import classify_article
+from utils.classifier import classify_article, cascade_classify_article
+from utils.checkpoint import CheckpointJournal
+from utils.llm_cache import get_cache
+from utils.ollama_client import get_client
+from utils.structured_output import report_parse_failures
+from utils.telemetry import record_articles, stage, timer
+from corpus_store import read_table
+import os
+import time
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
-import requests
-from translation import translate_dataframe  # assuming you use this elsewhere
 
 # Define input and output file paths
 INPUT_FILE = "~/webdav/ASCOR-FMG-5580-RESPOND-news-data (Projectfolder)/output/news_sample_translated_10000.csv"
 OUTPUT_FILE = "~/webdav/ASCOR-FMG-5580-RESPOND-news-data (Projectfolder)/output/news_sample_translated_10000_with_llm_annotations.csv"
+JOURNAL_FILE = OUTPUT_FILE.replace(".csv", "_journal.jsonl")
 
-# Load the full dataset
-df = pd.read_csv(INPUT_FILE)
+MAX_WORKERS = 4       # parallel requests against the Ollama endpoint
+REPORT_EVERY = 100    # print a throughput/ETA line every N classified articles
 
-# Take a random sample of 100 articles
-#df_sample = df.sample(n=20, random_state=42).reset_index(drop=True)
+CLASSIFIER_MODE = "single"        # "single": every article to LLM_MODEL_NAME; "cascade": cheap first stage, escalate if unsure
+CASCADE_FIRST_STAGE = "small_model"  # or "dictionary"
+CASCADE_THRESHOLD = 80            # see benchmarks/evaluate_classifier_cascade.py for choosing it
 
-# Results containers
-results = {
-    "llm_evidence": [],
-    "llm_rationale": [],
-    "llm_confidence": [],
-    "llm_label": []
-}
+LLM_COLUMNS = ["llm_evidence", "llm_rationale", "llm_confidence", "llm_label", "llm_stage"]
 
-print(f"Processing {len(df)} randomly sampled articles...")
+# Define the columns to keep from the original dataset
+columns_to_keep = [
+    "combined_text", "translated_text", "uri",
+    "country", "dateTime", "source.uri",
+    "llm_evidence", "llm_rationale", "llm_confidence", "llm_label", "llm_stage"
+]
 
-# Apply classifier to each sampled row with tqdm progress bar
-for idx, row in tqdm(df.iterrows(), total=len(df), desc="Classifying articles"):
-    article_text = row.get("translated_text", "")
+def article_key(idx, row) -> str:
+    uri = row.get("uri")
+    return str(uri) if pd.notna(uri) else f"row-{idx}"
 
+def classify_text(article_text) -> dict:
     if not isinstance(article_text, str) or len(article_text.strip()) == 0:
-        results["llm_evidence"].append("")
-        results["llm_rationale"].append("No content")
-        results["llm_confidence"].append(None)
-        results["llm_label"].append("No")
-        continue
+        return {"llm_evidence": "", "llm_rationale": "No content", "llm_confidence": None, "llm_label": "No",
+                "llm_stage": "empty"}
 
-    output = classify_article(article_text)
+    if CLASSIFIER_MODE == "cascade":
+        output = cascade_classify_article(article_text, first_stage=CASCADE_FIRST_STAGE, threshold=CASCADE_THRESHOLD)
+    else:
+        output = classify_article(article_text)
 
     # Join highlights with semicolons to store in one column
-    evidence = "; ".join(output.get("highlights", []))
+    return {
+        "llm_evidence": "; ".join(output.get("highlights", [])),
+        "llm_rationale": output.get("rationale", ""),
+        "llm_confidence": output.get("confidence", ""),
+        "llm_label": output.get("tentative_label", ""),
+        "llm_stage": output.get("stage", "single")
+    }
 
-    results["llm_evidence"].append(evidence)
-    results["llm_rationale"].append(output.get("rationale", ""))
-    results["llm_confidence"].append(output.get("confidence", ""))
-    results["llm_label"].append(output.get("tentative_label", ""))
+def report_progress(done: int, total: int, started: float):
+    elapsed = time.time() - started
+    rate = done / elapsed if elapsed > 0 else 0.0
+    remaining = (total - done) / rate if rate > 0 else float("inf")
+    print(f"📈 {done}/{total} classified | {rate * 3600:.0f} articles/hour | "
+          f"ETA {remaining / 60:.1f} min")
 
-# Merge results into sampled DataFrame
-df["llm_evidence"] = results["llm_evidence"]
-df["llm_rationale"] = results["llm_rationale"]
-df["llm_confidence"] = results["llm_confidence"]
-df["llm_label"] = results["llm_label"]
+@stage("classifier")
+def run_classifier(df: pd.DataFrame, journal_path: str, max_workers: int = MAX_WORKERS) -> pd.DataFrame:
+    """
+    Classify every article whose key (its `uri`) is not in the journal yet, using a pool of
+    `max_workers` threads. Each result is appended to the journal as soon as it completes.
+    """
+    journal = CheckpointJournal(journal_path)
+    results = journal.load()
+    if results:
+        print(f"🔁 Resuming: {len(results)} articles already classified.")
 
-# Define the columns to keep from the original dataset
-columns_to_keep = [
-    "combined_text", "translated_text", "uri",
-    "country", "dateTime", "source.uri",
-    "llm_evidence", "llm_rationale", "llm_confidence", "llm_label"
-]
+    keys = [article_key(idx, row) for idx, row in df.iterrows()]
+    texts = df["translated_text"] if "translated_text" in df.columns else pd.Series("", index=df.index)
+    pending = {}
+    for key, text in zip(keys, texts):
+        if key not in results and key not in pending:
+            pending[key] = text
+
+    print(f"Processing {len(pending)} of {len(df)} articles with {max_workers} workers...")
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(classify_text, text): key for key, text in pending.items()}
+        for done, future in enumerate(tqdm(as_completed(futures), total=len(futures), desc="Classifying articles"), 1):
+            key = futures[future]
+            results[key] = future.result()
+            journal.append(key, results[key])
+            record_articles(1)
+            if done % REPORT_EVERY == 0:
+                report_progress(done, len(futures), started)
+
+    if pending:
+        report_progress(len(pending), len(pending), started)
+
+    # Merge results into the DataFrame
+    for col in LLM_COLUMNS:
+        df[col] = [results.get(key, {}).get(col) for key in keys]
+    return df
+
+if __name__ == "__main__":
+    # Load the full dataset
+    df = read_table(INPUT_FILE)
+
+    df = run_classifier(df, os.path.expanduser(JOURNAL_FILE))
+
+    # Filter the DataFrame to keep only the specified columns
+    df_filtered = df[columns_to_keep]
 
-# Filter the DataFrame to keep only the specified columns
-df_filtered = df[columns_to_keep]
+    # Save the annotated sample to CSV
+    with timer("io", stage="classifier", op="write_csv", path=OUTPUT_FILE, rows=len(df_filtered)):
+        df_filtered.to_csv(OUTPUT_FILE, index=False)
+    print(f"✅ Saved annotated sample file to: {OUTPUT_FILE}")
+    CheckpointJournal(os.path.expanduser(JOURNAL_FILE)).remove()
 
-# Save the annotated sample to CSV
-df_filtered.to_csv(OUTPUT_FILE, index=False)
-print(f"✅ Saved annotated sample file to: {OUTPUT_FILE}")
+    if get_cache():
+        get_cache().report()
+    get_client().report()
+    report_parse_failures()
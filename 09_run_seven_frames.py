@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 import time
 import json
@@ -6,12 +5,25 @@ import os
 import re
 from tqdm import tqdm
 
+from corpus_store import read_table
+from utils.checkpoint import CheckpointJournal
+from utils.llm_cache import get_cache
+from utils.ollama_client import get_client
+from utils.frame_prefilter import FramePrefilter, prefiltered_result
+from utils.prompt_registry import PromptRegistry, build_messages, content_hash, get_registry
+from utils.telemetry import record_articles, stage, timer
+from utils.structured_output import (FRAME_SCHEMA, MULTI_FRAME_SCHEMA, JsonValueScanner,
+                                     parse_structured, report_parse_failures)
+
 # ========== CONFIG ==========
-LLM_ENDPOINT = "http://localhost:11434/api/chat"
-LLM_MODEL_NAME = "llama3:70b"
+from config import LLM_MODEL_NAME, STRUCTURED_OUTPUT
 SLEEP_BETWEEN_REQUESTS = 1
 PROMPT_DIR = "prompts"
 TEMPERATURE = 0.0
+STREAM_RESPONSES = True  # stream replies and stop at the end of the first JSON value
+ANNOTATION_MODE = "per_frame"  # "per_frame": one call per frame; "multi_frame": one call for all frames
+USE_FRAME_PREFILTER = False  # skip LLM calls for frames without cue terms; check benchmarks/prefilter_recall_report.py first
+PREFILTER_THRESHOLDS = {}    # frame index -> minimum cue score (default 1), e.g. tuned values from the recall report
 
 # ========== FRAME ORDER ==========
 FRAME_ORDER = [
@@ -24,17 +36,59 @@ FRAME_ORDER = [
     "Mobilizing anti-corruption"
 ]
 
-# ========== LOAD PROMPTS PER FRAME ==========
-def load_frame_prompt(index: int, frame_name: str) -> str:
-    filename = f"frame_{index}_{frame_name.lower().replace(' ', '_').replace('-', '')}.txt"
-    path = os.path.join(PROMPT_DIR, filename)
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read()
+# ========== PROMPT REGISTRY ==========
+MULTI_FRAME_INSTRUCTIONS = (
+    f"You will assess the same article for {len(FRAME_ORDER)} corruption frames. "
+    "The coding instructions for each frame follow below; apply each one independently.\n\n"
+    "Return ONE JSON array with exactly one object per frame, in the order listed. Each object must contain:\n"
+    '- "frame_index": the frame number (1-7)\n'
+    '- "frame": the frame name if the frame is present, otherwise "None"\n'
+    '- "rationale": a short explanation\n'
+    '- "evidence": the supporting passage, or "" if the frame is absent\n'
+    '- "confidence": an integer between 0 and 100\n'
+    "Output ONLY the JSON array."
+)
+
+# Appended after the frame instructions when Ollama constrains the reply to a JSON schema
+FRAME_JSON_NOTE = (
+    "\n\n---\n\nReturn a single JSON object with the fields \"frame\", \"rationale\", "
+    "\"confidence\" and \"evidence\" (not an array)."
+)
+MULTI_FRAME_JSON_NOTE = '\n\n---\n\nWrap the array in a JSON object: {"frames": [...]}.'
+
+def frame_registry() -> PromptRegistry:
+    """Frame prompts, read and validated once per process."""
+    return get_registry(FRAME_ORDER, PROMPT_DIR)
+
+_prefilter = None
+
+def frame_prefilter() -> FramePrefilter:
+    global _prefilter
+    if _prefilter is None:
+        _prefilter = FramePrefilter(frame_registry(), PREFILTER_THRESHOLDS)
+    return _prefilter
 
 # ========== PROMPT CONSTRUCTION ==========
-def build_prompt(article_text: str, frame_index: int, frame_name: str) -> str:
-    frame_prompt = load_frame_prompt(frame_index, frame_name)
-    return f"{frame_prompt}\n\n---\n\nArticle:\n{article_text}"
+def build_frame_system_prompt(frame_index: int) -> str:
+    prompt = frame_registry().frame(frame_index).text
+    return prompt + FRAME_JSON_NOTE if STRUCTURED_OUTPUT else prompt
+
+def build_multi_frame_system_prompt() -> str:
+    registry = frame_registry()
+    sections = [f"## FRAME {p.index}: {p.name}\n\n{p.text}" for p in registry.prompts.values()]
+    prompt = MULTI_FRAME_INSTRUCTIONS + "\n\n" + "\n\n---\n\n".join(sections)
+    return prompt + MULTI_FRAME_JSON_NOTE if STRUCTURED_OUTPUT else prompt
+
+def prompt_version(mode: str = ANNOTATION_MODE) -> str:
+    """Version recorded with every annotated row: the registry hash, or the hash of the combined prompt."""
+    if mode == "multi_frame":
+        version = f"multi-{content_hash(build_multi_frame_system_prompt())}"
+    else:
+        version = frame_registry().version
+    if STRUCTURED_OUTPUT:
+        schema = MULTI_FRAME_SCHEMA if mode == "multi_frame" else FRAME_SCHEMA
+        version += f"+json-{content_hash(json.dumps(schema, sort_keys=True), 8)}"
+    return version
 
 # ========== CLEANING AND PARSING ==========
 def sanitize_double_quotes(json_str):
@@ -67,27 +121,48 @@ def clean_llm_response(content):
         return None
 
 # ========== LLM QUERY ==========
+def request_llm_content(system_prompt: str, article_text: str, schema: dict = None) -> str:
+    """Chat completion for one article; with `schema`, Ollama constrains the reply to that JSON schema."""
+    cache = get_cache()
+    cache_prompt = system_prompt if schema is None else f"{system_prompt}\n\nformat={json.dumps(schema, sort_keys=True)}"
+    cache_key = cache.make_key(LLM_MODEL_NAME, cache_prompt, article_text, TEMPERATURE) if cache else None
+    content = cache.get(cache_key) if cache else None
+    if content is None:
+        stop_when = JsonValueScanner if STREAM_RESPONSES else None
+        extra = {"format": schema} if schema is not None else {}
+        content = get_client().chat_content(
+            LLM_MODEL_NAME,
+            build_messages(system_prompt, article_text),
+            timeout=120,
+            options={"temperature": TEMPERATURE},
+            stop_when=stop_when,
+            **extra
+        )
+        if cache and content:
+            cache.put(cache_key, content, model=LLM_MODEL_NAME)
+
+    if not content:
+        raise ValueError("Empty response from LLM")
+    return content
+
+def error_result(frame_name: str, error: Exception) -> dict:
+    return {
+        "frame": frame_name,
+        "rationale": f"⚠️ Error: {str(error)}",
+        "confidence": None,
+        "evidence": ""
+    }
+
 def query_frame_llm(article_text: str, frame_index: int, frame_name: str) -> dict:
-    prompt = build_prompt(article_text, frame_index, frame_name)
     try:
-        response = requests.post(
-            LLM_ENDPOINT,
-            json={
-                "model": LLM_MODEL_NAME,
-                "messages": [{"role": "user", "content": prompt}],
-                "stream": False,
-                "temperature": TEMPERATURE
-            },
-            timeout=120
-        )
-        response.raise_for_status()
-        result = response.json()
-        content = result.get("message", {}).get("content", "").strip()
+        if STRUCTURED_OUTPUT:
+            content = request_llm_content(build_frame_system_prompt(frame_index), article_text, FRAME_SCHEMA)
+            return parse_structured(content, FRAME_SCHEMA, "frame")
 
-        if not content:
-            raise ValueError("Empty response from LLM")
+        content = request_llm_content(build_frame_system_prompt(frame_index), article_text)
 
-        parsed = clean_llm_response(content)
+        with timer("parse", parser="frame_text"):
+            parsed = clean_llm_response(content)
         if not parsed or not isinstance(parsed, list):
             raise ValueError("No valid JSON array found or parsed content is not a list")
 
@@ -95,21 +170,82 @@ def query_frame_llm(article_text: str, frame_index: int, frame_name: str) -> dic
 
     except Exception as e:
         print(f"❌ Error querying frame '{frame_name}': {e}")
-        return {
-            "frame": frame_name,
-            "rationale": f"⚠️ Error: {str(e)}",
-            "confidence": None,
-            "evidence": ""
-        }
+        return error_result(frame_name, e)
+
+def query_all_frames_llm(article_text: str) -> list:
+    """Ask for all frames in one request; returns one result dict per entry in FRAME_ORDER."""
+    try:
+        if STRUCTURED_OUTPUT:
+            content = request_llm_content(build_multi_frame_system_prompt(), article_text, MULTI_FRAME_SCHEMA)
+            parsed = parse_structured(content, MULTI_FRAME_SCHEMA, "multi_frame")["frames"]
+        else:
+            content = request_llm_content(build_multi_frame_system_prompt(), article_text)
+            with timer("parse", parser="multi_frame_text"):
+                parsed = clean_llm_response(content)
+            if not parsed or not isinstance(parsed, list):
+                raise ValueError("No valid JSON array found or parsed content is not a list")
+
+        results = [None] * len(FRAME_ORDER)
+        for position, item in enumerate(parsed):
+            if not isinstance(item, dict):
+                continue
+            try:
+                slot = int(item.get("frame_index", position + 1)) - 1
+            except (TypeError, ValueError):
+                slot = position
+            if 0 <= slot < len(FRAME_ORDER) and results[slot] is None:
+                results[slot] = item
+
+        missing = [FRAME_ORDER[i] for i, r in enumerate(results) if r is None]
+        if missing:
+            print(f"⚠️ Multi-frame response is missing {len(missing)} frame(s): {missing}")
+        return [r if r is not None else error_result(FRAME_ORDER[i], ValueError("Frame missing from multi-frame response"))
+                for i, r in enumerate(results)]
+
+    except Exception as e:
+        print(f"❌ Error querying all frames: {e}")
+        return [error_result(frame_name, e) for frame_name in FRAME_ORDER]
 
 # ========== ANNOTATION LOOP ==========
-def annotate_dataframe(df: pd.DataFrame, temp_output_path: str) -> pd.DataFrame:
-    for i in range(1, len(FRAME_ORDER) + 1):
-        for field in ["name", "rationale", "confidence", "evidence"]:
-            col = f"frame_{i}_{field}"
-            if col not in df.columns:
-                df[col] = ""
+def store_frame_result(df: pd.DataFrame, idx, i: int, result: dict):
+    if result.get("frame") and result.get("rationale"):
+        confidence = result.get("confidence", "")
+        rationale = result.get("rationale", "")
+        if confidence != "" and isinstance(confidence, (int, float)) and confidence < 80:
+            rationale += f"\n\n⚠️ Model confidence is only {confidence}%. Please verify carefully."
+
+        df.at[idx, f"frame_{i}_name"] = result.get("frame", "")
+        df.at[idx, f"frame_{i}_rationale"] = rationale
+        df.at[idx, f"frame_{i}_confidence"] = confidence
+        df.at[idx, f"frame_{i}_evidence"] = result.get("evidence", "")
+
+@stage("frames")
+def annotate_dataframe(df: pd.DataFrame, journal_path: str, mode: str = ANNOTATION_MODE) -> pd.DataFrame:
+    """
+    Annotate every article not yet annotated. Each finished article is appended to
+    the JSONL journal at `journal_path`; journaled articles are restored first on resume.
+    """
+    if mode not in ("per_frame", "multi_frame"):
+        raise ValueError(f"❌ Unknown annotation mode: {mode}")
 
+    frame_columns = [f"frame_{i}_{field}"
+                     for i in range(1, len(FRAME_ORDER) + 1)
+                     for field in ["name", "rationale", "confidence", "evidence"]]
+    frame_columns.append("prompt_version")
+    for col in frame_columns:
+        if col not in df.columns:
+            df[col] = pd.Series("", index=df.index, dtype=object)
+
+    version = prompt_version(mode)
+    print(f"🗂️ Prompt version: {version} ({mode})")
+
+    journal = CheckpointJournal(journal_path)
+    if journal.exists():
+        records = journal.load()
+        print(f"🔁 Resuming: restoring {len(records)} article(s) from journal.")
+        df = journal.apply(df, records)
+
+    skipped_calls = 0
     for idx, row in tqdm(df.iterrows(), total=len(df), desc="Articles"):
         if pd.notna(row.get("frame_1_name")) and row.get("frame_1_name") != "":
             print(f"⏭️ Article {idx} already annotated. Skipping.")
@@ -118,70 +254,76 @@ def annotate_dataframe(df: pd.DataFrame, temp_output_path: str) -> pd.DataFrame:
         print(f"\n🔍 Annotating article {idx}...")
         article_text = row.get("translated_text", "")
 
-        for i, frame_name in enumerate(FRAME_ORDER, 1):
-            result = query_frame_llm(article_text, i, frame_name)
+        to_query = set(frame_prefilter().frames_to_query(article_text)) if USE_FRAME_PREFILTER \
+            else set(range(1, len(FRAME_ORDER) + 1))
 
-            if result.get("frame") and result.get("rationale"):
-                confidence = result.get("confidence", "")
-                rationale = result.get("rationale", "")
-                if confidence != "" and isinstance(confidence, (int, float)) and confidence < 80:
-                    rationale += f"\n\n⚠️ Model confidence is only {confidence}%. Please verify carefully."
+        if mode == "multi_frame":
+            # One call covers every frame, so it is only skipped when no frame passes the filter
+            results = query_all_frames_llm(article_text) if to_query \
+                else [prefiltered_result() for _ in FRAME_ORDER]
+            skipped_calls += 0 if to_query else 1
+            for i, result in enumerate(results, 1):
+                store_frame_result(df, idx, i, result)
+        else:
+            for i, frame_name in enumerate(FRAME_ORDER, 1):
+                result = query_frame_llm(article_text, i, frame_name) if i in to_query else prefiltered_result()
+                store_frame_result(df, idx, i, result)
+            skipped_calls += len(FRAME_ORDER) - len(to_query)
+        df.at[idx, "prompt_version"] = version
 
-                df.at[idx, f"frame_{i}_name"] = result.get("frame", "")
-                df.at[idx, f"frame_{i}_rationale"] = rationale
-                df.at[idx, f"frame_{i}_confidence"] = confidence
-                df.at[idx, f"frame_{i}_evidence"] = result.get("evidence", "")
-
-        # Try to save progress
+        # Append this article to the journal
+        columns = {col: df.at[idx, col] for col in frame_columns}
         try:
-            os.makedirs(os.path.dirname(temp_output_path), exist_ok=True)
-            df.to_csv(temp_output_path, index=False)
+            journal.append(idx, columns, uri=row.get("uri"))
         except Exception as e:
-            print(f"⚠️ Failed to save temp file: {e}")
-            fallback = f"fallback_{os.path.basename(temp_output_path)}"
-            df.to_csv(fallback, index=False)
-            print(f"💾 Temp fallback saved locally as {fallback}")
+            print(f"⚠️ Failed to append to journal: {e}")
+            fallback = CheckpointJournal(f"fallback_{os.path.basename(journal.path)}")
+            fallback.append(idx, columns, uri=row.get("uri"))
+            print(f"💾 Journal fallback saved locally as {fallback.path}")
 
+        record_articles(1)
         print(f"✅ Saved progress after article {idx}.")
         time.sleep(SLEEP_BETWEEN_REQUESTS)
 
+    if USE_FRAME_PREFILTER:
+        print(f"🧹 Pre-filter skipped {skipped_calls} LLM call(s)")
     return df
 
 # ========== MAIN PROCESSING ==========
-def process_files(file_paths):
+def process_files(file_paths, mode: str = ANNOTATION_MODE):
     for file_path in tqdm(file_paths, desc="Files"):
-        if not file_path.endswith(".csv"):
+        if not file_path.endswith((".csv", ".parquet")):
             continue
 
         print(f"\n📄 Processing file: {file_path}")
-        df = pd.read_csv(file_path)
-        annotated_path = file_path.replace(".csv", "_llm_annotated.csv")
-        temp_output_path = file_path.replace(".csv", "_llm_temp.csv")
+        stem = os.path.splitext(file_path)[0]
+        annotated_path = f"{stem}_llm_annotated.csv"
+        journal_path = f"{stem}_llm_journal.jsonl"
 
         if os.path.exists(annotated_path):
             print("✅ Annotated file already exists. Skipping.")
             continue
-        elif os.path.exists(temp_output_path):
-            print("🔁 Resuming from temporary file.")
-            df = pd.read_csv(temp_output_path)
 
-        df = annotate_dataframe(df, temp_output_path)
+        df = read_table(file_path)
+        df = annotate_dataframe(df, journal_path, mode=mode)
 
+        # Build the final CSV once, from the input plus the journal
         try:
             os.makedirs(os.path.dirname(annotated_path), exist_ok=True)
-            df.to_csv(annotated_path, index=False)
+            with timer("io", stage="frames", op="write_csv", path=annotated_path, rows=len(df)):
+                df.to_csv(annotated_path, index=False)
         except Exception as e:
             print(f"⚠️ Failed to save final file: {e}")
             fallback = f"fallback_{os.path.basename(annotated_path)}"
             df.to_csv(fallback, index=False)
             print(f"💾 Final fallback saved locally as {fallback}")
+            continue
 
         print("\n" + "="*60)
         print(f"✅ DONE: {file_path} → saved to {annotated_path}")
         print("="*60 + "\n")
 
-        if os.path.exists(temp_output_path):
-            os.remove(temp_output_path)
+        CheckpointJournal(journal_path).remove()
 
 # ========== FILE LIST ==========
 csv_files = [
@@ -192,4 +334,9 @@ csv_files = [
 ]
 
 if __name__ == "__main__":
+    frame_registry().report()
     process_files(csv_files)
+    if get_cache():
+        get_cache().report()
+    get_client().report()
+    report_parse_failures()
@@ -1,14 +1,14 @@
 ## FIRST TRY AT CLASSIFYING FRAMES (NOT SUCCESFUL)
 
 
-import requests
 import pandas as pd
 import time
 import json
 import os
 
+from utils.ollama_client import get_client
+
 # ========== CONFIG ==========
-LLM_ENDPOINT = "http://localhost:11434/api/chat"
 LLM_MODEL_NAME = "llama3:70b"
 TEMP_OUTPUT_PATH = "annotated_temp_output.csv"
 FINAL_OUTPUT_PATH = "news_sample_annotated.csv"
@@ -81,18 +81,11 @@ def build_prompt(article_text: str) -> str:
 
 def query_llm(article_text: str) -> list:
     try:
-        response = requests.post(
-            LLM_ENDPOINT,
-            json={
-                "model": LLM_MODEL_NAME,
-                "messages": [{"role": "user", "content": build_prompt(article_text)}],
-                "stream": False
-            },
+        content = get_client().chat_content(
+            LLM_MODEL_NAME,
+            [{"role": "user", "content": build_prompt(article_text)}],
             timeout=120
         )
-        response.raise_for_status()
-        result = response.json()
-        content = result.get("message", {}).get("content", "").strip()
         json_start = content.find("[")
         json_end = content.rfind("]") + 1
         json_str = content[json_start:json_end]
@@ -0,0 +1,94 @@
+"""
+Compare the per-frame and multi-frame annotation modes of `09_run_seven_frames.py`
+on a fixed random sample: wall-clock time per mode and per-frame agreement on
+whether each frame is present.
+
+Usage:
+    python benchmarks/benchmark_frame_modes.py INPUT_CSV [--n 20] [--seed 42] [--output results.csv]
+"""
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)  # prompts/ is resolved relative to the repository root
+
+frames = importlib.import_module("09_run_seven_frames")
+
+
+def frame_present(name) -> bool:
+    return isinstance(name, str) and name.strip() not in ("", "None")
+
+
+def cohen_kappa(a: pd.Series, b: pd.Series) -> float:
+    observed = (a == b).mean()
+    p_a, p_b = a.mean(), b.mean()
+    expected = p_a * p_b + (1 - p_a) * (1 - p_b)
+    if expected == 1:
+        return 1.0
+    return (observed - expected) / (1 - expected)
+
+
+def run_mode(sample: pd.DataFrame, mode: str):
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        annotated = frames.annotate_dataframe(sample.copy(), os.path.join(tmp, f"{mode}_journal.jsonl"), mode=mode)
+        elapsed = time.perf_counter() - start
+    return annotated, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input_csv", help="CSV with a 'translated_text' column")
+    parser.add_argument("--n", type=int, default=20, help="number of articles to sample")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--use-cache", action="store_true", help="allow cached LLM responses (skews timings)")
+    parser.add_argument("--output", help="optional CSV path for the per-frame agreement table")
+    args = parser.parse_args()
+
+    df = pd.read_csv(os.path.expanduser(args.input_csv))
+    df = df[df["translated_text"].notna()]
+    sample = df.sample(n=min(args.n, len(df)), random_state=args.seed).reset_index(drop=True)
+    sample = sample[[c for c in sample.columns if not c.startswith("frame_")]]
+
+    frames.SLEEP_BETWEEN_REQUESTS = 0
+    if not args.use_cache:
+        frames.get_cache = lambda: None
+
+    print(f"🧪 Benchmarking {len(sample)} articles (seed={args.seed})")
+    per_frame, t_per_frame = run_mode(sample, "per_frame")
+    multi_frame, t_multi_frame = run_mode(sample, "multi_frame")
+
+    rows = []
+    for i, frame_name in enumerate(frames.FRAME_ORDER, 1):
+        a = per_frame[f"frame_{i}_name"].map(frame_present)
+        b = multi_frame[f"frame_{i}_name"].map(frame_present)
+        rows.append({
+            "frame": frame_name,
+            "present_per_frame": int(a.sum()),
+            "present_multi_frame": int(b.sum()),
+            "% agreement": round((a == b).mean() * 100, 2),
+            "cohen_kappa": round(cohen_kappa(a.astype(int), b.astype(int)), 3)
+        })
+    agreement = pd.DataFrame(rows)
+
+    print("\n" + "=" * 60)
+    print(f"⏱️ per_frame:   {t_per_frame:8.1f} s ({t_per_frame / len(sample):.1f} s/article)")
+    print(f"⏱️ multi_frame: {t_multi_frame:8.1f} s ({t_multi_frame / len(sample):.1f} s/article)")
+    print(f"🚀 Speed-up: {t_per_frame / max(t_multi_frame, 1e-9):.2f}x")
+    print("=" * 60)
+    print(agreement.to_string(index=False))
+
+    if args.output:
+        agreement.to_csv(args.output, index=False)
+        print(f"\n✅ Saved agreement table to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Evaluate the cascade classifier in `utils/classifier.py` against the human-coded validation
+set (`ANNOTATION_FILE` in config.py): accuracy and total GPU-seconds per escalation threshold.
+
+Every article is classified once by the first stage and once by the large model; each
+threshold is then simulated from those two results, so a sweep costs two passes instead of
+one per threshold. GPU-seconds are Ollama's reported `total_duration` per call (the request
+latency when a streamed reply was cut off early and the server never reported it).
+
+Usage:
+    python benchmarks/evaluate_classifier_cascade.py [--first-stage small_model|dictionary]
+        [--thresholds 50,60,70,80,90] [--n 200] [--seed 42] [--output results.csv]
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+from tqdm import tqdm
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)
+
+from config import LLM_MODEL_NAME, SMALL_LLM_MODEL_NAME
+from dataloader import load_human_annotated_for_translation
+from utils import classifier
+from utils.ollama_client import get_client
+
+POSITIVE_LABEL = "political corruption"
+
+
+def timed(fn, *args, **kwargs):
+    """Run one classification and return (result, GPU-seconds of the Ollama calls it made)."""
+    client = get_client()
+    before = len(client.metrics)
+    result = fn(*args, **kwargs)
+    calls = client.metrics[before:]
+    return result, sum(m.server_time_s if m.server_time_s is not None else m.latency_s for m in calls)
+
+
+def evaluate(df: pd.DataFrame, gold: pd.Series, first: list, first_gpu: list, large: list, large_gpu: list,
+             thresholds: list) -> pd.DataFrame:
+    def score(labels, gpu_seconds, escalated, name):
+        predicted = pd.Series([label == "Yes" for label in labels], index=df.index)
+        return {
+            "setting": name,
+            "accuracy": round((predicted == gold).mean(), 4),
+            "escalated_%": round(100 * sum(escalated) / len(df), 1),
+            "gpu_seconds": round(gpu_seconds, 1),
+        }
+
+    rows = [score([r["tentative_label"] for r in large], sum(large_gpu), [True] * len(df), f"{LLM_MODEL_NAME} only")]
+    rows.append(score([r["tentative_label"] for r in first], sum(first_gpu), [False] * len(df), "first stage only"))
+    for t in thresholds:
+        escalated = [classifier.needs_escalation(r, t) for r in first]
+        labels = [l["tentative_label"] if e else f["tentative_label"] for f, l, e in zip(first, large, escalated)]
+        gpu_seconds = sum(first_gpu) + sum(g for g, e in zip(large_gpu, escalated) if e)
+        rows.append(score(labels, gpu_seconds, escalated, f"cascade @ {t:g}"))
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--first-stage", choices=classifier.CASCADE_FIRST_STAGES, default="small_model")
+    parser.add_argument("--small-model", default=SMALL_LLM_MODEL_NAME)
+    parser.add_argument("--thresholds", default="50,60,70,80,90", help="comma-separated confidence thresholds")
+    parser.add_argument("--n", type=int, help="evaluate a random sample of N articles")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-translate", action="store_true",
+                        help="classify `combined_text` as-is when the file has no `translated_text` column")
+    parser.add_argument("--use-cache", action="store_true", help="allow cached LLM responses (no GPU time is recorded for hits)")
+    parser.add_argument("--output", help="optional CSV path for the results table")
+    args = parser.parse_args()
+    thresholds = [float(t) for t in args.thresholds.split(",") if t.strip()]
+
+    df = load_human_annotated_for_translation()
+    if args.n:
+        df = df.sample(n=min(args.n, len(df)), random_state=args.seed)
+    df = df.reset_index(drop=True)
+
+    if "translated_text" not in df.columns:
+        if args.no_translate:
+            df["translated_text"] = df["combined_text"]
+        else:
+            from translation import translate_dataframe
+            df = translate_dataframe(df, max_in_flight=8)
+    gold = df["corruption_label_m"] == POSITIVE_LABEL
+
+    if not args.use_cache:
+        classifier.get_cache = lambda: None
+
+    print(f"🧪 Evaluating cascade on {len(df)} validation articles "
+          f"(first stage: {args.first_stage}, {int(gold.sum())} political corruption)")
+    first, first_gpu, large, large_gpu = [], [], [], []
+    for text in tqdm(df["translated_text"].fillna(""), desc="Classifying"):
+        result, gpu = timed(classifier.first_stage_classify, text, args.first_stage, args.small_model)
+        first.append(result)
+        first_gpu.append(gpu)
+        result, gpu = timed(classifier.classify_article, text)
+        large.append(result)
+        large_gpu.append(gpu)
+
+    results = evaluate(df, gold, first, first_gpu, large, large_gpu, thresholds)
+    print("\n📊 Cascade evaluation")
+    print(results.to_string(index=False))
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"💾 Saved results to {args.output}")
+    get_client().report()
+
+
+if __name__ == "__main__":
+    main()
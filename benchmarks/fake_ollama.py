@@ -0,0 +1,338 @@
+"""
+Local stand-in for Ollama's `/api/chat`, for measuring pipeline throughput without the GPU box.
+
+Replies are replayed from a JSONL file of recorded responses when the request matches one, and
+otherwise generated to fit the request: translations keep the `[[n]]` segment markers, `format`
+requests get JSON matching the schema, and the text prompts get replies in the format the parsers
+expect. Latency follows a configurable model: a sampled per-request overhead plus prompt and
+completion tokens at fixed rates, with at most `--parallel` requests decoding at once (like
+OLLAMA_NUM_PARALLEL). Errors (503) and malformed replies can be injected. Streaming requests get
+NDJSON chunks paced at the token rate and stop when the client disconnects.
+
+Every random draw is seeded from the request itself (and, for injected faults, the attempt number),
+so a corpus gets the same replies, latencies and errors on every run, whatever order the requests
+arrive in.
+
+Usage:
+    python benchmarks/fake_ollama.py [--port 11435] [--latency lognormal] [--overhead 0.05]
+        [--tokens-per-s 40] [--parallel 4] [--error-rate 0.01] [--replay recorded.jsonl]
+    # record real replies for replay (proxying to a real Ollama server):
+    python benchmarks/fake_ollama.py --record-upstream http://localhost:11434/api/chat --replay recorded.jsonl
+then run the pipeline with LLM_ENDPOINT=http://localhost:11435/api/chat.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import aiohttp
+from aiohttp import web
+
+CHAT_PATH = "/api/chat"
+CHARS_PER_TOKEN = 4
+MIN_SLEEP_S = 0.005
+SEGMENT_MARKER = re.compile(r"^\s*\[\[(\d+)\]\]\s*$", re.MULTILINE)
+WORDS = ("the minister said that the government would review the contracts after the report on public "
+         "spending was published and the opposition asked for an independent inquiry into the deal").split()
+
+def count_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+def request_key(body: dict) -> str:
+    """Replay key of a chat request: model, messages, `format` and temperature (not streaming)."""
+    messages = [(m.get("role"), m.get("content")) for m in body.get("messages", [])]
+    temperature = (body.get("options") or {}).get("temperature")
+    payload = json.dumps([body.get("model", ""), messages, body.get("format"), temperature],
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# ========== Latency Model ==========
+@dataclass
+class LatencyModel:
+    """
+    Seconds for one request: overhead (drawn from `distribution` around `overhead_s`) plus
+    prompt tokens / `prompt_tokens_per_s` plus completion tokens / `tokens_per_s`.
+    """
+    distribution: str = "lognormal"   # fixed | uniform | exponential | lognormal
+    overhead_s: float = 0.05
+    spread: float = 0.5               # sigma for lognormal, +/- fraction for uniform
+    prompt_tokens_per_s: float = 2000.0
+    tokens_per_s: float = 40.0
+
+    def overhead(self, rng: random.Random) -> float:
+        if self.distribution == "fixed":
+            return self.overhead_s
+        if self.distribution == "uniform":
+            return self.overhead_s * rng.uniform(1 - self.spread, 1 + self.spread)
+        if self.distribution == "exponential":
+            return rng.expovariate(1 / self.overhead_s) if self.overhead_s > 0 else 0.0
+        if self.distribution == "lognormal":
+            # median overhead_s
+            return self.overhead_s * rng.lognormvariate(0, self.spread)
+        raise ValueError(f"Unknown latency distribution: {self.distribution}")
+
+    def prompt_seconds(self, prompt_tokens: int) -> float:
+        return prompt_tokens / self.prompt_tokens_per_s if self.prompt_tokens_per_s > 0 else 0.0
+
+    def token_seconds(self) -> float:
+        return 1 / self.tokens_per_s if self.tokens_per_s > 0 else 0.0
+
+# ========== Synthetic Replies ==========
+def _sentence(rng: random.Random, n_words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n_words)).capitalize() + "."
+
+def _english_like(text: str, rng: random.Random) -> str:
+    """ASCII text of about the same length as `text` (passes the untranslated/too-short checks)."""
+    words = []
+    length = 0
+    while length < len(text):
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+def fake_translation(text: str, rng: random.Random) -> str:
+    parts = SEGMENT_MARKER.split(text)
+    if len(parts) == 1:
+        return _english_like(text, rng)
+    segments = [f"[[{number}]]\n{_english_like(body.strip(), rng)}" for number, body in zip(parts[1::2], parts[2::2])]
+    return "\n\n".join(segments)
+
+def from_schema(schema: dict, rng: random.Random, name: str = "", position: int = 0):
+    """A value matching the JSON-schema subset of utils/structured_output.py."""
+    kind = schema.get("type")
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if kind == "object":
+        return {key: from_schema(sub, rng, key, position) for key, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        items = schema.get("items", {"type": "string"})
+        if items.get("type") == "object" and "frame_index" in items.get("properties", {}):
+            return [from_schema(items, rng, name, i) for i in range(7)]  # one entry per frame
+        return [from_schema(items, rng, name, i) for i in range(rng.randint(1, 3))]
+    if kind == "integer":
+        if name == "frame_index":
+            return position + 1
+        return rng.randint(schema.get("minimum", 0), schema.get("maximum", 100))
+    if kind == "number":
+        return rng.uniform(schema.get("minimum", 0), schema.get("maximum", 1))
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if name == "frame":
+        return rng.choice(["Systemic corruption", "Elite collusion", "None"])
+    return _sentence(rng, rng.randint(6, 18))
+
+def fake_content(body: dict, rng: random.Random) -> str:
+    messages = body.get("messages", [])
+    system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+    user = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+
+    if isinstance(body.get("format"), dict):
+        return json.dumps(from_schema(body["format"], rng), ensure_ascii=False)
+    if "translation assistant" in system:
+        return fake_translation(user, rng)
+    if "Tentative Label" in user:
+        highlights = "\n".join(f"- {_sentence(rng, 10)}" for _ in range(rng.randint(1, 3)))
+        label = rng.choice(["Yes", "Mentioned but not central", "No", "Unsure"])
+        return (f"Highlights:\n{highlights}\n\nTentative Label: {label}\n"
+                f"Reasoning: {_sentence(rng, 14)}\nConfidence: {rng.randint(40, 100)}\n")
+    if '"frames"' in system or "frame_index" in system:
+        frames = [{"frame_index": i, "frame": "None", "rationale": _sentence(rng, 12),
+                   "confidence": rng.randint(40, 100), "evidence": ""} for i in range(1, 8)]
+        return json.dumps({"frames": frames}) if '"frames"' in system else json.dumps(frames)
+    return json.dumps([{"frame": "None", "rationale": _sentence(rng, 12), "confidence": rng.randint(40, 100),
+                        "evidence": ""}])
+
+# ========== Server ==========
+@dataclass
+class FakeOllama:
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    parallel: int = 4
+    error_rate: float = 0.0
+    malformed_rate: float = 0.0
+    replay_path: Optional[str] = None
+    record_upstream: Optional[str] = None
+    seed: int = 0
+
+    def __post_init__(self):
+        self.replay = {}
+        if self.replay_path and os.path.exists(self.replay_path):
+            with open(self.replay_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.replay[record["key"]] = record["content"]
+        self._slots = None
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zero the counters and attempt numbers, so the next run sees the same faults as the last."""
+        with self._lock:
+            self._attempts = {}
+            self.stats = {"requests": 0, "errors": 0, "malformed": 0, "replayed": 0, "stopped_early": 0,
+                          "prompt_tokens": 0, "completion_tokens": 0}
+
+    def _count(self, **increments):
+        with self._lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def _rng(self, key: str, purpose: str) -> random.Random:
+        return random.Random(f"{self.seed}-{purpose}-{key}")
+
+    async def _content(self, body: dict, key: str) -> str:
+        if key in self.replay:
+            self._count(replayed=1)
+            return self.replay[key]
+        if self.record_upstream:
+            upstream = {**body, "stream": False}
+            async with aiohttp.ClientSession() as session:
+                async with session.post(self.record_upstream, json=upstream) as response:
+                    content = (await response.json(content_type=None)).get("message", {}).get("content", "")
+            self.replay[key] = content
+            with open(self.replay_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "model": body.get("model"), "content": content}, ensure_ascii=False) + "\n")
+            return content
+        return fake_content(body, self._rng(key, "content"))
+
+    async def handle_chat(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        model = body.get("model", "")
+        messages = body.get("messages", [])
+        key = request_key(body)
+        self._count(requests=1)
+
+        with self._lock:
+            attempt = self._attempts[key] = self._attempts.get(key, 0) + 1
+        rng = self._rng(f"{key}-{attempt}", "faults")  # a retry of a failed request gets a fresh draw
+        if rng.random() < self.error_rate:
+            self._count(errors=1)
+            return web.json_response({"error": "injected server error"}, status=503)
+        malformed = rng.random() < self.malformed_rate
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.parallel)
+        async with self._slots:
+            started = time.perf_counter()
+            content = await self._content(body, key)
+            if malformed:
+                self._count(malformed=1)
+                content = content[: max(1, len(content) // 2)]
+            prompt_tokens = count_tokens("".join(m.get("content", "") for m in messages))
+            completion_tokens = count_tokens(content)
+            latency_rng = self._rng(key, "latency")
+            await asyncio.sleep(self.latency.overhead(latency_rng) + self.latency.prompt_seconds(prompt_tokens))
+            self._count(prompt_tokens=prompt_tokens)
+
+            if not body.get("stream", True):
+                await asyncio.sleep(completion_tokens * self.latency.token_seconds())
+                self._count(completion_tokens=completion_tokens)
+                return web.json_response(self._final(model, content, prompt_tokens, completion_tokens, started))
+            return await self._stream(request, model, content, prompt_tokens, started)
+
+    async def _stream(self, request: web.Request, model: str, content: str, prompt_tokens: int,
+                      started: float) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        pieces = re.findall(r"\S+\s*|\s+", content)
+        sent = 0
+        owed = 0.0  # sleep in steps of MIN_SLEEP_S; tiny sleeps would cost more than the simulated time
+        try:
+            for piece in pieces:
+                tokens = count_tokens(piece)
+                owed += tokens * self.latency.token_seconds()
+                if owed >= MIN_SLEEP_S:
+                    await asyncio.sleep(owed)
+                    owed = 0.0
+                line = {"model": model, "message": {"role": "assistant", "content": piece}, "done": False}
+                await response.write((json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8"))
+                sent += tokens
+            final = self._final(model, "", prompt_tokens, sent, started)
+            await response.write((json.dumps(final) + "\n").encode("utf-8"))
+            await response.write_eof()
+        except (ConnectionResetError, asyncio.CancelledError):
+            self._count(stopped_early=1)  # the client had what it needed and closed the connection
+            raise
+        finally:
+            self._count(completion_tokens=sent)
+        return response
+
+    @staticmethod
+    def _final(model: str, content: str, prompt_tokens: int, completion_tokens: int, started: float) -> dict:
+        return {"model": model, "message": {"role": "assistant", "content": content}, "done": True,
+                "prompt_eval_count": prompt_tokens, "eval_count": completion_tokens,
+                "total_duration": int((time.perf_counter() - started) * 1e9)}
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 ** 2)
+        app.router.add_post(CHAT_PATH, self.handle_chat)
+        return app
+
+def start_fake_ollama(port: int = 0, **settings):
+    """Serve on a background thread; returns (server, endpoint). `port=0` picks a free port."""
+    server = FakeOllama(**settings)
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    holder = {}
+
+    async def serve():
+        runner = web.AppRunner(server.app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", port)
+        await site.start()
+        holder["port"] = runner.addresses[0][1]
+        ready.set()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(serve())
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True, name="fake-ollama").start()
+    ready.wait()
+    return server, f"http://127.0.0.1:{holder['port']}{CHAT_PATH}"
+
+def add_server_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", default="lognormal", choices=["fixed", "uniform", "exponential", "lognormal"],
+                        help="distribution of the per-request overhead")
+    parser.add_argument("--overhead", type=float, default=0.05, help="median per-request overhead in seconds")
+    parser.add_argument("--spread", type=float, default=0.5)
+    parser.add_argument("--prompt-tokens-per-s", type=float, default=2000.0)
+    parser.add_argument("--tokens-per-s", type=float, default=40.0, help="completion tokens per second per request")
+    parser.add_argument("--parallel", type=int, default=4, help="requests decoded at once (OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of replies cut off halfway")
+    parser.add_argument("--replay", help="JSONL file of recorded replies")
+    parser.add_argument("--seed", type=int, default=0)
+
+def server_settings(args) -> dict:
+    return {
+        "latency": LatencyModel(args.latency, args.overhead, args.spread, args.prompt_tokens_per_s, args.tokens_per_s),
+        "parallel": args.parallel,
+        "error_rate": args.error_rate,
+        "malformed_rate": args.malformed_rate,
+        "replay_path": args.replay,
+        "seed": args.seed,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--record-upstream", help="proxy unmatched requests to this /api/chat and append them to --replay")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+    if args.record_upstream and not args.replay:
+        parser.error("--record-upstream needs --replay")
+
+    server = FakeOllama(record_upstream=args.record_upstream, **server_settings(args))
+    print(f"🧪 Fake Ollama on http://127.0.0.1:{args.port}{CHAT_PATH} "
+          f"({len(server.replay)} recorded replies, {args.parallel} parallel)")
+    web.run_app(server.app(), host="127.0.0.1", port=args.port, access_log=None, print=None)
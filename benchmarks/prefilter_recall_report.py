@@ -0,0 +1,81 @@
+"""
+Recall report for the frame pre-filter in `utils/frame_prefilter.py` against the ICR gold
+annotations (the `*_session.json` files of the annotation tool, as in
+`08_calculate_coder_agreement.ipynb`).
+
+For every frame it shows how many gold positives the pre-filter would keep and how many
+LLM calls it would skip, at the configured thresholds (`PREFILTER_THRESHOLDS` in
+`09_run_seven_frames.py`) and at the highest threshold that still reaches --target-recall.
+
+Usage:
+    python benchmarks/prefilter_recall_report.py SESSION_FOLDER [--articles sample.csv ...]
+        [--gold any|majority] [--target-recall 0.98] [--output recall.csv]
+"""
+import argparse
+import importlib
+import os
+import sys
+
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)  # prompts/ is resolved relative to the repository root
+
+from utils.frame_prefilter import FramePrefilter, recall_report
+from utils.reliability import FRAME_LABELS, load_session_annotations
+
+frames = importlib.import_module("09_run_seven_frames")
+
+
+def gold_labels(annotations: pd.DataFrame, rule: str = "any") -> pd.DataFrame:
+    """Per-URI gold: a frame counts as present if any coder (or a majority of coders) marked it Present."""
+    present = annotations[FRAME_LABELS].eq("Present").astype(float)
+    present["uri"] = annotations["uri"]
+    share = present.groupby("uri").mean()
+    gold = share > 0 if rule == "any" else share > 0.5
+    gold.columns = range(1, len(FRAME_LABELS) + 1)
+    return gold
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("session_folder", help="folder with <coder>_session.json files")
+    parser.add_argument("--articles", nargs="*", default=frames.csv_files,
+                        help="CSV files with 'uri' and 'translated_text' (defaults to the files in 09_run_seven_frames.py)")
+    parser.add_argument("--gold", choices=["any", "majority"], default="any")
+    parser.add_argument("--target-recall", type=float, default=0.98)
+    parser.add_argument("--output", help="optional CSV path for the report")
+    args = parser.parse_args()
+
+    annotations = load_session_annotations(args.session_folder)
+    gold = gold_labels(annotations, args.gold)
+
+    if "translated_text" in annotations.columns:
+        texts = annotations.drop_duplicates("uri").set_index("uri")["translated_text"]
+    else:
+        articles = pd.concat([pd.read_csv(os.path.expanduser(p), usecols=["uri", "translated_text"])
+                              for p in args.articles], ignore_index=True)
+        texts = articles.drop_duplicates("uri").set_index("uri")["translated_text"]
+    uris = gold.index.intersection(texts.index)
+    print(f"🧪 {len(uris)} of {len(gold)} gold articles have text (gold rule: {args.gold})")
+
+    prefilter = FramePrefilter(frames.frame_registry(), frames.PREFILTER_THRESHOLDS)
+    report = recall_report(prefilter, texts.loc[uris], gold.loc[uris], target_recall=args.target_recall)
+
+    total_calls = len(uris) * len(FRAME_LABELS)
+    skipped = (report["calls_skipped_%"] / 100 * len(uris)).sum()
+    tuned_skipped = (report["tuned_calls_skipped_%"] / 100 * len(uris)).sum()
+    print("\n📊 Pre-filter recall")
+    print(report.to_string(index=False))
+    print(f"\n🧹 Per-frame calls skipped: {skipped:.0f}/{total_calls} at current thresholds, "
+          f"{tuned_skipped:.0f}/{total_calls} at tuned thresholds")
+    print(f"🔧 Tuned thresholds: {dict(zip(range(1, len(FRAME_LABELS) + 1), report['tuned_threshold'].tolist()))}")
+
+    if args.output:
+        report.to_csv(args.output, index=False)
+        print(f"💾 Saved report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
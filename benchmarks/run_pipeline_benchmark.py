@@ -0,0 +1,195 @@
+"""
+End-to-end throughput benchmark of the LLM stages on synthetic corpora, against the fake Ollama
+server in `benchmarks/fake_ollama.py` (started in-process unless --endpoint is given).
+
+For every corpus size and stage it runs, in a fresh process:
+    translation  translation.translate_dataframe(df, max_in_flight)
+    classifier   run_classifier(...) of 05_run_classifier_political_corruption.py
+    frames       annotate_dataframe(...) of 09_run_seven_frames.py
+and reports articles/s, peak resident memory of that process, LLM calls and p95 call latency.
+Corpora are generated from a seed, and the fake server's replies and latencies are seeded from
+the request, so two runs with the same arguments are directly comparable.
+
+Cost per stage. With the server's default, GPU-like latency (40 completion tokens/s, 4 requests
+decoded at once) every stage is bound by the server, at roughly
+    translation  0.3 articles/s   (one long completion per article, --max-in-flight 8)
+    classifier   1.8 articles/s   (--workers 4)
+    frames       0.13 articles/s  (7 sequential calls per article in per_frame mode)
+so the default 1000 articles take about an hour for translation and over two hours for frames.
+To measure the pipeline's own overhead at 1k-100k articles, make the server nearly free, e.g.
+`--tokens-per-s 100000 --prompt-tokens-per-s 1000000 --parallel 32 --overhead 0.001`; 1000
+articles then take under a minute per stage (frames is the slowest, as it annotates one article at a time).
+
+Usage:
+    python benchmarks/run_pipeline_benchmark.py [--sizes 1000 10000] [--stages translation classifier frames]
+        [--max-in-flight 8] [--workers 4] [--frame-mode per_frame] [--use-cache] [--output results.csv]
+        [fake server options, see --help]
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)  # prompts/ is resolved relative to the repository root
+
+from benchmarks.fake_ollama import add_server_arguments, server_settings, start_fake_ollama
+from config import COUNTRY_TO_LANG, SELECTED_COUNTRIES
+from utils.language_id import SEED_TEXTS
+
+STAGES = ["translation", "classifier", "frames"]
+ENGLISH_SHARE = 0.1          # articles written in English regardless of country (passed through by translation)
+MEDIAN_ARTICLE_CHARS = 2500
+
+# ========== Synthetic Corpus ==========
+def _sentences(lang: str) -> list:
+    return [s.strip() + "." for s in SEED_TEXTS[lang].split(". ") if s.strip()]
+
+def synthetic_corpus(n: int, seed: int = 42) -> pd.DataFrame:
+    """`n` articles spread over SELECTED_COUNTRIES, in the country's language, with lognormal lengths."""
+    rng = random.Random(seed)
+    sentences = {lang: _sentences(lang) for lang in set(COUNTRY_TO_LANG.values())}
+    rows = []
+    for i in range(n):
+        country = SELECTED_COUNTRIES[i % len(SELECTED_COUNTRIES)]
+        lang = "en" if rng.random() < ENGLISH_SHARE else COUNTRY_TO_LANG[country]
+        target = int(MEDIAN_ARTICLE_CHARS * rng.lognormvariate(0, 0.6))
+        body, english = [], []
+        while sum(len(s) + 1 for s in body) < target:
+            body.append(rng.choice(sentences[lang]))
+            english.append(rng.choice(sentences["en"]))
+        title = rng.choice(sentences[lang])
+        rows.append({
+            "uri": f"bench-{seed}-{i}",
+            "country": country,
+            "dateTime": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T12:00:00Z",
+            "source.uri": f"outlet{i % 20}.example.com",
+            "combined_text": title + "\n" + " ".join(body),
+            "translated_text": title + "\n" + " ".join(english),
+        })
+    return pd.DataFrame(rows)
+
+# ========== One Stage In A Fresh Process ==========
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+def _current_rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+
+def run_stage(stage_name: str, corpus_path: str, endpoint: str, options: dict) -> dict:
+    """Runs in a spawned process, so the peak RSS it reports belongs to this stage alone."""
+    from utils import llm_cache, telemetry
+    from utils.ollama_client import configure_client
+
+    telemetry.USE_TELEMETRY = options["telemetry"]
+    if options["use_cache"]:
+        llm_cache._default_cache = llm_cache.LLMCache(os.path.join(options["tmp"], "llm_cache.sqlite"))
+    else:
+        llm_cache.USE_LLM_CACHE = False
+    client = configure_client(endpoint=endpoint, max_concurrency=options["client_concurrency"])
+
+    df = pd.read_pickle(corpus_path)
+    journal = os.path.join(options["tmp"], f"{stage_name}_journal.jsonl")
+    baseline_mb = _current_rss_mb()  # after imports and loading the corpus
+    output = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stdout if options["verbose"] else output):
+        if stage_name == "translation":
+            translation = importlib.import_module("translation")
+            translation.translate_dataframe(df, max_in_flight=options["max_in_flight"])
+        elif stage_name == "classifier":
+            classifier = importlib.import_module("05_run_classifier_political_corruption")
+            classifier.REPORT_EVERY = max(len(df), 1)
+            classifier.run_classifier(df, journal, max_workers=options["workers"])
+        elif stage_name == "frames":
+            frames = importlib.import_module("09_run_seven_frames")
+            frames.SLEEP_BETWEEN_REQUESTS = 0
+            frames.annotate_dataframe(df, journal, mode=options["frame_mode"])
+        else:
+            raise ValueError(f"❌ Unknown stage: {stage_name}")
+    elapsed = time.perf_counter() - started
+
+    calls = client.metrics_summary()
+    client.close()
+    return {
+        "stage": stage_name,
+        "articles": len(df),
+        "seconds": elapsed,
+        "articles_per_s": len(df) / elapsed if elapsed > 0 else float("nan"),
+        "peak_rss_mb": _peak_rss_mb(),
+        "baseline_rss_mb": baseline_mb,
+        "llm_calls": calls["calls"],
+        "llm_errors": calls["errors"],
+        "retries": calls["retries"],
+        "p95_call_s": calls["p95_latency_s"],
+        "completion_tokens": calls["completion_tokens"],
+    }
+
+# ========== Main ==========
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--corpus-seed", type=int, default=42)
+    parser.add_argument("--endpoint", help="use this /api/chat instead of starting the fake server")
+    parser.add_argument("--max-in-flight", type=int, default=8, help="translate_dataframe max_in_flight")
+    parser.add_argument("--workers", type=int, default=4, help="classifier worker threads")
+    parser.add_argument("--frame-mode", choices=["per_frame", "multi_frame"], default="per_frame")
+    parser.add_argument("--client-concurrency", type=int, default=8, help="OllamaClient max_concurrency")
+    parser.add_argument("--use-cache", action="store_true", help="use a fresh LLM cache per run")
+    parser.add_argument("--telemetry", action="store_true", help="also write events to TELEMETRY_PATH")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own output")
+    parser.add_argument("--output", help="optional CSV path for the results")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+    if not args.verbose:
+        os.environ["TQDM_DISABLE"] = "1"  # inherited by the stage processes
+
+    server, endpoint = (None, args.endpoint) if args.endpoint else start_fake_ollama(**server_settings(args))
+    print(f"🧪 LLM endpoint: {endpoint}")
+
+    results = []
+    for size in args.sizes:
+        corpus = synthetic_corpus(size, args.corpus_seed)
+        for stage_name in args.stages:
+            with tempfile.TemporaryDirectory() as tmp:
+                corpus_path = os.path.join(tmp, "corpus.pkl")
+                corpus.to_pickle(corpus_path)
+                options = {"tmp": tmp, "max_in_flight": args.max_in_flight, "workers": args.workers,
+                           "frame_mode": args.frame_mode, "client_concurrency": args.client_concurrency,
+                           "use_cache": args.use_cache, "telemetry": args.telemetry, "verbose": args.verbose}
+                if server:
+                    server.reset_stats()
+                print(f"⏱️ {stage_name}: {size} articles...")
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                    result = executor.submit(run_stage, stage_name, corpus_path, endpoint, options).result()
+                if server:
+                    result.update({f"server_{k}": v for k, v in server.stats.items()
+                                   if k in ("errors", "malformed", "replayed", "stopped_early")})
+                results.append(result)
+                print(f"   {result['articles_per_s']:.1f} articles/s, peak RSS {result['peak_rss_mb']:.0f} MB, "
+                      f"{result['llm_calls']} LLM calls")
+
+    table = pd.DataFrame(results)
+    with pd.option_context("display.width", 200, "display.max_columns", 20, "display.float_format", "{:.2f}".format):
+        print("\n📊 Pipeline benchmark")
+        print(table.to_string(index=False))
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"💾 Saved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
 # config.py
+import os
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))  # local caches live under outputs/ here, wherever scripts run from
+
 NEWS_FOLDER = "~/webdav/ASCOR-FMG-5580-RESPOND-news-data (Projectfolder)/"
 SELECTED_COUNTRIES = ["Bulgaria", "Italy", "Netherlands", "United_Kingdom"]
 
@@ -10,10 +14,68 @@ COUNTRY_TO_LANG = {
 }
 TRANSLATED_FILE = "outputs/sample_for_annotation.csv"
 ANNOTATED_FILE = "outputs/sample_with_llm_suggestions.csv"
-LLM_ENDPOINT = "http://localhost:11434/api/chat"
+LLM_ENDPOINT = os.environ.get("LLM_ENDPOINT", "http://localhost:11434/api/chat")  # override e.g. to run against benchmarks/fake_ollama.py
 LLM_MODEL_NAME = "llama3:70b"
+SMALL_LLM_MODEL_NAME = "llama3:8b"  # first stage of the cascade classifier
 
 ANNOTATION_PATH = '~/webdav/ASCOR-FMG-5580-RESPOND-news-data (Projectfolder)/annotations/'
 ANNOTATION_FILE = 'classified_pol_corruption_validation_gabriele.csv'
 ANNOTATION_ENCODING = 'latin1'
 VALID_CORRUPTION_LABELS = ['no political corruption', 'political corruption']
+
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", os.path.join(REPO_ROOT, "outputs", "llm_cache.sqlite"))
+LLM_CACHE_MAX_BYTES = 2 * 1024 ** 3  # evict least recently used entries above ~2 GB
+USE_LLM_CACHE = True
+
+ATTENTION_STORE_PATH = "outputs/attention.sqlite"  # weekly corruption counts per country, updated incrementally
+SAMPLE_LEDGER_PATH = "outputs/sample_ledger.sqlite"  # which uri went to which ICR/coding draw
+TELEMETRY_PATH = os.environ.get("TELEMETRY_PATH", os.path.join(REPO_ROOT, "outputs", "telemetry.jsonl"))  # JSONL metrics per LLM call / parse / I/O step; summarize with `python -m utils.telemetry`
+USE_TELEMETRY = os.environ.get("USE_TELEMETRY", "0") == "1"  # opt in with USE_TELEMETRY=1
+STRUCTURED_OUTPUT = True  # request JSON-schema constrained replies (Ollama `format`) for frames and classifier
+
+PARQUET_FOLDER = "~/webdav/ASCOR-FMG-5580-RESPOND-news-data (Projectfolder)/parquet/"
+WEEKLY_COUNTS_FOLDER = "~/webdav/ASCOR-FMG-5580-RESPOND-news-data (Projectfolder)/weekly_counts_total_coverage/"
+
+# Dictionary terms for the political corruption attention measure (01_get_attention_pol_corruption_dictionary.ipynb)
+COUNTRY_TERMS = {
+    "Netherlands": {
+        "political": ["politieke partij", "minister", "kabinet", "regering", "parlement", "burgemeester", "president", "stemfraude", "politiek schandaal"],
+        "corruption": ["omkoping", "belangenverstrengeling", "nepotisme", "machtsmisbruik", "corruptie", "witwassen", "steekpenningen", "vriendjespolitiek"]
+    },
+    "Italy": {
+        "political": ["partito politico", "ministro", "governo", "parlamento", "presidente", "elezioni", "scandalo politico"],
+        "corruption": ["corruzione", "tangenti", "frode", "abuso di potere", "clientelismo", "finanziamento illecito", "lavaggio di denaro"]
+    },
+    "Bulgaria": {
+        "political": ["политическа партия", "министър", "правителство", "парламент", "президент", "избори", "политически скандал"],
+        "corruption": ["корупция", "подкуп", "измама", "злоупотреба с власт", "непотизъм", "пране на пари", "присвояване"]
+    },
+    "United_Kingdom": {
+        "political": ["political party", "minister", "cabinet", "government", "parliament", "prime minister", "elections", "political scandal"],
+        "corruption": ["corruption", "bribery", "fraud", "influence peddling", "abuse of power", "cronyism", "embezzlement", "money laundering"]
+    },
+    "France": {
+        "political": ["parti politique", "ministre", "gouvernement", "parlement", "président", "élections", "scandale politique"],
+        "corruption": ["corruption", "pot-de-vin", "fraude", "abus de pouvoir", "clientélisme", "blanchiment d'argent", "prise illégale d'intérêt"]
+    },
+    "Sweden": {
+        "political": ["politisk parti", "minister", "regering", "riksdag", "statsminister", "val", "politisk skandal"],
+        "corruption": ["korruption", "mutor", "bedrägeri", "maktmissbruk", "vänskapskorruption", "penningtvätt", "intressekonflikt"]
+    },
+    "Serbia": {
+        "political": ["politička partija", "ministar", "vlada", "parlament", "predsednik", "izbori", "politički skandal"],
+        "corruption": ["korupcija", "mito", "prevara", "zloupotreba položaja", "nepotizam", "pranje novca", "sukob interesa"]
+    },
+    "Ukraine": {
+        "political": ["політична партія", "міністр", "уряд", "парламент", "президент", "вибори", "політичний скандал"],
+        "corruption": ["корупція", "хабар", "шахрайство", "зловживання владою", "кумівство", "відмивання грошей", "конфлікт інтересів"]
+    },
+    "Germany": {
+        "political": ["politische Partei", "Minister", "Regierung", "Parlament", "Bundeskanzler", "Wahl", "politischer Skandal"],
+        "corruption": ["Korruption", "Bestechung", "Betrug", "Machtmissbrauch", "Vetternwirtschaft", "Geldwäsche", "Amtsmissbrauch"]
+    },
+    "Hungary": {
+        "political": ["politikai párt", "miniszter", "kormány", "parlament", "elnök", "választások", "politikai botrány"],
+        "corruption": ["korrupt", "megvesztegetés", "csalás", "hatalommal való visszaélés", "nepotizmus", "pénzmosás", "személyes érdek", "baráti összefonódás"]
+    }
+}
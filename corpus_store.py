@@ -0,0 +1,156 @@
+# corpus_store.py
+#
+# Columnar Parquet copy of the news corpus and the pipeline outputs, partitioned as
+#   <root>/<dataset>/country=<country>/year_month=<YYYY-MM>/*.parquet
+# so that loading one country and month reads only those files and only the requested columns.
+#
+# Usage:
+#     python corpus_store.py [--countries Italy ...] [--output-csv CSV DATASET]
+# then load with `dataloader.load_and_prepare_parquet` or `read_table`.
+
+import os
+import argparse
+import pandas as pd
+from typing import List, Optional
+
+from config import NEWS_FOLDER, PARQUET_FOLDER, SELECTED_COUNTRIES
+from utils.telemetry import timer
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is only needed for the Parquet format
+    pa = ds = pq = None
+
+PARTITION_COLUMNS = ["country", "year_month"]
+NEWS_DATASET = "news"
+UNKNOWN_MONTH = "unknown"  # partition for rows whose dateTime does not parse
+CONVERT_CHUNKSIZE = 100_000
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("❌ pyarrow is required for Parquet support: pip install pyarrow")
+
+# ========== Writing ==========
+
+def _prepare_for_parquet(df: pd.DataFrame, country: Optional[str] = None) -> pd.DataFrame:
+    """Type `dateTime`, add partition columns and store every other column as string."""
+    df = df.copy()
+    df = df.loc[:, ~df.columns.str.startswith("Unnamed:")]
+    if country is not None:
+        df["country"] = country
+    df["dateTime"] = pd.to_datetime(df["dateTime"], errors="coerce", utc=True)
+    df["year_month"] = df["dateTime"].dt.strftime("%Y-%m").fillna(UNKNOWN_MONTH)
+    # CSV chunks infer types independently; a single string schema keeps all files compatible
+    for col in df.columns:
+        if col not in ("dateTime", "year_month"):
+            df[col] = df[col].astype("string")
+    return df
+
+def write_partitioned(df: pd.DataFrame, dataset_root: str, part_name: str):
+    _require_pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_to_dataset(
+        table,
+        root_path=dataset_root,
+        partition_cols=PARTITION_COLUMNS,
+        basename_template=f"{part_name}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore"
+    )
+
+def convert_news_csv_to_parquet(news_folder: str = NEWS_FOLDER, countries: List[str] = SELECTED_COUNTRIES,
+                                parquet_root: str = PARQUET_FOLDER, chunksize: int = CONVERT_CHUNKSIZE):
+    """One-time conversion of the raw `{country}_news.csv` dumps into the partitioned `news` dataset."""
+    _require_pyarrow()
+    news_folder = os.path.expanduser(news_folder)
+    dataset_root = os.path.join(os.path.expanduser(parquet_root), NEWS_DATASET)
+
+    for country in countries:
+        file_path = os.path.join(news_folder, f"{country}_news.csv")
+        if not os.path.exists(file_path):
+            print(f"❌ File not found: {file_path}")
+            continue
+
+        print(f"📦 Converting {file_path}")
+        rows = 0
+        for i, chunk in enumerate(pd.read_csv(file_path, chunksize=chunksize, dtype=str)):
+            write_partitioned(_prepare_for_parquet(chunk, country), dataset_root, f"{country}-{i:05d}")
+            rows += len(chunk)
+        print(f"✅ {country}: {rows} rows written to {dataset_root}")
+
+def convert_output_csv_to_parquet(csv_path: str, dataset_name: str, parquet_root: str = PARQUET_FOLDER,
+                                  chunksize: int = CONVERT_CHUNKSIZE):
+    """Convert a pipeline output CSV (which must have `country` and `dateTime`) into its own dataset."""
+    _require_pyarrow()
+    csv_path = os.path.expanduser(csv_path)
+    dataset_root = os.path.join(os.path.expanduser(parquet_root), dataset_name)
+    for i, chunk in enumerate(pd.read_csv(csv_path, chunksize=chunksize, dtype=str)):
+        write_partitioned(_prepare_for_parquet(chunk), dataset_root, f"{dataset_name}-{i:05d}")
+    print(f"✅ Converted {csv_path} → {dataset_root}")
+
+# ========== Reading ==========
+
+def read_dataset(dataset_name: str = NEWS_DATASET, parquet_root: str = PARQUET_FOLDER,
+                 columns: Optional[List[str]] = None, countries: Optional[List[str]] = None,
+                 start_month: Optional[str] = None, end_month: Optional[str] = None,
+                 filter_expression=None) -> pd.DataFrame:
+    """
+    Read a partitioned dataset with column projection. `countries` and the inclusive
+    `start_month` / `end_month` bounds ("YYYY-MM") prune partitions before any file is opened
+    (a month range never includes the `unknown` partition of undated rows);
+    `filter_expression` is an optional extra `pyarrow.dataset` expression pushed down to the scan.
+    """
+    _require_pyarrow()
+    dataset_root = os.path.join(os.path.expanduser(parquet_root), dataset_name)
+    dataset = ds.dataset(dataset_root, format="parquet", partitioning="hive")
+
+    expression = None
+    def _and(expr):
+        return expr if expression is None else expression & expr
+
+    if countries:
+        expression = _and(ds.field("country").isin(countries))
+    if start_month:
+        expression = _and(ds.field("year_month") >= start_month)
+    if end_month:
+        expression = _and(ds.field("year_month") <= end_month)
+    if start_month or end_month:
+        # "unknown" sorts after every "YYYY-MM", so a start bound alone would let it through
+        expression = _and(ds.field("year_month") != UNKNOWN_MONTH)
+    if filter_expression is not None:
+        expression = _and(filter_expression)
+
+    df = dataset.to_table(columns=columns, filter=expression).to_pandas()
+    for col in PARTITION_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(str)  # partition keys come back as categoricals
+    return df
+
+def read_table(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read a CSV file or a Parquet file/dataset directory, depending on the path."""
+    path = os.path.expanduser(path)
+    is_parquet = os.path.isdir(path) or path.endswith(".parquet")
+    with timer("io", op="read_parquet" if is_parquet else "read_csv", path=path) as step:
+        if is_parquet:
+            _require_pyarrow()
+            df = ds.dataset(path, format="parquet", partitioning="hive").to_table(columns=columns).to_pandas()
+        else:
+            df = pd.read_csv(path, usecols=columns)
+        step["rows"] = len(df)
+    return df
+
+# ========== CLI ==========
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert the news corpus and pipeline outputs to Parquet.")
+    parser.add_argument("--news-folder", default=NEWS_FOLDER)
+    parser.add_argument("--parquet-root", default=PARQUET_FOLDER)
+    parser.add_argument("--countries", nargs="+", default=SELECTED_COUNTRIES)
+    parser.add_argument("--output-csv", nargs=2, action="append", metavar=("CSV", "DATASET"), default=[],
+                        help="also convert a pipeline output CSV into the named dataset")
+    args = parser.parse_args()
+
+    convert_news_csv_to_parquet(args.news_folder, args.countries, args.parquet_root)
+    for csv_path, dataset_name in args.output_csv:
+        convert_output_csv_to_parquet(csv_path, dataset_name, args.parquet_root)
@@ -0,0 +1,63 @@
+# collection_queries.py
+#
+# Keyword lists and languages of the corruption news recollection (Article_recollection_NewsAPI.ipynb),
+# and the EventRegistry `$query` built from them for one country and date range.
+
+from typing import Dict
+
+COUNTRY_KEYWORDS = {
+    "Sweden": ["korrupt", "korruptt beteende", "Mutor", "Förskingring", "Bedrägeri", "Nepotism", "Utpressning", "Kronism", "Penningtvätt", "Oetiskt beteende", "Missbruk av makt", "otillbörligt handlande", "Förseelse", "Förbrytelse", "Ohederlighet", "Oredlighet", "påverkanshandel", "handel med inflytande", "vänskapskorruption", "maktmissbruk", "svågerpolitik", "oegentligheter"],
+    
+    "Netherlands": ["corrupt", "corruptie" , "corrupte praktijken" , "omkoping" , "verduistering" , "fraude" , "nepotisme" , "afpersing" , "vriendjespolitiek" , "witwassen van geld" , "onethisch gedrag" , "machtsmisbruik" , "plichtsverzuim" , "wangedrag" , "smeer" , "oneerlijke praktijken", "beïnvloedingshandel", "handel in invloed", "geldverduistering", "belangenverstrengeling", "wanbeleid"],
+    
+    "United_Kingdom": ["corrupt", "corruption" , "corrupt practices" , "bribery" , "embezzlement" , "fraud" , "nepotism" , "extortion" , "cronyism" , "money laundering" , "unethical behavior" , "abuse of power" , "malfeasance" , "misconduct" , "sleaze" , "dishonest dealings", "influence peddling", "trafficking in influence", "kickbacks", "conflict of interest", "pork barrel politics", "collusion"],
+    
+    "Italy": ["corrotto", "corruzione", "appropriazione indebita" , "frode" , "nepotismo" , "estorsione" , "riciclaggio di denaro" , "comportamento non etico" , "abuso di potere" , "reato", "concussione", "collusione", "clientelismo", "malversazione", "commercio di influenza", "traffico di influenza", "tangenti", "conflitto di interessi", "scandalo politico", "malaffare"],
+    
+    "France": ["corrompu", "corruption" , "pratiques corrompues" , "corruption" , "détournement de fonds" , "fraude" , "népotisme" , "extorsion" , "blanchiment d'argent" , "comportement non éthique" , "abus de pouvoir" , "malversation" , "transactions malhonnêtes", "collusion", "favoritisme", "trafic d'influence", "pot-de-vin", "conflit d’intérêts", "scandale politique"],
+    
+    "Hungary": ["korrupció", "megvesztegetés", "sikkasztás", "csalás", "nepotizmus", "zsarolás", "kapcsolati kapitalizmus", "befolyással üzérkedés", "hatalommal való visszaélés", "érdekellentét", "politikai botrány", "állami visszaélések", "gazdasági korrupció", "pártfinanszírozás", "közbeszerzési csalás", "pénzmosás", "lobbiérdekek", "választási csalás", "monopóliumok", "korrupciós botrányok", "pénzügyi visszaélések", "közpénzek eltérítése", "átláthatóság hiánya", "törvénytelen vagyonosodás", "politikai összefonódások", "állami vagyon kisajátítása", "üzleti kartellek", "adócsalás", "büntetlenség", "politikusi vagyonosodás", "közpénzek lenyúlása", "pénzügyi manipuláció", "manipulált közbeszerzések"],
+    
+    "Serbia": ["korupcija", "zloupotreba moći", "podmićivanje", "pronevera", "iznuđivanje", "prevara", "nezakonit uticaj", "karteli", "trgovina uticajem", "pranje novca", "budžetske malverzacije", "nezakonite donacije", "klijentelizam", "nepotizam", "sukob interesa", "favorizovanje", "tajni dogovor", "sumnjivi tenderi", "lobiranje", "etički prekršaji", "stranačke donacije", "nezakoniti ugovori", "javne nabavke", "korupcija u sudstvu", "izborne manipulacije", "namešteni konkursi", "insajderske informacije", "zloupotreba podataka", "medijska korupcija", "privatizacione afere", "politička trgovina", "manipulacija zakonima", "ucenjivanje", "regulatorno zarobljavanje", "politički favoriti"],
+    
+    "Ukraine": ["корупція", "хабар", "вимагання", "шахрайство", "розкрадання", "відмивання коштів", "зловживання владою", "кумівство", "непотизм", "конфлікт інтересів", "незаконне збагачення", "маніпуляція бюджетом", "державне рейдерство", "торгівля посадами", "купівля голосів", "маніпуляція тендерами", "фіктивні контракти", "підкуп виборців", "відкати", "лобізм", "непрозорі тендери", "привласнення коштів", "службові зловживання", "маніпуляція виборами", "фінансова махінація", "таємні угоди", "змови в уряді", "торгівля впливом", "корупційні схеми", "розкрадання бюджету", "незаконне використання держкоштів", "маніпулювання медіа", "вплив олігархів"],
+    
+    "Bulgaria": [
+        "корумпирани", "корупция" , "корумпирани практики" , "подкуп" , "измама" , "измама" , "непотизъм" , "изнудване" , "кронизъм" , "пране на пари" , "неморално поведение" , "злоупотреба с власт" , "незаконно поведение" , "простъпление" , "простъплениe" , "нечестни сделки", "kлиентелизъм", "Присвояване", "Конфликт на интереси", "Политически скандал",
+        "korumpiran", "koruptsiya", "korumpirani praktiki", "podkup", "izmama", "izmama", "nepotizam", "iznudvane", "kronizam", "prane na pari", "nemoralno povedenie", "zlopotreba s vlast", "nezakonno povedenie", "prostaplenie", "prostaplenie", "nechestni sdelki"] #"корумпирани", "корупция"
+}
+
+COUNTRY_LANGS = {
+    "Sweden": "swe",
+    "Netherlands": "nld",
+    "United_Kingdom": "eng",
+    "Italy": "ita",
+    "France": "fra",
+    "Hungary": "hun",
+    "Serbia": "srp",
+    "Ukraine": "ukr",
+    "Bulgaria": "bul"
+}
+
+# Countries queried on language AND source location; the others on language OR location
+STRICT_LOCATION_COUNTRIES = {"United_Kingdom", "France"}
+
+def location_uri(country: str) -> str:
+    """EventRegistry location URIs are the English Wikipedia URLs (what `er.getLocationUri` returns)."""
+    return f"http://en.wikipedia.org/wiki/{country}"
+
+def build_query(country: str, date_start: str, date_end: str) -> Dict:
+    """The notebook's complex query for `country`, restricted to `date_start`..`date_end` (inclusive)."""
+    condition = {
+        "keyword": {"$or": COUNTRY_KEYWORDS[country]},
+        "dateStart": date_start,
+        "dateEnd": date_end,
+        "isDuplicateFilter": "skipDuplicates",
+    }
+    language = COUNTRY_LANGS[country]
+    if country in STRICT_LOCATION_COUNTRIES:
+        return {"$query": {"$and": [{**condition, "lang": language, "sourceLocationUri": location_uri(country)}]}}
+    return {"$query": {"$and": [
+        condition,
+        {"$or": [{"lang": language}, {"sourceLocationUri": location_uri(country)}]},
+    ]}}
@@ -0,0 +1,174 @@
+# fake_eventregistry_server.py
+#
+# Local stand-in for EventRegistry's `POST /api/v1/article/getArticles`, so the collector can be
+# run and tested offline. Articles are generated deterministically from the query (minus its dates)
+# and the day, so every window of a query always returns the same articles in the same order.
+#
+# Usage:
+#     python fake_eventregistry_server.py [--port 8765] [--articles-per-day 40]
+#         [--latency 0.05] [--error-rate 0.05] [--rate-limit-rate 0.05]
+# then point the collector at it with --endpoint http://localhost:8765/api/v1/article/getArticles
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ARTICLES_PATH = "/api/v1/article/getArticles"
+MAX_PAGE_SIZE = 100
+
+def _dates(condition_list):
+    """(dateStart, dateEnd) from the first condition of the `$query` that has them."""
+    for condition in condition_list:
+        if "dateStart" in condition:
+            return date.fromisoformat(condition["dateStart"]), date.fromisoformat(condition["dateEnd"])
+    raise ValueError("query has no dateStart/dateEnd")
+
+def _query_key(query: dict) -> str:
+    """Hash of the query without its dates: the same country query gives the same articles per day."""
+    conditions = [{k: v for k, v in c.items() if k not in ("dateStart", "dateEnd")} for c in query["$query"]["$and"]]
+    return hashlib.sha1(json.dumps(conditions, sort_keys=True).encode("utf-8")).hexdigest()[:10]
+
+def _per_day(key: str, day: date, articles_per_day: int) -> int:
+    # Vary the volume per day (0.5x–1.5x) but keep it reproducible
+    rng = random.Random(f"{key}-{day.isoformat()}")
+    return int(articles_per_day * (0.5 + rng.random()))
+
+def make_article(key: str, day: date, i: int) -> dict:
+    uri = f"{key}-{day.strftime('%Y%m%d')}-{i:04d}"
+    return {
+        "uri": uri,
+        "lang": "eng",
+        "isDuplicate": False,
+        "date": day.isoformat(),
+        "time": f"{i % 24:02d}:{i % 60:02d}:00",
+        "dateTime": f"{day.isoformat()}T{i % 24:02d}:{i % 60:02d}:00Z",
+        "dateTimePub": f"{day.isoformat()}T{i % 24:02d}:{i % 60:02d}:00Z",
+        "dataType": "news",
+        "url": f"https://news{i % 5}.example.com/{uri}",
+        "title": f"Article {i} of {day.isoformat()}",
+        "body": f"Body of article {uri}. The minister denied the corruption allegations.",
+        "source": {"uri": f"news{i % 5}.example.com", "dataType": "news", "title": f"News {i % 5}"},
+        "authors": [],
+        "sentiment": None,
+        "wgt": 0,
+        "relevance": 1,
+    }
+
+class FakeEventRegistry:
+    """Settings and request counters shared by the handler threads."""
+    def __init__(self, articles_per_day: int = 40, latency: float = 0.0, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, seed: int = 0):
+        self.articles_per_day = articles_per_day
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def articles(self, query: dict, page: int, count: int) -> dict:
+        key = _query_key(query)
+        start, end = _dates(query["$query"]["$and"])
+        days = [start + timedelta(days=d) for d in range((end - start).days + 1)]
+        sizes = [_per_day(key, day, self.articles_per_day) for day in days]
+        total = sum(sizes)
+        first = (page - 1) * count
+
+        results = []
+        offset = 0
+        for day, size in zip(days, sizes):
+            if offset + size > first and len(results) < count:
+                for i in range(max(0, first - offset), size):
+                    if len(results) == count:
+                        break
+                    results.append(make_article(key, day, i))
+            offset += size
+        return {"articles": {"results": results, "totalResults": total, "page": page, "count": count,
+                             "pages": max(1, -(-total // count))}}
+
+    def draw_failure(self):
+        """None, 429 or 503, according to the configured injection rates."""
+        with self._lock:
+            self.requests += 1
+            roll = self._rng.random()
+            if roll < self.rate_limit_rate:
+                self.errors += 1
+                return 429
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.errors += 1
+                return 503
+        return None
+
+def make_handler(registry: FakeEventRegistry):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, payload: dict, headers: dict = None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if self.path != ARTICLES_PATH:
+                return self._send(404, {"error": f"unknown path {self.path}"})
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if registry.latency:
+                time.sleep(registry.latency)
+
+            failure = registry.draw_failure()
+            if failure == 429:
+                return self._send(429, {"error": "Too many requests"}, {"Retry-After": "0.1"})
+            if failure == 503:
+                return self._send(503, {"error": "Service temporarily unavailable"})
+            if not request.get("apiKey"):
+                return self._send(200, {"error": "Missing API key"})
+
+            try:
+                query = request["query"]
+                query = json.loads(query) if isinstance(query, str) else query
+                page = int(request.get("articlesPage", 1))
+                count = min(int(request.get("articlesCount", MAX_PAGE_SIZE)), MAX_PAGE_SIZE)
+                self._send(200, registry.articles(query, page, count))
+            except (KeyError, ValueError, TypeError) as e:
+                self._send(200, {"error": f"Invalid query: {e}"})
+
+    return Handler
+
+def start_server(port: int = 0, **settings):
+    """Serve on a background thread; returns (server, registry, endpoint). `port=0` picks a free port."""
+    registry = FakeEventRegistry(**settings)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(registry))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="fake-eventregistry").start()
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}{ARTICLES_PATH}"
+    return server, registry, endpoint
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local fake EventRegistry article API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--articles-per-day", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests answered with 429")
+    args = parser.parse_args()
+
+    server, _, endpoint = start_server(args.port, articles_per_day=args.articles_per_day, latency=args.latency,
+                                       error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate)
+    print(f"🧪 Fake EventRegistry listening on {endpoint}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
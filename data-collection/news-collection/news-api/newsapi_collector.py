@@ -0,0 +1,307 @@
+# newsapi_collector.py
+#
+# Concurrent, resumable recollection of the corruption news articles (Article_recollection_NewsAPI.ipynb).
+# Each country query is split into date windows that are fetched concurrently under a shared request
+# budget. Every page is written as soon as it arrives to
+#   <output>/country=<country>/window=<YYYY-MM-DD>/page-<NNNNN>.jsonl
+# and a cursor per (country, window) is appended to <output>/cursor.jsonl, so an interrupted run
+# continues from the next missing page and a finished window is never fetched again. --export-csv
+# appends only the pages not exported before to {country}_news.csv, so the CSV only ever grows.
+#
+# Usage:
+#     EVENTREGISTRY_API_KEY=... python newsapi_collector.py --output collected/ \
+#         [--countries Italy Netherlands] [--start 2018-01-01] [--end 2024-12-31] [--window-days 7] \
+#         [--max-concurrency 4] [--requests-per-second 2] [--export-csv]
+# Offline: start fake_eventregistry_server.py and add --endpoint http://localhost:8765/api/v1/article/getArticles
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+import pandas as pd
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+sys.path.insert(0, REPO_ROOT)
+
+from collection_queries import COUNTRY_KEYWORDS, build_query
+from utils.checkpoint import CheckpointJournal
+
+# ========== Collector Configuration ==========
+ENDPOINT = "https://eventregistry.org/api/v1/article/getArticles"
+API_KEY_ENV = "EVENTREGISTRY_API_KEY"
+START_DATE = "2018-01-01"
+END_DATE = "2024-12-31"
+WINDOW_DAYS = 7
+PAGE_SIZE = 100             # the API maximum
+MAX_CONCURRENCY = 4         # windows fetched at the same time
+REQUESTS_PER_SECOND = 2.0   # budget shared by all windows
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+TIMEOUT = 120
+CURSOR_FILE = "cursor.jsonl"
+EXPORT_PREFIX = "export|"   # cursor journal records of the pages already exported to a CSV
+
+# Columns of the exported `{country}_news.csv` (what `pd.json_normalize` gives for an article)
+EXPORT_COLUMNS = ["uri", "lang", "isDuplicate", "date", "time", "dateTime", "dateTimePub", "dataType", "sim",
+                  "url", "title", "body", "source.uri", "source.dataType", "source.title", "authors", "image",
+                  "eventUri", "sentiment", "wgt", "relevance"]
+
+class CollectorError(Exception):
+    pass
+
+class RetryableError(CollectorError):
+    """Rate limiting (429) or a server error (5xx): worth another attempt."""
+
+def date_windows(start: str, end: str, days: int = WINDOW_DAYS) -> List[Tuple[str, str]]:
+    """Consecutive inclusive (start, end) windows of `days` days covering `start`..`end`."""
+    windows = []
+    current, last = date.fromisoformat(start), date.fromisoformat(end)
+    while current <= last:
+        window_end = min(current + timedelta(days=days - 1), last)
+        windows.append((current.isoformat(), window_end.isoformat()))
+        current = window_end + timedelta(days=1)
+    return windows
+
+def window_dir(output: str, country: str, window_start: str) -> str:
+    return os.path.join(output, f"country={country}", f"window={window_start}")
+
+def cursor_key(country: str, window: Tuple[str, str]) -> str:
+    return f"{country}|{window[0]}|{window[1]}"
+
+def window_cursors(journal: CheckpointJournal) -> Dict[str, dict]:
+    """The (country, window) cursors of the journal, without its export records."""
+    return {key: cursor for key, cursor in journal.load().items() if not str(key).startswith(EXPORT_PREFIX)}
+
+# ========== Rate Limit ==========
+class RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart across all tasks; backs off everyone on 429."""
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float):
+        self._next = max(self._next, time.monotonic() + seconds)
+
+# ========== Collector ==========
+class NewsCollector:
+    def __init__(self, output: str, api_key: str, endpoint: str = ENDPOINT,
+                 max_concurrency: int = MAX_CONCURRENCY, requests_per_second: float = REQUESTS_PER_SECOND,
+                 page_size: int = PAGE_SIZE, max_retries: int = MAX_RETRIES, backoff_base: float = BACKOFF_BASE):
+        self.output = os.path.expanduser(output)
+        self.api_key = api_key
+        self.endpoint = endpoint
+        self.max_concurrency = max_concurrency
+        self.page_size = page_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.limiter = RateLimiter(requests_per_second)
+        self.journal = CheckpointJournal(os.path.join(self.output, CURSOR_FILE))
+        self.requests = 0
+        self.retries = 0
+        self.pages_written = 0
+        self.articles_written = 0
+
+    # ----- HTTP -----
+    async def _fetch_page(self, session: aiohttp.ClientSession, query: dict, page: int) -> dict:
+        body = {
+            "query": query,
+            "resultType": "articles",
+            "articlesPage": page,
+            "articlesCount": self.page_size,
+            "articlesSortBy": "date",
+            "articlesSortByAsc": True,  # a fixed order keeps page contents stable across runs
+            "articleBodyLen": -1,
+            "apiKey": self.api_key,
+        }
+        retries = 0
+        while True:
+            await self.limiter.wait()
+            self.requests += 1
+            try:
+                async with session.post(self.endpoint, json=body, timeout=aiohttp.ClientTimeout(total=TIMEOUT)) as response:
+                    if response.status == 429 or response.status >= 500:
+                        retry_after = float(response.headers.get("Retry-After", 0) or 0)
+                        if response.status == 429:
+                            self.limiter.pause(retry_after or self.backoff_base)
+                        raise RetryableError(f"HTTP {response.status}")
+                    if response.status >= 400:
+                        raise CollectorError(f"HTTP {response.status}: {(await response.text())[:200]}")
+                    result = await response.json(content_type=None)
+                if "error" in result:
+                    raise CollectorError(f"API error: {result['error']}")
+                return result["articles"]
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError, RetryableError) as e:
+                if retries >= self.max_retries:
+                    raise CollectorError(f"Giving up on page {page} after {retries + 1} attempts: {e!r}") from e
+                delay = self.backoff_base * (2 ** retries) * (1 + random.random() * 0.25)
+                print(f"⚠️ Page {page} failed ({e}); retrying in {delay:.1f}s")
+                retries += 1
+                self.retries += 1
+                await asyncio.sleep(delay)
+
+    # ----- one window -----
+    def _write_page(self, country: str, window: Tuple[str, str], page: int, articles: List[dict]) -> str:
+        folder = window_dir(self.output, country, window[0])
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"page-{page:05d}.jsonl")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for article in articles:
+                f.write(json.dumps(article, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, path)  # a page file is either complete or absent
+        return path
+
+    async def collect_window(self, session: aiohttp.ClientSession, country: str, window: Tuple[str, str],
+                             cursor: Optional[dict]) -> int:
+        """Fetch the pages of one window from its cursor on; returns the number of articles written."""
+        query = build_query(country, *window)
+        page = cursor["next_page"] if cursor else 1
+        pages = cursor["pages"] if cursor else None
+        written = cursor["articles"] if cursor else 0
+        new_articles = 0
+
+        while pages is None or page <= pages:
+            result = await self._fetch_page(session, query, page)
+            pages = result.get("pages", 1) or 1
+            articles = result.get("results", [])
+            self._write_page(country, window, page, articles)
+            written += len(articles)
+            new_articles += len(articles)
+            self.pages_written += 1
+            self.articles_written += len(articles)
+            page += 1
+            self.journal.append(cursor_key(country, window), {
+                "country": country, "window_start": window[0], "window_end": window[1],
+                "next_page": page, "pages": pages, "articles": written,
+                "total_results": result.get("totalResults"), "done": page > pages,
+            })
+        return new_articles
+
+    # ----- all windows -----
+    async def acollect(self, countries: List[str], start: str = START_DATE, end: str = END_DATE,
+                       window_days: int = WINDOW_DAYS) -> Dict[str, int]:
+        cursors = window_cursors(self.journal)
+        todo = []
+        for country in countries:
+            for window in date_windows(start, end, window_days):
+                cursor = cursors.get(cursor_key(country, window))
+                if cursor and cursor.get("done"):
+                    continue
+                todo.append((country, window, cursor))
+        print(f"🗓️ {len(todo)} windows to fetch ({len(countries)} countries, {window_days}-day windows, "
+              f"{len(cursors)} cursors on disk)")
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        per_country = {country: 0 for country in countries}
+        failed = []
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+
+        async with aiohttp.ClientSession(connector=connector) as session:
+            async def run(country, window, cursor):
+                async with semaphore:
+                    try:
+                        written = await self.collect_window(session, country, window, cursor)
+                        per_country[country] += written
+                    except Exception as e:
+                        failed.append((country, window))
+                        print(f"❌ {country} {window[0]}–{window[1]}: {e}")
+
+            started = time.perf_counter()
+            await asyncio.gather(*(run(*item) for item in todo))
+            elapsed = time.perf_counter() - started
+
+        print(f"✅ {self.articles_written} articles in {self.pages_written} pages, {self.requests} requests "
+              f"({self.retries} retries) in {elapsed:.1f}s")
+        if failed:
+            print(f"⚠️ {len(failed)} windows failed; run again to resume them")
+        return per_country
+
+    def collect(self, countries: List[str], start: str = START_DATE, end: str = END_DATE,
+                window_days: int = WINDOW_DAYS) -> Dict[str, int]:
+        return asyncio.run(self.acollect(countries, start, end, window_days))
+
+    def status(self) -> pd.DataFrame:
+        """One row per (country, window) cursor: pages fetched, articles and whether it is done."""
+        cursors = window_cursors(self.journal)
+        return pd.DataFrame(list(cursors.values()))
+
+# ========== Export ==========
+def export_country_csv(output: str, country: str, csv_path: Optional[str] = None) -> str:
+    """
+    Append the collected pages of `country` that were not exported before to `{country}_news.csv`
+    (the notebook's format), one page at a time. Exported pages are recorded in the cursor journal,
+    so a recollection only adds its new pages and the CSV only ever grows, which incremental readers
+    such as utils/attention_store.py rely on. Articles are de-duplicated on `uri`, since windows can
+    overlap between recollections. A CSV without an export record is written from scratch.
+    """
+    output = os.path.expanduser(output)
+    csv_path = csv_path or os.path.join(output, f"{country}_news.csv")
+    country_dir = os.path.join(output, f"country={country}")
+    journal = CheckpointJournal(os.path.join(output, CURSOR_FILE))
+    key = f"{EXPORT_PREFIX}{os.path.abspath(csv_path)}"
+    record = journal.load().get(key) if os.path.exists(csv_path) else None
+
+    exported = set(record["pages"]) if record else set()
+    seen = set(pd.read_csv(csv_path, usecols=["uri"], dtype=str)["uri"]) if record else set()
+    header = not record
+    rows = 0
+    for window in sorted(os.listdir(country_dir)) if os.path.isdir(country_dir) else []:
+        folder = os.path.join(country_dir, window)
+        for name in sorted(n for n in os.listdir(folder) if n.endswith(".jsonl")):
+            page = f"{window}/{name}"
+            if page in exported:
+                continue
+            with open(os.path.join(folder, name), "r", encoding="utf-8") as f:
+                articles = [json.loads(line) for line in f if line.strip()]
+            articles = [a for a in articles if str(a.get("uri")) not in seen]
+            seen.update(str(a.get("uri")) for a in articles)
+            exported.add(page)
+            if not articles:
+                continue
+            df = pd.json_normalize(articles).reindex(columns=EXPORT_COLUMNS)
+            df.to_csv(csv_path, mode="w" if header else "a", header=header, index=False)
+            header = False
+            rows += len(df)
+    journal.append(key, {"country": country, "csv_path": csv_path, "pages": sorted(exported)})
+    print(f"💾 {country}: {rows} new articles {'written' if not record else 'appended'} to {csv_path}")
+    return csv_path
+
+# ========== CLI ==========
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collect the corruption news articles per date window.")
+    parser.add_argument("--output", required=True, help="folder for pages, cursors and exported CSVs")
+    parser.add_argument("--countries", nargs="+", default=list(COUNTRY_KEYWORDS))
+    parser.add_argument("--start", default=START_DATE)
+    parser.add_argument("--end", default=END_DATE)
+    parser.add_argument("--window-days", type=int, default=WINDOW_DAYS)
+    parser.add_argument("--endpoint", default=ENDPOINT)
+    parser.add_argument("--max-concurrency", type=int, default=MAX_CONCURRENCY)
+    parser.add_argument("--requests-per-second", type=float, default=REQUESTS_PER_SECOND)
+    parser.add_argument("--export-csv", action="store_true", help="append new pages to {country}_news.csv after collecting")
+    args = parser.parse_args()
+
+    api_key = os.environ.get(API_KEY_ENV)
+    if not api_key:
+        sys.exit(f"❌ Set {API_KEY_ENV} to your EventRegistry API key")
+
+    collector = NewsCollector(args.output, api_key, args.endpoint, args.max_concurrency, args.requests_per_second)
+    collector.collect(args.countries, args.start, args.end, args.window_days)
+    if args.export_csv:
+        for country in args.countries:
+            export_country_csv(args.output, country)
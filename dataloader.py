@@ -1,6 +1,8 @@
 import os
+import hashlib
+import numpy as np
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional
 from config import ANNOTATION_PATH, ANNOTATION_FILE, VALID_CORRUPTION_LABELS, SELECTED_COUNTRIES
 
 def load_selected_outlets(outlet_dir: str, countries: List[str]) -> Dict[str, List[str]]:
@@ -54,44 +56,172 @@ def load_and_prepare_data(news_folder: str, countries: List[str], outlet_dir: st
     
     return pd.concat(all_data, ignore_index=True)
 
-def balanced_sample(df: pd.DataFrame, total_samples: int, countries: List[str]) -> pd.DataFrame:
-    df = df.copy()
+# ========== Streaming Ingest ==========
+
+NEEDED_COLUMNS = ["title", "body", "source.uri", "dateTime", "uri"]
+DEFAULT_CHUNKSIZE = 50_000
+
+def _text_digest(title, body) -> bytes:
+    # NaN and "" must hash differently, as in drop_duplicates
+    parts = ["\x00" if pd.isna(v) else str(v) for v in (title, body)]
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).digest()
+
+def iter_prepared_chunks(news_folder: str, countries: List[str], outlet_dir: str,
+                         chunksize: int = DEFAULT_CHUNKSIZE,
+                         usecols: Optional[List[str]] = NEEDED_COLUMNS) -> Iterator[pd.DataFrame]:
+    """
+    Stream each `{country}_news.csv` in chunks of `chunksize` rows, reading only `usecols`.
+    Duplicates on (title, body) are removed across chunks with a set of 16-byte digests,
+    then rows are filtered by outlet. Yields prepared batches, so memory stays bounded.
+    """
+    news_folder = os.path.expanduser(news_folder)
+    outlet_dir = os.path.expanduser(outlet_dir)
+    selected_outlets = load_selected_outlets(outlet_dir, countries)
+    wanted = set(usecols) if usecols else None
+
+    for country in countries:
+        file_path = os.path.join(news_folder, f"{country}_news.csv")
+        print(f"🔍 Looking for: {file_path}")
+        if not os.path.exists(file_path):
+            print(f"❌ File not found: {file_path}")
+            continue
+        print(f"✅ Found: {file_path}")
+
+        allowed_outlets = set(selected_outlets.get(country, []))
+        if not allowed_outlets:
+            print(f"⚠️ No selected outlets for {country}, skipping all rows")
+            continue
+
+        seen = set()
+        kept = 0
+        reader = pd.read_csv(
+            file_path,
+            usecols=(lambda col: col in wanted) if wanted else None,
+            chunksize=chunksize
+        )
+        for chunk in reader:
+            # Dedupe before outlet filtering, matching drop_duplicates on the full file
+            digests = [_text_digest(t, b) for t, b in zip(chunk["title"], chunk["body"])]
+            keep = []
+            for digest in digests:
+                keep.append(digest not in seen)
+                seen.add(digest)
+            chunk = chunk[keep].copy()
+
+            chunk["source.uri"] = chunk["source.uri"].astype(str).str.strip().str.lower()
+            chunk = chunk[chunk["source.uri"].isin(allowed_outlets)]
+            if chunk.empty:
+                continue
+
+            chunk["country"] = country
+            chunk["combined_text"] = chunk["title"] + "\n" + chunk["body"]
+            kept += len(chunk)
+            yield chunk
+
+        print(f"📰 {country}: {kept} articles after outlet filtering")
+
+def load_and_prepare_data_streaming(news_folder: str, countries: List[str], outlet_dir: str,
+                                    chunksize: int = DEFAULT_CHUNKSIZE,
+                                    usecols: Optional[List[str]] = NEEDED_COLUMNS) -> pd.DataFrame:
+    """Same result as `load_and_prepare_data`, restricted to `usecols`, with bounded peak memory."""
+    batches = list(iter_prepared_chunks(news_folder, countries, outlet_dir, chunksize, usecols))
+    if not batches:
+        raise ValueError(f"❌ No valid data after outlet filtering for countries: {countries}")
+    return pd.concat(batches, ignore_index=True)
+
+def load_and_prepare_parquet(parquet_root: str, countries: List[str], outlet_dir: str,
+                             start_month: Optional[str] = None, end_month: Optional[str] = None,
+                             columns: Optional[List[str]] = NEEDED_COLUMNS) -> pd.DataFrame:
+    """
+    Parquet counterpart of `load_and_prepare_data`: only the requested countries, months
+    ("YYYY-MM", inclusive) and columns are read from the dataset written by `corpus_store.py`.
+    Duplicates are dropped within the selected months.
+    """
+    from corpus_store import read_dataset
+
+    selected_outlets = load_selected_outlets(os.path.expanduser(outlet_dir), countries)
+    read_columns = None if columns is None else list(dict.fromkeys(columns + ["country"]))
+    df = read_dataset(columns=read_columns, parquet_root=parquet_root, countries=countries,
+                      start_month=start_month, end_month=end_month)
+
+    all_data = []
+    for country in countries:
+        country_df = df[df["country"] == country].drop_duplicates(subset=["title", "body"])
+        country_df = country_df.assign(**{"source.uri": country_df["source.uri"].astype(str).str.strip().str.lower()})
+        country_df = country_df[country_df["source.uri"].isin(selected_outlets.get(country, []))]
+        print(f"📰 {country}: {len(country_df)} articles after outlet filtering")
+        if not country_df.empty:
+            all_data.append(country_df.assign(combined_text=country_df["title"] + "\n" + country_df["body"]))
+
+    if not all_data:
+        raise ValueError(f"❌ No valid data after outlet filtering for countries: {countries}")
+    return pd.concat(all_data, ignore_index=True)
+
+# ========== Stratified Sampling ==========
+
+def allocate_largest_remainder(sizes: pd.Series, n: int) -> pd.Series:
+    """
+    Split `n` over strata proportionally to `sizes` so that quotas sum to exactly
+    min(n, sizes.sum()): floor every share, then hand out the remaining units to the
+    strata with the largest fractional remainders (ties go to the earlier stratum).
+    """
+    n = int(min(n, sizes.sum()))
+    if n == 0 or sizes.sum() == 0:
+        return pd.Series(0, index=sizes.index)
+    exact = sizes / sizes.sum() * n
+    quotas = np.floor(exact).astype(int)
+    remaining = n - int(quotas.sum())
+    if remaining > 0:
+        remainders = (exact - quotas).to_numpy()
+        winners = np.argsort(-remainders, kind="stable")[:remaining]
+        quotas.iloc[winners] += 1
+    return quotas
+
+def stratified_sample(df: pd.DataFrame, n: int, strata: List[str], by: Optional[str] = None,
+                      seed: int = 42) -> pd.DataFrame:
+    """
+    Draw a proportionally stratified random sample in one pass over `df`.
+
+    Every row gets one random key; rows are ranked within their stratum with
+    `groupby().cumcount()` over the key order, and a row is kept when its rank is below
+    the stratum quota from `allocate_largest_remainder`. With `by` (e.g. "country"),
+    `n` rows are drawn for every value of `by`. Rows with a missing stratum value are
+    never drawn. The same seed always gives the same sample.
+    """
+    group_cols = ([by] if by else []) + [c for c in strata if c != by]
+    rng = np.random.default_rng(seed)
+    shuffled = df.iloc[np.argsort(rng.random(len(df)), kind="stable")]
+
+    grouper = shuffled.groupby(group_cols, sort=True, dropna=True)
+    sizes = grouper.size()
+    if by:
+        quotas = sizes.groupby(level=0, group_keys=False).apply(lambda s: allocate_largest_remainder(s, n))
+        quotas = quotas.reindex(sizes.index)
+    else:
+        quotas = allocate_largest_remainder(sizes, n)
+
+    group_ids = grouper.ngroup().fillna(-1).to_numpy(dtype=int)  # -1 / NaN: missing stratum value
+    quota_per_row = np.where(group_ids >= 0, quotas.to_numpy()[np.maximum(group_ids, 0)], 0)
+    keep = grouper.cumcount().to_numpy() < quota_per_row
+    return shuffled[keep].sort_index()
+
+def balanced_sample(df: pd.DataFrame, total_samples: int, countries: List[str],
+                    strata: List[str] = ("year", "month"), seed: int = 42) -> pd.DataFrame:
+    """
+    Draw `total_samples // len(countries)` articles per country, stratified
+    proportionally over `strata` (by default the year and month of `dateTime`).
+    """
+    df = df[df['country'].isin(countries)].copy()
     df['dateTime'] = pd.to_datetime(df['dateTime'], errors='coerce')  # convert to datetime, safely
-    
+
     # Extract year and month for stratification
     df['year'] = df['dateTime'].dt.year
     df['month'] = df['dateTime'].dt.month
 
     per_country = total_samples // len(countries)
-    sampled_dfs = []
-
-    for country in countries:
-        country_df = df[df['country'] == country]
+    result = stratified_sample(df, per_country, strata=list(strata), by='country', seed=seed)
+    result = result.reset_index(drop=True)
 
-        # Number of samples to draw for this country
-        n_samples = per_country
-
-        # Group by year and month to stratify
-        groups = country_df.groupby(['year', 'month'])
-        
-        # Calculate number of samples per group proportional to group size
-        group_sizes = groups.size()
-        group_proportions = group_sizes / group_sizes.sum()
-        group_samples = (group_proportions * n_samples).round().astype(int)
-
-        sampled_groups = []
-        for (year, month), n in group_samples.items():
-            group_data = groups.get_group((year, month))
-            if n > len(group_data):
-                n = len(group_data)  # sample at most group size
-            if n > 0:
-                sampled_groups.append(group_data.sample(n, random_state=42))
-
-        country_sampled = pd.concat(sampled_groups)
-        sampled_dfs.append(country_sampled)
-
-    result = pd.concat(sampled_dfs).reset_index(drop=True)
-    
     # Clean up helper columns if you want
     result = result.drop(columns=['year', 'month'], errors='ignore')
 
@@ -0,0 +1,77 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.attention_store import AttentionStore, update_from_csv
+from utils.term_matcher import TermMatcher
+
+MATCHER = TermMatcher(["minister"], ["bribe"])
+
+def _write(path, rows, mode="w"):
+    pd.DataFrame(rows, columns=["dateTime", "body"]).to_csv(path, mode=mode, header=(mode == "w"), index=False)
+
+def test_appended_out_of_order_rows_are_counted(tmp_path):
+    news = tmp_path / "Italy_news.csv"
+    _write(news, [("2024-01-02T10:00:00Z", "The minister took a bribe."),
+                  ("2024-01-20T10:00:00Z", "The minister denied the bribe.")])
+    store = AttentionStore(str(tmp_path / "attention.sqlite"))
+    assert update_from_csv(store, "Italy", MATCHER, news_folder=str(tmp_path)) == 2
+
+    # A backfilled window lands after the mark has already moved past its dates
+    _write(news, [("2024-01-03T10:00:00Z", "A bribe for the minister."),
+                  ("2024-01-25T10:00:00Z", "Weather report.")], mode="a")
+    os.utime(news, (1, 1))  # make sure the mtime check sees a change
+    assert update_from_csv(store, "Italy", MATCHER, news_folder=str(tmp_path)) == 2
+
+    weekly = store.corpus_weekly().set_index("week")
+    assert weekly.loc["2024-01-01", "articles"] == 2
+    assert weekly.loc["2024-01-01", "corruption_count"] == 2
+    assert weekly["articles"].sum() == 4
+    assert store.high_water(str(news)) == pd.Timestamp("2024-01-25T10:00:00")
+
+def _collect(output, endpoint, start, end):
+    from newsapi_collector import NewsCollector
+    collector = NewsCollector(str(output), api_key="test", endpoint=endpoint, requests_per_second=500)
+    collector.collect(["Italy"], start, end, window_days=7)
+
+@pytest.mark.parametrize("rewrite", [False, True])
+def test_backfilled_export_is_counted_once(tmp_path, rewrite):
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    "data-collection", "news-collection", "news-api"))
+    from fake_eventregistry_server import start_server
+    from newsapi_collector import export_country_csv
+
+    matcher = TermMatcher(["minister"], ["corruption"])
+    collected = tmp_path / "collected"
+    csv_path = collected / "Italy_news.csv"
+    server, _, endpoint = start_server(articles_per_day=40)
+    try:
+        # Windows 01-01 and 01-15 first; the CSV is well over FINGERPRINT_BYTES
+        _collect(collected, endpoint, "2024-01-01", "2024-01-07")
+        _collect(collected, endpoint, "2024-01-15", "2024-01-21")
+        export_country_csv(str(collected), "Italy")
+        store = AttentionStore(str(tmp_path / "attention.sqlite"))
+        first = update_from_csv(store, "Italy", matcher, news_folder=str(collected))
+
+        # The 01-08 window is collected after the mark moved past it. It is either appended, or the
+        # CSV is exported again from scratch, which puts the window in the middle of the file.
+        _collect(collected, endpoint, "2024-01-08", "2024-01-14")
+        if rewrite:
+            os.remove(csv_path)
+        export_country_csv(str(collected), "Italy")
+        backfilled = update_from_csv(store, "Italy", matcher, news_folder=str(collected))
+        assert backfilled > 0
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    rebuilt = AttentionStore(str(tmp_path / "rebuilt.sqlite"))
+    assert update_from_csv(rebuilt, "Italy", matcher, news_folder=str(collected)) == first + backfilled
+    assert first + backfilled == len(pd.read_csv(csv_path))
+    incremental = store.corpus_weekly().set_index("week")
+    assert "2024-01-08" in incremental.index
+    pd.testing.assert_frame_equal(incremental, rebuilt.corpus_weekly().set_index("week"))
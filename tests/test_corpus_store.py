@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus_store import UNKNOWN_MONTH, _prepare_for_parquet, read_dataset, write_partitioned
+
+def test_month_range_excludes_undated_rows(tmp_path):
+    df = pd.DataFrame({"uri": ["a", "b", "c"], "body": ["x", "y", "z"],
+                       "dateTime": ["2024-01-05T10:00:00Z", "2024-03-05T10:00:00Z", "not a date"]})
+    write_partitioned(_prepare_for_parquet(df, "Italy"), str(tmp_path / "news"), "Italy-00000")
+
+    def uris(**months):
+        return sorted(read_dataset("news", str(tmp_path), columns=["uri"], **months)["uri"])
+
+    assert uris() == ["a", "b", "c"]
+    assert uris(start_month="2024-02") == ["b"]
+    assert uris(end_month="2024-02") == ["a"]
+    assert read_dataset("news", str(tmp_path))["year_month"].tolist().count(UNKNOWN_MONTH) == 1
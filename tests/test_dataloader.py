@@ -0,0 +1,51 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataloader import allocate_largest_remainder, stratified_sample
+
+def _corpus(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "uri": [f"u{i}" for i in range(n)],
+        "country": rng.choice(["Italy", "Bulgaria", "Netherlands"], size=n, p=[0.6, 0.3, 0.1]),
+        "month": rng.choice(np.arange(1, 13), size=n).astype(float),
+    })
+
+def test_quotas_sum_exactly_to_n():
+    sizes = pd.Series([333, 333, 334, 1])
+    for n in (1, 7, 100, 999, 1001, 5000):
+        quotas = allocate_largest_remainder(sizes, n)
+        assert quotas.sum() == min(n, sizes.sum())
+        assert (quotas <= sizes).all()
+
+def test_sample_has_exact_totals_per_country():
+    df = _corpus()
+    sample = stratified_sample(df, 250, strata=["month"], by="country")
+    assert sample.groupby("country").size().to_dict() == {"Bulgaria": 250, "Italy": 250, "Netherlands": 250}
+    assert sample["uri"].is_unique
+
+    small = stratified_sample(df, 10_000, strata=["month"], by="country")
+    assert len(small) == len(df)  # a country with fewer rows than n is taken whole
+
+def test_sample_is_proportional_over_strata():
+    df = _corpus()
+    sample = stratified_sample(df, 1000, strata=["country"])
+    expected = df["country"].value_counts(normalize=True) * 1000
+    assert (sample["country"].value_counts().reindex(expected.index) - expected).abs().max() < 1
+
+def test_same_seed_same_sample():
+    df = _corpus()
+    first = stratified_sample(df, 300, strata=["month"], by="country", seed=7)
+    assert first["uri"].tolist() == stratified_sample(df, 300, strata=["month"], by="country", seed=7)["uri"].tolist()
+    assert first["uri"].tolist() != stratified_sample(df, 300, strata=["month"], by="country", seed=8)["uri"].tolist()
+
+def test_rows_without_stratum_are_never_drawn():
+    df = _corpus()
+    df.loc[df.index[:500], "month"] = np.nan
+    sample = stratified_sample(df, len(df), strata=["month"])
+    assert len(sample) == len(df) - 500 and sample["month"].notna().all()
@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.highlighting import Highlighter, highlight_keywords, highlight_translated_text
+
+TEXT = ("The mayor was arrested on Monday. Prosecutors say he accepted bribes for the contract, "
+        "a clear case of corruption.  The city council has not commented.")
+
+def test_evidence_matches_despite_spacing_and_punctuation():
+    evidence = ["prosecutors say he accepted bribes for the contract a clear case of corruption"]
+    out = highlight_translated_text(TEXT, evidence)
+    assert "<highlight>Prosecutors say he accepted bribes for the contract, a clear case of corruption</highlight>" in out
+    assert out.replace("<highlight>", "").replace("</highlight>", "") == TEXT
+
+def test_each_evidence_sentence_is_marked_once():
+    text = "He denied it. He denied it."
+    assert highlight_translated_text(text, ["he denied it", "He denied it."]).count("<highlight>") == 1
+
+def test_key_terms_inside_evidence_are_not_nested():
+    out = Highlighter().highlight(TEXT, ["Prosecutors say he accepted bribes for the contract, a clear case of corruption."])
+    assert out.count("<highlight>") == 1
+
+def test_highlighting_highlighted_text_does_not_nest_tags():
+    evidence = highlight_translated_text(TEXT, ["a clear case of corruption"])
+    out = highlight_keywords(evidence, ["corruption", "council"])
+    assert "<highlight>a clear case of corruption</highlight>" in out
+    assert "<highlight>council</highlight>" in out
+    assert out.count("<highlight>") == 2
+    assert highlight_keywords(out, ["corruption", "council"]) == out
+
+def test_highlight_dataframe_splits_joined_evidence():
+    df = pd.DataFrame({"translated_text": [TEXT, None],
+                       "llm_evidence": ["The mayor was arrested on Monday; The city council has not commented", None]})
+    out = Highlighter(key_terms=[]).highlight_dataframe(df)
+    assert out.loc[0, "highlighted_text"].count("<highlight>") == 2
+    assert pd.isna(out.loc[1, "highlighted_text"])
@@ -0,0 +1,39 @@
+import os
+import sys
+from itertools import count
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import llm_cache
+from utils.llm_cache import LLMCache
+
+def test_hit_and_miss(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.sqlite"))
+    key = cache.make_key("model", "prompt", "text", 0.0)
+    assert key != cache.make_key("model", "prompt", "text", None)
+    assert key != cache.make_key("other", "prompt", "text", 0.0)
+
+    assert cache.get(key) is None
+    cache.put(key, "answer", model="model")
+    assert cache.get(key) == "answer"
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+
+    reopened = LLMCache(str(tmp_path / "cache.sqlite"))
+    assert reopened.get(key) == "answer"
+    reopened.close()
+
+def test_evicts_least_recently_used(tmp_path, monkeypatch):
+    clock = count(1)
+    monkeypatch.setattr(llm_cache.time, "time", lambda: float(next(clock)))
+    cache = LLMCache(str(tmp_path / "cache.sqlite"), max_bytes=350)
+
+    for key in "abc":
+        cache.put(key, key * 100)
+    assert cache.get("a") == "a" * 100  # "b" is now the least recently used
+    cache.put("d", "d" * 100)           # 400 bytes > 350: evict down to 315
+
+    assert cache.get("b") is None
+    assert [cache.get(key) is not None for key in "acd"] == [True, True, True]
+    assert cache.stats()["evictions"] == 1 and cache.stats()["size_mb"] * 1024 ** 2 == 300
+    cache.close()
@@ -0,0 +1,48 @@
+import os
+import random
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.near_duplicates import NearDuplicateIndex, mark_near_duplicates, propagate_results
+
+def _article(rng, n_words=300):
+    vocabulary = [f"w{i}" for i in range(5000)]
+    return " ".join(rng.choice(vocabulary) for _ in range(n_words))
+
+def _near_copy(rng, text):
+    """Syndicated copy: a different byline and one extra closing sentence (~0.9 Jaccard)."""
+    return f"By {rng.choice(['Reuters', 'ANSA', 'AFP'])} staff. {text} The ministry did not respond to a request for comment."
+
+def test_near_copies_are_found():
+    rng = random.Random(0)
+    index = NearDuplicateIndex()
+    originals = [_article(rng) for _ in range(100)]
+    for i, text in enumerate(originals):
+        assert index.add(f"orig{i}", text) == f"orig{i}"
+
+    found = sum(index.add(f"copy{i}", _near_copy(rng, text)) == f"orig{i}" for i, text in enumerate(originals))
+    assert found >= 98
+
+def test_unrelated_articles_stay_apart():
+    rng = random.Random(1)
+    index = NearDuplicateIndex()
+    for i in range(200):
+        index.add(i, _article(rng))
+    assert len(index.members()) == 200
+
+def test_every_added_column_is_propagated():
+    rng = random.Random(2)
+    text = _article(rng)
+    df = pd.DataFrame({"uri": ["a", "b", "c"], "country": "Italy",
+                       "combined_text": [text, _near_copy(rng, text), _article(rng)]})
+    df = mark_near_duplicates(df)
+    assert df["is_representative"].tolist() == [True, False, True]
+
+    translated = df[df["is_representative"]].assign(translated_text=["EN a", "EN c"], detected_lang=["it", "en"])
+    added = ["translated_text", "detected_lang"]
+    out = propagate_results(df.join(translated[added]), added)
+    assert out["translated_text"].tolist() == ["EN a", "EN a", "EN c"]
+    assert out["detected_lang"].tolist() == ["it", "it", "en"]
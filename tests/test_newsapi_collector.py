@@ -0,0 +1,59 @@
+import os
+import sys
+
+import pandas as pd
+
+NEWS_API = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "data-collection", "news-collection", "news-api")
+sys.path.insert(0, NEWS_API)
+
+from fake_eventregistry_server import start_server
+from newsapi_collector import NewsCollector, export_country_csv
+
+def _collector(output, endpoint):
+    return NewsCollector(str(output), api_key="test", endpoint=endpoint, max_concurrency=4,
+                         requests_per_second=500, backoff_base=0.01)
+
+def test_collect_resumes_and_reports_every_article(tmp_path):
+    server, registry, endpoint = start_server(articles_per_day=30, rate_limit_rate=0.1, error_rate=0.1)
+    try:
+        collector = _collector(tmp_path, endpoint)
+        per_country = collector.collect(["Italy"], "2024-01-01", "2024-01-28", window_days=3)
+        assert per_country["Italy"] == collector.articles_written > 0
+        assert collector.status()["done"].all()
+
+        requests = registry.requests
+        again = _collector(tmp_path, endpoint)
+        assert again.collect(["Italy"], "2024-01-01", "2024-01-28", window_days=3) == {"Italy": 0}
+        assert registry.requests == requests  # finished windows are never fetched again
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_export_appends_only_new_pages(tmp_path):
+    server, _, endpoint = start_server(articles_per_day=20)
+    try:
+        collector = _collector(tmp_path, endpoint)
+        collector.collect(["Italy"], "2024-01-15", "2024-01-21", window_days=7)
+        csv_path = export_country_csv(str(tmp_path), "Italy")
+        with open(csv_path, "rb") as f:
+            first = f.read()
+
+        # A backfilled, earlier window is appended, not merged into the middle of the file
+        collector.collect(["Italy"], "2024-01-08", "2024-01-14", window_days=7)
+        export_country_csv(str(tmp_path), "Italy")
+        with open(csv_path, "rb") as f:
+            second = f.read()
+        assert second.startswith(first) and len(second) > len(first)
+
+        export_country_csv(str(tmp_path), "Italy")
+        with open(csv_path, "rb") as f:
+            assert f.read() == second
+
+        df = pd.read_csv(csv_path)
+        assert df["uri"].is_unique
+        assert df["date"].min() == "2024-01-08"
+        assert len(df) == collector.articles_written
+    finally:
+        server.shutdown()
+        server.server_close()
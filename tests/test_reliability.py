@@ -0,0 +1,32 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.reliability import MISSING, ReliabilityData, build_tensor, overall_alpha, pairwise_statistics
+
+def test_alpha_matches_krippendorffs_nominal_example():
+    # Krippendorff (2011), "Computing Krippendorff's Alpha-Reliability": 4 coders, 12 units, nominal alpha 0.743
+    M = None
+    values = [[1, 2, 3, 3, 2, 1, 4, 1, 2, M, M, M],
+              [1, 2, 3, 3, 2, 2, 4, 1, 2, 5, M, 3],
+              [M, 3, 3, 3, 2, 3, 4, 2, 2, 5, 1, M],
+              [1, 2, 3, 3, 2, 4, 4, 1, 2, 5, 1, M]]
+    tensor = np.array([[MISSING if v is None else v - 1 for v in coder] for coder in values], dtype=np.int8)
+    data = ReliabilityData(tensor[..., None], list("ABCD"), list(range(12)), ["frame"], n_categories=5)
+    assert overall_alpha(data)[0] == pytest.approx(0.743, abs=5e-4)
+
+def test_kappa_and_agreement_for_a_known_table():
+    # 20 both Present, 5 A only, 10 B only, 15 both Not Present: p_o = 0.70, p_e = 0.50, kappa = 0.40, alpha = 0.40
+    a = ["Present"] * 25 + ["Not Present"] * 25
+    b = ["Present"] * 20 + ["Not Present"] * 5 + ["Present"] * 10 + ["Not Present"] * 15
+    annotations = pd.DataFrame({"user_id": ["A"] * 50 + ["B"] * 50, "uri": list(range(50)) * 2, "frame": a + b})
+    row = pairwise_statistics(build_tensor(annotations, frame_labels=["frame"])).iloc[0]
+    assert row["n_items"] == 50
+    assert row["% agreement"] == 70.0
+    assert row["cohen_kappa"] == pytest.approx(0.40)
+    assert row["alpha"] == pytest.approx(0.40)  # 1 - 30 disagreeing pairs / 50 expected
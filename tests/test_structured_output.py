@@ -0,0 +1,78 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import classifier
+from utils.llm_cache import LLMCache
+from utils.structured_output import (CLASSIFIER_SCHEMA, MULTI_FRAME_SCHEMA, JsonValueScanner,
+                                     StructuredOutputError, validate)
+
+ANSWER = {"highlights": ["The minister took a bribe."], "label": "Yes", "rationale": "About a bribe.", "confidence": 90.0}
+
+def test_validate_accepts_and_normalizes():
+    assert validate(ANSWER, CLASSIFIER_SCHEMA)["confidence"] == 90
+    frames = {"frames": [{"frame_index": 1, "frame": "f", "rationale": "r", "confidence": 5, "evidence": "e"}]}
+    assert validate(frames, MULTI_FRAME_SCHEMA) == frames
+
+@pytest.mark.parametrize("change, path", [
+    ({"label": "Maybe"}, "$.label"),
+    ({"confidence": 101}, "$.confidence"),
+    ({"confidence": 90.5}, "$.confidence"),
+    ({"confidence": True}, "$.confidence"),
+    ({"highlights": ["ok", 3]}, "$.highlights[1]"),
+    ({"extra": 1}, "$: unexpected"),
+])
+def test_validate_names_the_offending_path(change, path):
+    with pytest.raises(StructuredOutputError, match=path.replace("$", r"\$").replace("[", r"\[")):
+        validate({**ANSWER, **change}, CLASSIFIER_SCHEMA)
+
+def test_validate_reports_missing_keys():
+    with pytest.raises(StructuredOutputError, match="missing"):
+        validate({"label": "Yes"}, CLASSIFIER_SCHEMA)
+
+def test_scanner_stops_at_end_of_first_value_across_chunks():
+    reply = 'Sure: {"rationale": "a } and a \\" inside", "list": [1, {"x": "]"}]}\n\nTrailing text'
+    end = reply.index("}\n") + 1
+    for size in (1, 3, 7, len(reply)):
+        scanner = JsonValueScanner()
+        chunks = [reply[i:i + size] for i in range(0, len(reply), size)]
+        stopped_after = next(i for i, chunk in enumerate(chunks) if scanner(chunk))
+        assert (stopped_after + 1) * size >= end > stopped_after * size
+
+def test_scanner_waits_for_unfinished_value():
+    scanner = JsonValueScanner()
+    assert not scanner('[{"frame": "a"}, ')
+    assert scanner('{"frame": "b"}]')
+
+class _FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    def chat_content(self, model, messages, **kwargs):
+        self.calls.append(kwargs)
+        return json.dumps(ANSWER)
+
+def test_classifier_cache_key_covers_schema_and_temperature(tmp_path, monkeypatch):
+    cache = LLMCache(str(tmp_path / "cache.sqlite"))
+    client = _FakeClient()
+    monkeypatch.setattr(classifier, "get_cache", lambda: cache)
+    monkeypatch.setattr(classifier, "get_client", lambda: client)
+    try:
+        assert classifier.classify_article("The minister took a bribe.", structured=True)["confidence"] == 90
+        classifier.classify_article("The minister took a bribe.", structured=True)
+        assert len(client.calls) == 1
+
+        monkeypatch.setattr(classifier, "TEMPERATURE", 0.0)
+        classifier.classify_article("The minister took a bribe.", structured=True)
+        assert len(client.calls) == 2 and client.calls[-1]["options"] == {"temperature": 0.0}
+
+        schema = {**CLASSIFIER_SCHEMA, "required": ["label"]}
+        monkeypatch.setattr(classifier, "CLASSIFIER_SCHEMA", schema)
+        classifier.classify_article("The minister took a bribe.", structured=True)
+        assert len(client.calls) == 3 and client.calls[-1]["format"] is schema
+    finally:
+        cache.close()
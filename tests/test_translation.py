@@ -0,0 +1,53 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import translation
+from translation import estimate_tokens, route_language, split_text_into_chunks, translate_chunk_batch
+
+ITALIAN = "Il ministro ha respinto tutte le accuse di corruzione davanti al parlamento."
+
+@pytest.mark.parametrize("text", [
+    "\n\n".join([ITALIAN * 3] * 20),
+    " ".join([ITALIAN] * 200),
+    "Vedi https://example.org/" + "a" * 5000 + " per i dettagli.",
+    "Правителството" * 400,
+    "汚職" * 3000,
+], ids=["paragraphs", "one-paragraph", "long-url", "cyrillic-run", "cjk-run"])
+def test_chunks_stay_within_budget_and_keep_the_text(text):
+    chunks = split_text_into_chunks(text, max_tokens=100)
+    assert all(estimate_tokens(chunk) <= 100 for chunk in chunks)
+    assert "".join(chunks).replace(" ", "") == "".join(text.split())
+
+def test_short_text_is_one_chunk():
+    assert split_text_into_chunks(ITALIAN) == [ITALIAN]
+
+@pytest.mark.parametrize("detected, confidence, expected", [
+    ("en", 0.99, "en"),   # confident English is skipped
+    ("nl", 0.95, "nl"),   # confident other corpus language is rerouted
+    ("en", 0.58, "it"),   # proper nouns and wire credits stay with the country default
+    ("nl", 0.78, "it"),
+    ("und", 0.0, "it"),
+])
+def test_route_language_needs_confidence(detected, confidence, expected):
+    assert route_language(detected, "it", confidence) == expected
+
+def test_batch_falls_back_to_single_chunks_on_marker_mismatch(monkeypatch):
+    monkeypatch.setattr(translation, "request_translation",
+                        lambda system_prompt, text: "[[1]]\nThe minister denied.\n[[3]]\nToo many.")
+    single = []
+    monkeypatch.setattr(translation, "translate_chunk_with_gemma3",
+                        lambda chunk, lang: single.append(chunk) or f"EN {chunk}")
+
+    chunks = ["Il ministro ha negato.", "La procura indaga."]
+    assert translate_chunk_batch(chunks, "it") == [f"EN {chunk}" for chunk in chunks]
+    assert single == chunks
+
+def test_batch_splits_reply_on_markers(monkeypatch):
+    monkeypatch.setattr(translation, "request_translation",
+                        lambda system_prompt, text: "[[1]]\nThe minister denied.\n\n[[2]]\nProsecutors investigate.")
+    assert translate_chunk_batch(["Il ministro ha negato.", "La procura indaga."], "it") == \
+        ["The minister denied.", "Prosecutors investigate."]
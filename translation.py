@@ -1,12 +1,18 @@
 # translate.py
 
 import os
+import re
 import time
 import pandas as pd
-import requests
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
 from tqdm import tqdm
 
+from utils.language_id import detect_languages_with_confidence, UNDETERMINED
+from utils.llm_cache import get_cache
+from utils.ollama_client import get_client
+from utils.telemetry import record_articles, stage
+
 # Config / Constants
 
 COUNTRY_TO_LANG = {
@@ -16,8 +22,19 @@ COUNTRY_TO_LANG = {
     "United_Kingdom": "en"
 }
 
-MAX_CHUNK_SIZE = 1500
+TRANSLATION_MODEL = "zongwei/gemma3-translator:4b"
+TRANSLATION_NUM_CTX = 4096     # context window requested from Ollama for translation calls
+MAX_CHUNK_TOKENS = 400         # token budget of a single chunk (~1500 Latin characters)
+BATCH_TOKEN_BUDGET = 1200      # chunks packed into one request, leaving room for the translation
+CHARS_PER_TOKEN_LATIN = 4.0    # rough tokenizer ratios; Cyrillic and other scripts split finer
+CHARS_PER_TOKEN_OTHER = 2.0
 MIN_TRANSLATION_RATIO = 0.7
+USE_LANGUAGE_ID = True  # detect language per article and chunk before translating
+MIN_LANGUAGE_CONFIDENCE = 0.8  # below this, a detection never skips or reroutes text
+MAX_IN_FLIGHT = 8  # concurrent chunk requests in concurrent mode (also capped by the client's MAX_CONCURRENCY)
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])[\"'»”)]*\s+")
+SEGMENT_MARKER = re.compile(r"^\s*\[\[(\d+)\]\]\s*$", re.MULTILINE)
 
 # ========== Utils ==========
 
@@ -25,31 +42,126 @@ def is_probably_same_language(original: str, translation: str, threshold=0.3) ->
     non_ascii_chars = sum(1 for c in translation if ord(c) > 127)
     return non_ascii_chars / max(len(translation), 1) > threshold
 
-def split_text_into_chunks(text: str, max_chunk_size=MAX_CHUNK_SIZE) -> List[str]:
-    paragraphs = text.split("\n\n")
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate: ASCII text packs ~4 characters per token, other scripts ~2."""
+    non_ascii = sum(1 for c in text if ord(c) > 127)
+    ascii_chars = len(text) - non_ascii
+    return int(ascii_chars / CHARS_PER_TOKEN_LATIN + non_ascii / CHARS_PER_TOKEN_OTHER) + 1
+
+def split_sentences(paragraph: str) -> List[str]:
+    return [s for s in SENTENCE_BOUNDARY.split(paragraph) if s.strip()]
+
+def _slice_oversized_word(word: str, max_tokens: int) -> List[str]:
+    """Hard cut for a run without spaces (URL, CJK text, blob) that alone exceeds the budget."""
+    width = max(int((max_tokens - 1) * CHARS_PER_TOKEN_OTHER), 1)  # safe for any script
+    return [word[i:i + width] for i in range(0, len(word), width)]
+
+def _split_oversized_sentence(sentence: str, max_tokens: int) -> List[str]:
+    """Last resort for a single sentence over budget: cut between words, or inside an over-long word."""
+    words = []
+    for word in sentence.split(" "):
+        words.extend(_slice_oversized_word(word, max_tokens) if estimate_tokens(word) > max_tokens else [word])
+
+    pieces, current = [], ""
+    for word in words:
+        candidate = f"{current} {word}" if current else word
+        if current and estimate_tokens(candidate) > max_tokens:
+            pieces.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+def split_text_into_chunks(text: str, max_tokens: int = MAX_CHUNK_TOKENS) -> List[str]:
+    """
+    Pack paragraphs into chunks of at most `max_tokens` estimated tokens. Paragraphs over
+    budget are split at sentence boundaries; only a single over-long sentence is cut between words,
+    and a single word over budget is sliced by characters.
+    """
+    units = []  # (text, separator to use before it)
+    for para in text.split("\n\n"):
+        if estimate_tokens(para) <= max_tokens:
+            units.append((para, "\n\n"))
+            continue
+        for j, sentence in enumerate(split_sentences(para)):
+            separator = "\n\n" if j == 0 else " "
+            for k, piece in enumerate(_split_oversized_sentence(sentence, max_tokens)
+                                      if estimate_tokens(sentence) > max_tokens else [sentence]):
+                units.append((piece, separator if k == 0 else " "))
+
     chunks = []
     current_chunk = ""
-
-    for para in paragraphs:
-        if len(current_chunk) + len(para) + 2 <= max_chunk_size:
-            current_chunk += para + "\n\n"
+    for unit, separator in units:
+        candidate = f"{current_chunk}{separator}{unit}" if current_chunk else unit
+        if current_chunk and estimate_tokens(candidate) > max_tokens:
+            chunks.append(current_chunk.strip())
+            current_chunk = unit
         else:
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-            while len(para) > max_chunk_size:
-                chunks.append(para[:max_chunk_size].strip())
-                para = para[max_chunk_size:]
-            current_chunk = para + "\n\n"
-
-    if current_chunk:
+            current_chunk = candidate
+
+    if current_chunk or not chunks:
         chunks.append(current_chunk.strip())
     return chunks
 
+def route_language(detected: str, default_lang: str, confidence: float) -> str:
+    """
+    Use the detected language when it is a corpus language detected with at least
+    MIN_LANGUAGE_CONFIDENCE, else fall back to the country default.
+    """
+    if detected == UNDETERMINED or detected not in set(COUNTRY_TO_LANG.values()):
+        return default_lang
+    if confidence < MIN_LANGUAGE_CONFIDENCE:
+        return default_lang
+    return detected
+
+def chunk_languages(chunks: List[str], default_lang: str) -> List[str]:
+    if not USE_LANGUAGE_ID:
+        return [default_lang] * len(chunks)
+    return [route_language(detected, default_lang, confidence)
+            for detected, confidence in detect_languages_with_confidence(chunks)]
+
+def pack_chunks(chunks: List[str], token_budget: int = BATCH_TOKEN_BUDGET,
+                langs: Optional[List[str]] = None) -> List[List[int]]:
+    """
+    Group consecutive chunk indices so that each group fits one translation request.
+    With `langs`, a group never mixes source languages.
+    """
+    batches, current, used = [], [], 0
+    for i, chunk in enumerate(chunks):
+        tokens = estimate_tokens(chunk) + 8  # segment marker overhead
+        language_changes = langs is not None and current and langs[current[-1]] != langs[i]
+        if current and (used + tokens > token_budget or language_changes):
+            batches.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
 def translation_is_too_short(original: str, translated: str, threshold=MIN_TRANSLATION_RATIO) -> bool:
     return len(translated) < threshold * len(original)
 
 # ========== Gemma3 Translation ==========
 
+def request_translation(system_prompt: str, text: str) -> str:
+    """Raw model output for `text`, served from the LLM cache when possible."""
+    cache = get_cache()
+    cache_key = cache.make_key(TRANSLATION_MODEL, system_prompt, text) if cache else None
+    raw_translation = cache.get(cache_key) if cache else None
+    if raw_translation is None:
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": text}
+        ]
+        raw_translation = get_client().chat_content(TRANSLATION_MODEL, messages, timeout=30 + estimate_tokens(text) // 20,
+                                                    options={"num_ctx": TRANSLATION_NUM_CTX})
+        if cache and raw_translation:
+            cache.put(cache_key, raw_translation, model=TRANSLATION_MODEL)
+    return raw_translation
+
 def translate_chunk_with_gemma3(chunk_text: str, source_lang: str) -> str:
     system_prompt = (
         f"You are a translation assistant. Translate the following {source_lang} text into English. "
@@ -57,24 +169,8 @@ def translate_chunk_with_gemma3(chunk_text: str, source_lang: str) -> str:
         "Output ONLY the translated text."
     )
 
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": chunk_text}
-    ]
-
     try:
-        response = requests.post(
-            "http://localhost:11434/api/chat",
-            json={
-                "model": "zongwei/gemma3-translator:4b",
-                "messages": messages,
-                "stream": False
-            },
-            timeout=30
-        )
-        response.raise_for_status()
-        result = response.json()
-        raw_translation = result.get("message", {}).get("content", "").strip()
+        raw_translation = request_translation(system_prompt, chunk_text)
 
         # Clean common leading phrases
         if raw_translation.lower().startswith("here’s the translation"):
@@ -93,28 +189,116 @@ def translate_chunk_with_gemma3(chunk_text: str, source_lang: str) -> str:
         print(f"❌ Translation error (Gemma3): {e}")
         return ""
 
+def translate_chunk_batch(chunks: List[str], source_lang: str) -> List[str]:
+    """
+    Translate several chunks in one request. Each chunk is preceded by a `[[n]]` marker line
+    and the reply is split on the same markers; if the markers do not come back intact,
+    the chunks are translated one by one instead.
+    """
+    if len(chunks) == 1:
+        return [translate_chunk_with_gemma3(chunks[0], source_lang)]
+
+    system_prompt = (
+        f"You are a translation assistant. Translate the following {source_lang} text into English. "
+        "The text consists of numbered segments, each starting with a marker line such as [[1]]. "
+        "Keep every marker line exactly as it is, on its own line, and translate the text of each segment below it. "
+        "Translate the entire text exactly. Do NOT shorten, paraphrase, merge or summarize segments. "
+        "Output ONLY the marker lines and the translated text."
+    )
+    batch_text = "\n\n".join(f"[[{i}]]\n{chunk}" for i, chunk in enumerate(chunks, 1))
+
+    try:
+        raw_translation = request_translation(system_prompt, batch_text)
+        parts = SEGMENT_MARKER.split(raw_translation)
+        segments = {int(number): body.strip() for number, body in zip(parts[1::2], parts[2::2])}
+        if sorted(segments) != list(range(1, len(chunks) + 1)):
+            raise ValueError(f"expected {len(chunks)} segments, got markers {sorted(segments)}")
+    except Exception as e:
+        print(f"⚠️ Batched translation unusable ({e}); translating {len(chunks)} chunks one by one")
+        return [translate_chunk_with_gemma3(chunk, source_lang) for chunk in chunks]
+
+    translations = []
+    for i, chunk in enumerate(chunks, 1):
+        if source_lang != "en" and is_probably_same_language(chunk, segments[i]):
+            print("⚠️ Suspected untranslated chunk — marking empty")
+            translations.append("")
+        else:
+            translations.append(segments[i])
+    return translations
+
+def check_translated_chunk(chunk: str, translated_chunk: str, chunk_number: int) -> str:
+    if not translated_chunk or translation_is_too_short(chunk, translated_chunk):
+        print(f"❌ Failed to translate chunk {chunk_number} properly.")
+        return "[Translation Failed]"
+    return translated_chunk
+
 def translate_article_with_chunking(text: str, lang: str) -> str:
     if lang == "en":
         return text
 
     chunks = split_text_into_chunks(text)
-    translated_chunks = []
-
-    for i, chunk in enumerate(chunks):
-        print(f"Translating chunk {i+1}/{len(chunks)} (chars: {len(chunk)})")
-        translated_chunk = translate_chunk_with_gemma3(chunk, source_lang=lang)
-
-        if not translated_chunk or translation_is_too_short(chunk, translated_chunk):
-            print(f"❌ Failed to translate chunk {i+1} properly.")
-            translated_chunk = "[Translation Failed]"
+    langs = chunk_languages(chunks, lang)
+    translated_chunks = list(chunks)  # chunks already in English are kept as they are
 
-        translated_chunks.append(translated_chunk)
+    for batch in pack_chunks(chunks, langs=langs):
+        batch_lang = langs[batch[0]]
+        if batch_lang == "en":
+            continue
+        print(f"Translating chunks {batch[0]+1}-{batch[-1]+1}/{len(chunks)} ({batch_lang}) in one request")
+        for i, translated_chunk in zip(batch, translate_chunk_batch([chunks[i] for i in batch], batch_lang)):
+            translated_chunks[i] = check_translated_chunk(chunks[i], translated_chunk, i + 1)
 
     return "\n\n".join(translated_chunks)
 
+def translate_texts_concurrently(texts: List[str], langs: List[str],
+                                 max_in_flight: int = MAX_IN_FLIGHT) -> List[str]:
+    """
+    Translate many articles at once, keeping up to `max_in_flight` batch requests
+    open against Ollama across all articles. Chunks are put back together in their
+    original order, so each result equals `translate_article_with_chunking(text, lang)`.
+    """
+    results = list(texts)
+    article_chunks = {}
+    jobs = []
+    for article_idx, (text, lang) in enumerate(zip(texts, langs)):
+        if lang == "en":
+            continue
+        chunks = split_text_into_chunks(text)
+        chunk_langs = chunk_languages(chunks, lang)
+        article_chunks[article_idx] = list(chunks)
+        for batch in pack_chunks(chunks, langs=chunk_langs):
+            if chunk_langs[batch[0]] != "en":
+                jobs.append((article_idx, batch, [chunks[i] for i in batch], chunk_langs[batch[0]]))
+
+    if not jobs:
+        return results
+
+    # Requests go through the shared aiohttp Ollama client (get_client)
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        futures = {
+            executor.submit(translate_chunk_batch, batch_chunks, lang): (article_idx, batch, batch_chunks)
+            for article_idx, batch, batch_chunks, lang in jobs
+        }
+        for future in tqdm(as_completed(futures), total=len(futures), desc="🔁 Translating chunks"):
+            article_idx, batch, batch_chunks = futures[future]
+            for chunk_idx, chunk, translated_chunk in zip(batch, batch_chunks, future.result()):
+                article_chunks[article_idx][chunk_idx] = check_translated_chunk(chunk, translated_chunk, chunk_idx + 1)
+
+    for article_idx, translated_chunks in article_chunks.items():
+        results[article_idx] = "\n\n".join(translated_chunks)
+    return results
+
 # ========== Main Translation Function ==========
 
-def translate_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+@stage("translation")
+def translate_dataframe(df: pd.DataFrame, max_in_flight: int = MAX_IN_FLIGHT) -> pd.DataFrame:
+    """
+    Translate `combined_text` into a new `translated_text` column.
+    A language-ID pre-pass records `detected_lang`; articles and chunks already in English
+    are passed through, and other detected corpus languages override the country default.
+    Chunks of all articles are sent to Ollama concurrently; `max_in_flight=1` translates
+    article by article.
+    """
     print(f"🌍 Starting translation for multilingual dataset using 'combined_text'")
 
     df = df.copy()
@@ -126,18 +310,29 @@ def translate_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     if "country" not in df.columns:
         raise ValueError("❌ Expected column 'country' not found in dataframe.")
 
-    def translate_row(row):
-        country = row["country"]
-        lang = COUNTRY_TO_LANG.get(country, "en")
-        text = str(row[input_column])
-
-        if lang == "en":
-            return text
-        return translate_article_with_chunking(text, lang)
-
-    tqdm.pandas(desc="🔁 Translating")
-    df[output_column] = df.progress_apply(translate_row, axis=1)
+    texts = df[input_column].astype(str).tolist()
+    default_langs = [COUNTRY_TO_LANG.get(country, "en") for country in df["country"]]
+
+    if USE_LANGUAGE_ID:
+        detections = detect_languages_with_confidence(texts)
+        df["detected_lang"] = [detected for detected, _ in detections]
+        langs = [route_language(detected, default, confidence)
+                 for (detected, confidence), default in zip(detections, default_langs)]
+        already_english = sum(1 for lang, default in zip(langs, default_langs) if lang == "en" and default != "en")
+        rerouted = sum(1 for lang, default in zip(langs, default_langs) if lang not in ("en", default))
+        print(f"🔎 Language ID: {already_english} articles already in English, {rerouted} routed to another source language")
+    else:
+        langs = default_langs
+
+    if max_in_flight > 1:
+        df[output_column] = translate_texts_concurrently(texts, langs, max_in_flight=max_in_flight)
+        record_articles(len(df))
+        return df
+
+    df[output_column] = [
+        translate_article_with_chunking(text, lang)
+        for text, lang in tqdm(zip(texts, langs), total=len(texts), desc="🔁 Translating")
+    ]
+    record_articles(len(df))
 
     return df
-
-
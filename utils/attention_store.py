@@ -0,0 +1,442 @@
+import argparse
+import glob
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from io import BytesIO
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from config import ATTENTION_STORE_PATH, COUNTRY_TERMS, NEWS_FOLDER, PARQUET_FOLDER, WEEKLY_COUNTS_FOLDER
+from corpus_store import NEWS_DATASET, _require_pyarrow, ds, read_dataset
+from utils.telemetry import record_articles, stage, timer
+from utils.term_matcher import TermMatcher, build_country_matchers, weekly_corruption_counts
+
+# ========= Incremental Attention Store ==========
+# Materializes the weekly political corruption attention measure of
+# 01_get_attention_pol_corruption_dictionary.ipynb in SQLite, per (country, week):
+#   articles          articles in the country's news dump that week
+#   corruption_count  of those, articles matching a political and a corruption term
+#   total_articles    total coverage from the `*_weekly_count.csv` files
+# plus per-term hit totals. Articles are keyed on `uri`: every counted uri is recorded per country,
+# so an update only matches articles not counted before, whatever their date (the collector
+# backfills windows out of order). CSV dumps that only grew since the last scan (same bytes up to
+# the old end) are resumed from that byte offset; a rewritten dump is streamed again and its
+# counted uris skipped. Parquet sources prune month partitions before the high-water mark (latest
+# `dateTime` counted). Rows without a uri fall back to that mark.
+# Monthly and rolling views are derived from the weekly table, not from the articles.
+#
+# Usage:
+#     python -m utils.attention_store [--source parquet] [--weekly-output weekly.csv] [--monthly-output monthly.csv]
+
+SCAN_CHUNKSIZE = 50_000
+FINGERPRINT_BYTES = 64 * 1024
+DATE_COLUMNS = ["dateTime", "dateTimePub"]
+URI_QUERY_BATCH = 500
+
+def _week_key(week) -> str:
+    return pd.Timestamp(week).strftime("%Y-%m-%d")
+
+def _prefix_fingerprint(path: str, end: int) -> str:
+    """Hash of the first and the last FINGERPRINT_BYTES before `end`: a rewrite anywhere before `end` shifts the tail."""
+    with open(path, "rb") as f:
+        head = f.read(min(end, FINGERPRINT_BYTES))
+        f.seek(max(end - FINGERPRINT_BYTES, 0))
+        tail = f.read(end - f.tell())
+    return hashlib.sha1(head + b"\0" + tail).hexdigest()
+
+def _country_from_filename(path: str, suffix: str) -> str:
+    # The notebooks save the United Kingdom files as UK_*
+    country = os.path.basename(path)[:-len(suffix)]
+    return "United_Kingdom" if country == "UK" else country
+
+def article_dates(df: pd.DataFrame) -> pd.Series:
+    """Naive UTC timestamps from `dateTime` (or `dateTimePub`), NaT where missing or unparseable."""
+    column = next((c for c in DATE_COLUMNS if c in df.columns), None)
+    if column is None:
+        return pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    return pd.to_datetime(df[column], errors="coerce", utc=True).dt.tz_localize(None)
+
+class AttentionStore:
+    def __init__(self, path: str = ATTENTION_STORE_PATH):
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.executescript(
+            """CREATE TABLE IF NOT EXISTS weekly (
+                   country TEXT NOT NULL,
+                   week TEXT NOT NULL,
+                   articles INTEGER NOT NULL DEFAULT 0,
+                   corruption_count INTEGER NOT NULL DEFAULT 0,
+                   PRIMARY KEY (country, week)
+               );
+               CREATE TABLE IF NOT EXISTS term_hits (
+                   country TEXT NOT NULL,
+                   week TEXT NOT NULL,
+                   term TEXT NOT NULL,
+                   hits INTEGER NOT NULL,
+                   PRIMARY KEY (country, week, term)
+               );
+               CREATE TABLE IF NOT EXISTS totals (
+                   country TEXT NOT NULL,
+                   week TEXT NOT NULL,
+                   total_articles INTEGER NOT NULL,
+                   PRIMARY KEY (country, week)
+               );
+               CREATE TABLE IF NOT EXISTS counted (
+                   country TEXT NOT NULL,
+                   uri TEXT NOT NULL,
+                   PRIMARY KEY (country, uri)
+               ) WITHOUT ROWID;
+               CREATE TABLE IF NOT EXISTS sources (
+                   source TEXT PRIMARY KEY,
+                   country TEXT NOT NULL,
+                   high_water TEXT,
+                   byte_offset INTEGER,
+                   fingerprint TEXT,
+                   mtime REAL,
+                   size INTEGER,
+                   articles INTEGER NOT NULL DEFAULT 0,
+                   updated_at REAL NOT NULL
+               );"""
+        )
+        self._conn.commit()
+
+    # ----- source state -----
+    def source_state(self, source: str) -> Optional[dict]:
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM sources WHERE source = ?", (source,))
+            row = cursor.fetchone()
+            return dict(zip([d[0] for d in cursor.description], row)) if row else None
+
+    def high_water(self, source: str) -> Optional[pd.Timestamp]:
+        state = self.source_state(source)
+        return pd.Timestamp(state["high_water"]) if state and state["high_water"] else None
+
+    def counted_uris(self, country: str, uris) -> set:
+        """The subset of `uris` already counted for `country`."""
+        uris = list(dict.fromkeys(uris))
+        found = set()
+        with self._lock:
+            for i in range(0, len(uris), URI_QUERY_BATCH):
+                batch = uris[i:i + URI_QUERY_BATCH]
+                cursor = self._conn.execute(
+                    f"SELECT uri FROM counted WHERE country = ? AND uri IN ({', '.join('?' * len(batch))})",
+                    (country, *batch))
+                found.update(row[0] for row in cursor)
+        return found
+
+    def sources(self) -> pd.DataFrame:
+        with self._lock:
+            return pd.read_sql_query("SELECT * FROM sources ORDER BY country, source", self._conn)
+
+    # ----- writing -----
+    def _apply(self, country: str, source: str, weekly: pd.DataFrame, articles: pd.Series, uris: List[str],
+               state: dict):
+        """Add one update's weekly increments and move the source's state forward, in one transaction."""
+        rows = [(country, _week_key(week), int(n), 0) for week, n in articles.items()]
+        rows += [(country, _week_key(week), 0, int(n)) for week, n in zip(weekly["week"], weekly["corruption_count"])]
+        hit_columns = [c for c in weekly.columns if c.startswith("hits_")]
+        hits = [(country, _week_key(week), column[len("hits_"):], int(n))
+                for column in hit_columns for week, n in zip(weekly["week"], weekly[column]) if n]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO weekly (country, week, articles, corruption_count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(country, week) DO UPDATE SET articles = articles + excluded.articles, "
+                "corruption_count = corruption_count + excluded.corruption_count", rows)
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO counted (country, uri) VALUES (?, ?)", [(country, uri) for uri in uris])
+            self._conn.executemany(
+                "INSERT INTO term_hits (country, week, term, hits) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(country, week, term) DO UPDATE SET hits = hits + excluded.hits", hits)
+            self._conn.execute(
+                "INSERT INTO sources (source, country, high_water, byte_offset, fingerprint, mtime, size, articles, updated_at) "
+                "VALUES (:source, :country, :high_water, :byte_offset, :fingerprint, :mtime, :size, :articles, :updated_at) "
+                "ON CONFLICT(source) DO UPDATE SET high_water = excluded.high_water, byte_offset = excluded.byte_offset, "
+                "fingerprint = excluded.fingerprint, mtime = excluded.mtime, size = excluded.size, "
+                "articles = sources.articles + excluded.articles, updated_at = excluded.updated_at",
+                {"source": source, "country": country, "byte_offset": None, "fingerprint": None, "mtime": None,
+                 "size": None, "updated_at": time.time(), **state})
+
+    def add_articles(self, country: str, source: str, chunks, matcher: TermMatcher,
+                     text_column: str = "body", skip_to_mark: bool = True, **state) -> int:
+        """
+        Count the articles in `chunks` whose `uri` was not counted for `country` before, whatever
+        their date, and add them to the weekly table. Rows without a uri are only counted when newer
+        than the source's high-water mark, unless `skip_to_mark` is False (appended bytes are new).
+        `state` (byte offset, fingerprint, ...) is saved with the new mark. Returns the number of
+        articles added.
+        """
+        previous = self.high_water(source)
+        mark = previous if skip_to_mark else None
+        weekly_parts = []
+        articles = pd.Series(dtype="int64")
+        newest = previous
+        added = 0
+        uris = set()
+        for chunk in chunks:
+            dates = article_dates(chunk)
+            new = dates.notna() if mark is None else dates > mark
+            if "uri" in chunk.columns:
+                keys = chunk["uri"].astype("string")
+                keyed = keys.notna()
+                counted = uris | self.counted_uris(country, keys[keyed & dates.notna()])
+                fresh = keyed & ~keys.duplicated() & ~keys.isin(counted)
+                new = (dates.notna() & fresh) | (new & ~keyed)
+                uris.update(keys[new & keyed])
+            if not new.any():
+                continue
+            chunk = chunk.loc[new].assign(_date=dates[new])
+            added += len(chunk)
+            newest = max(newest, chunk["_date"].max()) if newest is not None else chunk["_date"].max()
+            week = chunk["_date"].dt.to_period("W").dt.start_time
+            articles = articles.add(week.value_counts(), fill_value=0)
+            weekly_parts.append(weekly_corruption_counts(chunk, matcher, text_column=text_column, date_column="_date"))
+
+        weekly = pd.concat(weekly_parts, ignore_index=True) if weekly_parts else pd.DataFrame(columns=["week", "corruption_count"])
+        if not weekly.empty:
+            weekly = weekly.fillna(0).groupby("week", as_index=False).sum()
+        state["high_water"] = newest.isoformat() if newest is not None else None
+        state["articles"] = added
+        self._apply(country, source, weekly, articles, sorted(uris), state)
+        return added
+
+    def import_weekly_totals(self, folder: str = WEEKLY_COUNTS_FOLDER) -> int:
+        """Load the `*_weekly_count.csv` coverage files; files unchanged since the last import are skipped."""
+        folder = os.path.expanduser(folder)
+        imported = 0
+        for path in sorted(glob.glob(os.path.join(folder, "*_weekly_count.csv"))):
+            country = _country_from_filename(path, "_weekly_count.csv")
+            stat = os.stat(path)
+            state = self.source_state(path)
+            if state and state["mtime"] == stat.st_mtime and state["size"] == stat.st_size:
+                continue
+
+            df = pd.read_csv(path)
+            columns = [col.strip().lower().replace(" ", "_") for col in df.columns]
+            df.columns = columns
+            # Same column detection as the notebook ("Start Date" / "Weekly Count")
+            week_col = next((col for col in columns if "start" in col or "week" in col), None)
+            count_col = next((col for col in columns if "count" in col), None)
+            if not week_col or not count_col:
+                print(f"❌ Skipped: {path} – missing week or count column. Found: {columns}")
+                continue
+            weeks = pd.to_datetime(df[week_col], errors="coerce")
+            rows = [(country, _week_key(week), int(count))
+                    for week, count in zip(weeks, df[count_col]) if pd.notna(week) and pd.notna(count)]
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO totals (country, week, total_articles) VALUES (?, ?, ?)", rows)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sources (source, country, mtime, size, articles, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", (path, country, stat.st_mtime, stat.st_size, len(rows), time.time()))
+            print(f"✅ Loaded totals: {path} – {len(rows)} weeks")
+            imported += 1
+        return imported
+
+    def reset(self, country: str):
+        """Forget a country's counts and news sources, so the next update rescans it."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM weekly WHERE country = ?", (country,))
+            self._conn.execute("DELETE FROM term_hits WHERE country = ?", (country,))
+            self._conn.execute("DELETE FROM counted WHERE country = ?", (country,))
+            self._conn.execute("DELETE FROM sources WHERE country = ? AND high_water IS NOT NULL", (country,))
+
+    # ----- views -----
+    def weekly(self, countries: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        The notebook's `merged` table: every week with total coverage, its corruption count
+        (0 when no article matched) and `relative_attention`.
+        """
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT t.country, t.week, t.total_articles, COALESCE(w.articles, 0) AS articles, "
+                "COALESCE(w.corruption_count, 0) AS corruption_count "
+                "FROM totals t LEFT JOIN weekly w ON w.country = t.country AND w.week = t.week "
+                "ORDER BY t.country, t.week", self._conn)
+        if countries:
+            df = df[df["country"].isin(countries)].reset_index(drop=True)
+        df["week"] = pd.to_datetime(df["week"])
+        df["relative_attention"] = df["corruption_count"] / df["total_articles"]
+        return df
+
+    def corpus_weekly(self, countries: Optional[List[str]] = None) -> pd.DataFrame:
+        """Weekly counts over the news dumps only (no coverage totals needed)."""
+        with self._lock:
+            df = pd.read_sql_query("SELECT * FROM weekly ORDER BY country, week", self._conn)
+        if countries:
+            df = df[df["country"].isin(countries)].reset_index(drop=True)
+        df["week"] = pd.to_datetime(df["week"])
+        return df
+
+    def term_hits(self, countries: Optional[List[str]] = None) -> pd.DataFrame:
+        """Per-term hit totals per week, one column per term."""
+        with self._lock:
+            df = pd.read_sql_query("SELECT * FROM term_hits", self._conn)
+        if countries:
+            df = df[df["country"].isin(countries)]
+        df["week"] = pd.to_datetime(df["week"])
+        return df.pivot_table(index=["country", "week"], columns="term", values="hits", fill_value=0).reset_index()
+
+    def monthly(self, countries: Optional[List[str]] = None) -> pd.DataFrame:
+        """Monthly relative attention, summed from the weekly table as in the notebook."""
+        weekly = self.weekly(countries)
+        weekly["month"] = weekly["week"].dt.to_period("M").dt.start_time
+        monthly = weekly.groupby(["month", "country"]).agg(
+            total_articles=("total_articles", "sum"),
+            corruption_count=("corruption_count", "sum")
+        ).reset_index()
+        monthly["relative_attention"] = monthly["corruption_count"] / monthly["total_articles"]
+        return monthly
+
+    def rolling(self, weeks: int = 4, countries: Optional[List[str]] = None) -> pd.DataFrame:
+        """Relative attention over a trailing window of `weeks` weeks (sums of counts, not a mean of ratios)."""
+        weekly = self.weekly(countries)
+        sums = (weekly.groupby("country")[["total_articles", "corruption_count"]]
+                .rolling(weeks, min_periods=weeks).sum()
+                .reset_index(level=0, drop=True))
+        rolled = weekly[["country", "week"]].join(sums)
+        rolled["relative_attention"] = rolled["corruption_count"] / rolled["total_articles"]
+        return rolled.dropna(subset=["relative_attention"]).reset_index(drop=True)
+
+    def summary(self) -> pd.DataFrame:
+        """Absolute and relative attention per country over all weeks (step 4 of the notebook)."""
+        summary = self.weekly().groupby("country").agg(
+            total_articles=("total_articles", "sum"),
+            total_corruption_articles=("corruption_count", "sum")
+        ).reset_index()
+        summary["relative_attention"] = summary["total_corruption_articles"] / summary["total_articles"]
+        return summary
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# ========= News Sources ==========
+def _csv_chunks(path: str, columns: List[str], start: int, end: int, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Read rows between byte offsets `start` and `end` of a CSV whose header is `columns`."""
+    wanted = [c for c in columns if c in ("uri", "body", *DATE_COLUMNS)]
+    with open(path, "rb") as f:
+        f.seek(start)
+        tail = f.read(end - start) if start else None
+    if tail is not None:
+        if not tail.strip():
+            return
+        source, kwargs = BytesIO(tail), {"header": None, "names": columns}
+    else:
+        source, kwargs = path, {}
+    with timer("io", op="read_csv", path=path) as step:
+        rows = 0
+        for chunk in pd.read_csv(source, usecols=wanted, dtype={"uri": str}, chunksize=chunksize, **kwargs):
+            rows += len(chunk)
+            yield chunk
+        step["rows"] = rows
+
+def update_from_csv(store: AttentionStore, country: str, matcher: TermMatcher, news_folder: str = NEWS_FOLDER,
+                    chunksize: int = SCAN_CHUNKSIZE) -> int:
+    """
+    Add new articles from `{country}_news.csv`. When the file only grew since the last scan (same
+    bytes up to the old end), only the appended bytes are read; otherwise the whole file is
+    streamed. Either way, only uris not counted before are matched, including backfilled rows dated
+    before the high-water mark.
+    """
+    path = os.path.join(os.path.expanduser(news_folder), f"{country}_news.csv")
+    if not os.path.exists(path):
+        print(f"❌ File not found: {path}")
+        return 0
+
+    stat = os.stat(path)
+    state = store.source_state(path)
+    if state and state["mtime"] == stat.st_mtime and state["size"] == stat.st_size:
+        print(f"⏭️ {country}: {path} unchanged since last update")
+        return 0
+
+    start = 0
+    if state and state["byte_offset"] and stat.st_size >= state["byte_offset"]:
+        if _prefix_fingerprint(path, state["byte_offset"]) == state["fingerprint"]:
+            start = state["byte_offset"]
+
+    columns = pd.read_csv(path, nrows=0).columns.tolist()
+    chunks = _csv_chunks(path, columns, start, stat.st_size, chunksize)
+    added = store.add_articles(
+        country, path, chunks, matcher, skip_to_mark=not start,
+        byte_offset=stat.st_size, fingerprint=_prefix_fingerprint(path, stat.st_size),
+        mtime=stat.st_mtime, size=stat.st_size)
+    print(f"📈 {country}: {added} new articles counted ({'appended bytes only' if start else 'full scan'})")
+    return added
+
+def update_from_parquet(store: AttentionStore, country: str, matcher: TermMatcher,
+                        parquet_root: str = PARQUET_FOLDER) -> int:
+    """Add new articles from the Parquet `news` dataset, reading only months from the high-water mark on."""
+    _require_pyarrow()
+    source = f"parquet:{os.path.join(os.path.expanduser(parquet_root), NEWS_DATASET)}:{country}"
+    mark = store.high_water(source)
+    start_month = mark.strftime("%Y-%m") if mark is not None else None
+    newer = ds.field("dateTime") > pd.Timestamp(mark, tz="UTC") if mark is not None else None
+    with timer("io", op="read_parquet", path=source) as step:
+        df = read_dataset(NEWS_DATASET, parquet_root, columns=["uri", "body", "dateTime"], countries=[country],
+                          start_month=start_month, filter_expression=newer)
+        step["rows"] = len(df)
+    added = store.add_articles(country, source, [df], matcher)
+    print(f"📈 {country}: {added} new articles counted (months from {start_month or 'the start'})")
+    return added
+
+@stage("attention")
+def update(store: AttentionStore, countries: Optional[List[str]] = None, source: str = "csv",
+           news_folder: str = NEWS_FOLDER, parquet_root: str = PARQUET_FOLDER,
+           totals_folder: Optional[str] = WEEKLY_COUNTS_FOLDER) -> Dict[str, int]:
+    """Bring the store up to date for `countries` (all countries with dictionary terms by default)."""
+    matchers = build_country_matchers()
+    countries = countries or list(COUNTRY_TERMS)
+    if totals_folder:
+        store.import_weekly_totals(totals_folder)
+
+    added = {}
+    for country in countries:
+        if country not in matchers:
+            print(f"⚠️ Skipping {country} – no terms defined.")
+            continue
+        if source == "parquet":
+            added[country] = update_from_parquet(store, country, matchers[country], parquet_root)
+        else:
+            added[country] = update_from_csv(store, country, matchers[country], news_folder)
+        record_articles(added[country], country=country)
+    return added
+
+# ========= CLI ==========
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally update and export the weekly attention measure.")
+    parser.add_argument("--store", default=ATTENTION_STORE_PATH)
+    parser.add_argument("--countries", nargs="+")
+    parser.add_argument("--source", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--news-folder", default=NEWS_FOLDER)
+    parser.add_argument("--parquet-root", default=PARQUET_FOLDER)
+    parser.add_argument("--totals-folder", default=WEEKLY_COUNTS_FOLDER)
+    parser.add_argument("--reset", action="store_true", help="drop the countries' counts and rescan them")
+    parser.add_argument("--weekly-output", help="write the weekly table (the notebook's relative_..._weekly.csv)")
+    parser.add_argument("--monthly-output", help="write the monthly relative attention")
+    parser.add_argument("--rolling-weeks", type=int, default=0, help="also print an N-week rolling view")
+    args = parser.parse_args()
+
+    store = AttentionStore(args.store)
+    if args.reset:
+        for country in args.countries or list(COUNTRY_TERMS):
+            store.reset(country)
+    started = time.perf_counter()
+    update(store, args.countries, args.source, args.news_folder, args.parquet_root, args.totals_folder)
+    print(f"⏱️ Update took {time.perf_counter() - started:.1f}s")
+
+    if args.weekly_output:
+        store.weekly(args.countries).to_csv(args.weekly_output, index=False)
+        print(f"💾 Saved weekly attention to {args.weekly_output}")
+    if args.monthly_output:
+        store.monthly(args.countries).to_csv(args.monthly_output, index=False)
+        print(f"💾 Saved monthly attention to {args.monthly_output}")
+    if args.rolling_weeks:
+        print(store.rolling(args.rolling_weeks, args.countries).tail(10).to_string(index=False))
+    print(store.summary().to_string(index=False))
@@ -0,0 +1,65 @@
+import json
+import os
+from typing import Dict
+
+import pandas as pd
+
+# ========= Append-Only Checkpoint Journal ==========
+# One JSON line per finished article: {"row": <index>, "uri": ..., "columns": {...}}.
+# Appending is O(1) per article, unlike rewriting the whole CSV after every row.
+
+def _json_default(value):
+    # numpy scalars (e.g. values read back with df.at) -> plain Python types
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+class CheckpointJournal:
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def append(self, row, columns: dict, **extra):
+        record = {"row": row, **extra, "columns": columns}
+        line = json.dumps(record, ensure_ascii=False, default=_json_default) + "\n"
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+
+    def load(self) -> Dict[object, dict]:
+        """Return {row: columns}; later records win, a truncated last line is ignored."""
+        records = {}
+        if not self.exists():
+            return records
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"⚠️ Skipping unreadable journal line {line_number} in {self.path}")
+                    continue
+                records[record["row"]] = record.get("columns", {})
+        return records
+
+    def apply(self, df: pd.DataFrame, records: Dict[object, dict] = None) -> pd.DataFrame:
+        """Write journaled values back into `df` (matched on the DataFrame index)."""
+        records = self.load() if records is None else records
+        for row, columns in records.items():
+            if row not in df.index:
+                continue
+            for col, value in columns.items():
+                if col not in df.columns:
+                    df[col] = pd.Series("", index=df.index, dtype=object)
+                df.at[row, col] = value
+        return df
+
+    def remove(self):
+        if self.exists():
+            os.remove(self.path)
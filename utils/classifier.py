@@ -1,12 +1,41 @@
-import requests
+import json
 import re
+from functools import lru_cache
 
-# ========= Ollama Configuration ==========
-LLM_ENDPOINT = "http://localhost:11434/api/chat"
-LLM_MODEL_NAME = "llama3:70b"
+from config import COUNTRY_TERMS, LLM_MODEL_NAME, SMALL_LLM_MODEL_NAME, STRUCTURED_OUTPUT
+from utils.llm_cache import get_cache
+from utils.ollama_client import get_client
+from utils.structured_output import CLASSIFIER_SCHEMA, JsonValueScanner, parse_structured
+from utils.telemetry import timer
+from utils.term_matcher import TermMatcher
+
+STREAM_RESPONSES = True  # stream replies and stop once the Confidence line (or JSON object) is complete
+TEMPERATURE = None  # None keeps the model's default sampling temperature
+CONFIDENCE_LINE = re.compile(r"^\s*confidence:\s*\d{1,3}\D", re.IGNORECASE | re.MULTILINE)
+
+TEXT_OUTPUT_FORMAT = """Return your response in this format:
+
+Highlights:
+- [Key sentence 1]
+- [Key sentence 2]
+...
+
+Tentative Label: Yes / Mentioned but not central / No / Unsure  
+Reasoning: [Short explanation]  
+Confidence: [0–100]"""
+
+JSON_OUTPUT_FORMAT = """Return a JSON object in this format:
+
+{
+  "highlights": ["Key sentence 1", "Key sentence 2"],
+  "label": "Yes" | "Mentioned but not central" | "No" | "Unsure",
+  "rationale": "Short explanation",
+  "confidence": 0-100
+}"""
 
 # ========= Prompt Builder ==========
-def build_detailed_prompt(article_text: str) -> str:
+def build_detailed_prompt(article_text: str, structured: bool = STRUCTURED_OUTPUT) -> str:
+    output_format = JSON_OUTPUT_FORMAT if structured else TEXT_OUTPUT_FORMAT
     return f"""You are an annotation assistant helping a human coder classify whether a news article is **primarily about political corruption**.
 
 ### Strict Definition
@@ -34,16 +63,7 @@ def build_detailed_prompt(article_text: str) -> str:
 
 1. Identify full sentences that directly point to political corruption.
 2. Make a careful judgment on whether this is the central focus.
-3. Return your response in this format:
-
-Highlights:
-- [Key sentence 1]
-- [Key sentence 2]
-...
-
-Tentative Label: Yes / Mentioned but not central / No / Unsure  
-Reasoning: [Short explanation]  
-Confidence: [0–100]
+3. {output_format}
 
 ---
 
@@ -52,74 +72,113 @@ Article:
 
 Assistant Output:"""
 
+# ========= Streaming Stop Condition ==========
+class ConfidenceLineScanner:
+    """
+    Streaming stop condition: True once the reply contains a finished `Confidence: NN` line (the
+    last field we parse). Only the current, unfinished line is kept and searched.
+    """
+    def __init__(self):
+        self.line = ""
+
+    def __call__(self, chunk: str) -> bool:
+        self.line += chunk
+        if CONFIDENCE_LINE.search(self.line):
+            return True
+        self.line = self.line[self.line.rfind("\n") + 1:]
+        return False
+
+# ========= Parsing ==========
+def parse_text_answer(answer: str) -> dict:
+    """Parse the line-based Highlights / Tentative Label / Reasoning / Confidence reply."""
+    highlights = []
+    tentative_label = "Unclear"
+    rationale_lines = []
+    confidence = None
+
+    lines = answer.splitlines()
+    reading_highlights = False
+    reading_rationale = False
+
+    for line in lines:
+        line_strip = line.strip()
+
+        if line_strip.lower().startswith("highlights:"):
+            reading_highlights = True
+            reading_rationale = False
+            continue
+        elif line_strip.lower().startswith("tentative label:"):
+            reading_highlights = False
+            reading_rationale = False
+            val = line_strip.split(":", 1)[1].strip().capitalize()
+            if val in ["Yes", "No", "Unsure", "Mentioned but not central"]:
+                tentative_label = val
+            continue
+        elif line_strip.lower().startswith("reasoning:"):
+            reading_highlights = False
+            reading_rationale = True
+            rationale_lines.append(line_strip.split(":", 1)[1].strip())
+            continue
+        elif line_strip.lower().startswith("confidence:"):
+            reading_highlights = False
+            reading_rationale = False
+            match = re.search(r"\d{1,3}", line_strip)
+            if match:
+                confidence = int(match.group(0))
+            continue
+
+        if reading_highlights and line_strip.startswith("- "):
+            highlights.append(line_strip[2:].strip())
+        elif reading_rationale and line_strip:
+            rationale_lines.append(line_strip)
+
+    rationale = " ".join(rationale_lines).strip()
+
+    return {
+        "tentative_label": tentative_label,
+        "rationale": rationale,
+        "confidence": confidence,
+        "highlights": highlights
+    }
+
+def parse_structured_answer(answer: str) -> dict:
+    parsed = parse_structured(answer, CLASSIFIER_SCHEMA, "classifier")
+    return {
+        "tentative_label": parsed["label"],
+        "rationale": parsed["rationale"].strip(),
+        "confidence": parsed["confidence"],
+        "highlights": [h.strip() for h in parsed["highlights"] if h.strip()]
+    }
+
 # ========= LLM Classification Call ==========
-def classify_article(article_text: str) -> dict:
-    prompt = build_detailed_prompt(article_text)
+def classify_article(article_text: str, structured: bool = STRUCTURED_OUTPUT, model: str = LLM_MODEL_NAME) -> dict:
+    prompt = build_detailed_prompt(article_text, structured)
+    cache = get_cache()
+    # The schema and temperature change the reply, so they are part of the cache key (as in 09's request_llm_content)
+    cache_prompt = f"{prompt}\n\nformat={json.dumps(CLASSIFIER_SCHEMA, sort_keys=True)}" if structured else prompt
+    cache_key = cache.make_key(model, cache_prompt, article_text, TEMPERATURE) if cache else None
 
     try:
-        response = requests.post(
-            LLM_ENDPOINT,
-            json={
-                "model": LLM_MODEL_NAME,
-                "messages": [{"role": "user", "content": prompt}],
-                "stream": False
-            },
-            timeout=60
-        )
-        response.raise_for_status()
-        result = response.json()
-        answer = result.get("message", {}).get("content", "").strip()
-
-        # ========== Parsing ==========
-        highlights = []
-        tentative_label = "Unclear"
-        rationale_lines = []
-        confidence = None
-
-        lines = answer.splitlines()
-        reading_highlights = False
-        reading_rationale = False
-
-        for line in lines:
-            line_strip = line.strip()
-
-            if line_strip.lower().startswith("highlights:"):
-                reading_highlights = True
-                reading_rationale = False
-                continue
-            elif line_strip.lower().startswith("tentative label:"):
-                reading_highlights = False
-                reading_rationale = False
-                val = line_strip.split(":", 1)[1].strip().capitalize()
-                if val in ["Yes", "No", "Unsure", "Mentioned but not central"]:
-                    tentative_label = val
-                continue
-            elif line_strip.lower().startswith("reasoning:"):
-                reading_highlights = False
-                reading_rationale = True
-                rationale_lines.append(line_strip.split(":", 1)[1].strip())
-                continue
-            elif line_strip.lower().startswith("confidence:"):
-                reading_highlights = False
-                reading_rationale = False
-                match = re.search(r"\d{1,3}", line_strip)
-                if match:
-                    confidence = int(match.group(0))
-                continue
-
-            if reading_highlights and line_strip.startswith("- "):
-                highlights.append(line_strip[2:].strip())
-            elif reading_rationale and line_strip:
-                rationale_lines.append(line_strip)
-
-        rationale = " ".join(rationale_lines).strip()
-
-        return {
-            "tentative_label": tentative_label,
-            "rationale": rationale,
-            "confidence": confidence,
-            "highlights": highlights
-        }
+        answer = cache.get(cache_key) if cache else None
+        if answer is None:
+            stop_when = (JsonValueScanner if structured else ConfidenceLineScanner) if STREAM_RESPONSES else None
+            extra = {"format": CLASSIFIER_SCHEMA} if structured else {}
+            if TEMPERATURE is not None:
+                extra["options"] = {"temperature": TEMPERATURE}
+            answer = get_client().chat_content(
+                model,
+                [{"role": "user", "content": prompt}],
+                timeout=60,
+                stop_when=stop_when,
+                **extra
+            )
+            if cache and answer:
+                cache.put(cache_key, answer, model=model)
+
+        if structured:
+            return parse_structured_answer(answer)
+        with timer("parse", parser="classifier_text"):
+            return parse_text_answer(answer)
 
     except Exception as e:
         print(f"❌ Classification error: {e}")
@@ -129,3 +188,49 @@ def classify_article(article_text: str) -> dict:
             "confidence": None,
             "highlights": []
         }
+
+# ========= Cascade Classification ==========
+# A cheap first stage labels every article; only uncertain ones go to the 70B model.
+CASCADE_FIRST_STAGES = ("small_model", "dictionary")
+CASCADE_THRESHOLD = 80          # first-stage confidence needed to keep its label
+ESCALATE_LABELS = {"Unsure", "Mentioned but not central", "Unclear", "Error"}
+DICTIONARY_LANGUAGE = "United_Kingdom"  # articles are classified after translation into English
+DICTIONARY_NO_CONFIDENCE = 90   # confidence given to "No" when no political + corruption terms co-occur
+
+@lru_cache(maxsize=1)
+def dictionary_matcher() -> TermMatcher:
+    terms = COUNTRY_TERMS[DICTIONARY_LANGUAGE]
+    return TermMatcher(terms["political"], terms["corruption"])
+
+def dictionary_classify(article_text: str) -> dict:
+    """Dictionary first stage from the attention notebook: it can only rule articles out."""
+    if dictionary_matcher().is_corruption_article(article_text):
+        return {"tentative_label": "Unsure", "rationale": "Political and corruption terms co-occur",
+                "confidence": None, "highlights": []}
+    return {"tentative_label": "No", "rationale": "No political and corruption terms co-occur",
+            "confidence": DICTIONARY_NO_CONFIDENCE, "highlights": []}
+
+def first_stage_classify(article_text: str, first_stage: str = "small_model",
+                         small_model: str = SMALL_LLM_MODEL_NAME) -> dict:
+    if first_stage == "dictionary":
+        return dictionary_classify(article_text)
+    if first_stage == "small_model":
+        return classify_article(article_text, model=small_model)
+    raise ValueError(f"❌ Unknown cascade first stage: {first_stage} (expected one of {CASCADE_FIRST_STAGES})")
+
+def needs_escalation(result: dict, threshold: float = CASCADE_THRESHOLD) -> bool:
+    confidence = result.get("confidence")
+    return (result.get("tentative_label") in ESCALATE_LABELS
+            or not isinstance(confidence, (int, float)) or confidence < threshold)
+
+def cascade_classify_article(article_text: str, first_stage: str = "small_model",
+                             threshold: float = CASCADE_THRESHOLD,
+                             small_model: str = SMALL_LLM_MODEL_NAME) -> dict:
+    """
+    Classify with the first stage and escalate to LLM_MODEL_NAME when its label is uncertain
+    or its confidence is below `threshold`. The result's `stage` says which model decided.
+    """
+    first = first_stage_classify(article_text, first_stage, small_model)
+    if not needs_escalation(first, threshold):
+        return {**first, "stage": first_stage}
+    return {**classify_article(article_text), "stage": "escalated"}
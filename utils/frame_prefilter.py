@@ -0,0 +1,144 @@
+import re
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.prompt_registry import PromptRegistry
+from utils.term_matcher import compile_terms
+
+# ========= Frame Pre-Filter ==========
+# Scores each (article, frame) pair by the number of distinct cue terms it contains. Cue terms
+# are the quoted "language cues" in the frame prompts plus a broad keyword list per frame;
+# keywords are word-start prefixes ("investigat" matches "investigation"). A frame whose
+# score is below its threshold is marked as not present without asking the LLM.
+# Thresholds should be tuned for recall with benchmarks/prefilter_recall_report.py.
+
+PREFILTERED_MARKER = "not present (pre-filtered)"
+DEFAULT_THRESHOLD = 1
+
+FRAME_KEYWORDS = {
+    1: ["foreign", "abroad", "russia", "kremlin", "moscow", "putin", "china", "chinese", "beijing", "qatar",
+        "iran", "interfer", "meddl", "propaganda", "sanction", "espionage", "spy", "spies", "agent", "embassy",
+        "ambassador", "oligarch", "disinformation", "hybrid", "external", "sovereign", "infiltrat"],
+    2: ["system", "institution", "widespread", "endemic", "culture", "network", "decade", "repeated",
+        "pervasive", "entrenched", "rampant", "chronic", "structural", "state capture", "ministr", "police",
+        "court", "parliament", "prosecut", "cover-up", "cover up", "years"],
+    3: ["elite", "oligarch", "business", "compan", "corporat", "tycoon", "lobby", "contract", "donor",
+        "donation", "tender", "entrepreneur", "executive", "firm", "kickback", "favour", "favor", "crony",
+        "closed doors", "deal", "industr", "bank"],
+    4: ["investigat", "prosecut", "arrest", "charge", "wiretap", "surveil", "politically motivated",
+        "witch hunt", "witch-hunt", "persecut", "selective", "judge", "police", "indict", "raid", "detain",
+        "opposition", "revenge", "retaliat", "intelligence"],
+    5: ["emergency", "decree", "crackdown", "purge", "repress", "dissent", "authoritarian", "strongman",
+        "task force", "commission", "iron fist", "concentrat", "martial", "silenc", "anti-corruption campaign",
+        "anti-corruption drive", "centraliz", "centralis", "special powers"],
+    6: ["loophole", "impunity", "acquit", "dropped", "shield", "cover-up", "cover up", "immunity", "watchdog",
+        "statute of limitations", "time-barred", "unpunished", "lenient", "failed to", "judicia", "court",
+        "prosecut", "delay", "dismiss", "overturn"],
+    7: ["protest", "demonstrat", "rally", "rallies", "march", "petition", "activis", "citizens",
+        "civil society", "ngo", "campaign", "reform", "referendum", "strike", "mobiliz", "mobilis",
+        "whistleblow", "took to the streets", "legislation", "new law", "bill"],
+}
+
+_CUE_HEADING = re.compile(r"cue", re.IGNORECASE)
+_QUOTED = re.compile(r"[“\"]([^”\"\n]{2,60})[”\"]")
+MAX_CUE_WORDS = 6
+
+def extract_prompt_cues(prompt_text: str) -> List[str]:
+    """Quoted phrases from the "language cues" section(s) of a frame prompt (up to the next `---`)."""
+    cues = []
+    in_section = False
+    for line in prompt_text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("---"):
+            in_section = False
+        elif _CUE_HEADING.search(stripped) and (stripped.startswith(("#", "**")) or stripped.endswith(":")):
+            in_section = True
+            continue
+        if in_section:
+            cues += [q.strip().lower() for q in _QUOTED.findall(stripped)
+                     if len(q.split()) <= MAX_CUE_WORDS and not q.lower().startswith(("do not", "tag"))]
+    return sorted(set(cues))
+
+class FramePrefilter:
+    def __init__(self, registry: PromptRegistry, thresholds: Optional[Dict[int, float]] = None,
+                 keywords: Dict[int, List[str]] = FRAME_KEYWORDS):
+        self.frame_names = {i: p.name for i, p in registry.prompts.items()}
+        self.thresholds = {i: (thresholds or {}).get(i, DEFAULT_THRESHOLD) for i in self.frame_names}
+        self.terms = {}
+        self.patterns = {}
+        for i, prompt in registry.prompts.items():
+            terms = sorted(set(extract_prompt_cues(prompt.text)) | {k.lower() for k in keywords.get(i, [])})
+            self.terms[i] = terms
+            self.patterns[i] = re.compile(r"\b(?:" + compile_terms(terms).pattern + ")") if terms else None
+
+    # ----- single article -----
+    def score(self, text, frame_index: int) -> int:
+        pattern = self.patterns[frame_index]
+        if pattern is None:
+            return DEFAULT_THRESHOLD  # nothing to filter on: always ask the LLM
+        return len(set(pattern.findall(str(text).lower())))
+
+    def passes(self, text, frame_index: int) -> bool:
+        return self.score(text, frame_index) >= self.thresholds[frame_index]
+
+    def frames_to_query(self, text) -> List[int]:
+        return [i for i in self.frame_names if self.passes(text, i)]
+
+    # ----- batches -----
+    def score_matrix(self, texts: pd.Series) -> pd.DataFrame:
+        """Score matrix: one row per article, one column per frame index."""
+        lowered = texts.fillna("").astype(str).str.lower()
+        scores = {}
+        for i, pattern in self.patterns.items():
+            if pattern is None:
+                scores[i] = DEFAULT_THRESHOLD
+            else:
+                scores[i] = lowered.str.findall(pattern).map(lambda hits: len(set(hits)))
+        return pd.DataFrame(scores, index=texts.index)
+
+def prefiltered_result() -> dict:
+    return {"frame": "None", "rationale": PREFILTERED_MARKER, "confidence": None, "evidence": ""}
+
+# ========= Recall Tuning ==========
+def recall_at(scores: pd.Series, gold: pd.Series, threshold: float) -> float:
+    positives = gold.astype(bool)
+    if not positives.any():
+        return np.nan
+    return float((scores[positives] >= threshold).mean())
+
+def tune_threshold(scores: pd.Series, gold: pd.Series, target_recall: float = 0.98) -> float:
+    """Highest threshold that still keeps `target_recall` of the gold positives (0, never skip, without positives)."""
+    best = 0
+    for threshold in sorted(set(scores.tolist()) | {0}):
+        if threshold == 0:
+            continue
+        recall = recall_at(scores, gold, threshold)
+        if np.isnan(recall) or recall < target_recall:
+            break
+        best = threshold
+    return best
+
+def recall_report(prefilter: FramePrefilter, texts: pd.Series, gold: pd.DataFrame,
+                  target_recall: float = 0.98, frame_indices: Sequence[int] = None) -> pd.DataFrame:
+    """
+    Per-frame recall and share of skipped calls, at the configured threshold and at the highest
+    threshold reaching `target_recall`. `gold` has one boolean column per frame index.
+    """
+    scores = prefilter.score_matrix(texts)
+    rows = []
+    for i in frame_indices or prefilter.frame_names:
+        current = prefilter.thresholds[i]
+        tuned = tune_threshold(scores[i], gold[i], target_recall)
+        rows.append({
+            "frame": prefilter.frame_names[i],
+            "gold_positives": int(gold[i].sum()),
+            "threshold": current,
+            "recall": recall_at(scores[i], gold[i], current),
+            "calls_skipped_%": round(100 * float((scores[i] < current).mean()), 1),
+            "tuned_threshold": tuned,
+            "tuned_recall": recall_at(scores[i], gold[i], tuned),
+            "tuned_calls_skipped_%": round(100 * float((scores[i] < tuned).mean()), 1),
+        })
+    return pd.DataFrame(rows)
@@ -1,24 +1,126 @@
-# ========= Highlight Helper ==========
-def highlight_translated_text(text: str, highlights: List[str]) -> str:
-    """Insert <highlight> tags around matched highlight sentences in the text."""
-    used = set()
-    for hl in highlights:
-        pattern = re.escape(hl.strip())
-        if not pattern or pattern.lower() in used:
-            continue
-        regex = re.compile(pattern, re.IGNORECASE)
-        text, count = regex.subn(r"<highlight>\g<0></highlight>", text, count=1)
-        if count > 0:
-            used.add(pattern.lower())
-    return text
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+OPEN_TAG = "<highlight>"
+CLOSE_TAG = "</highlight>"
 
 KEY_TERMS = [
     "bribery", "embezzlement", "nepotism", "corruption", "fraud",
     "abuse of power", "favoritism", "money laundering", "kickback", "cronyism"
 ]
 
+# ========= Normalization ==========
+_SEPARATORS = re.compile(r"[\W_]+")
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse every run of whitespace/punctuation into one space."""
+    return _SEPARATORS.sub(" ", text).strip().lower()
+
+def _tolerant_pattern(normalized: str) -> str:
+    """Regex for a normalized phrase that allows any whitespace/punctuation between its words."""
+    return r"[\W_]+".join(re.escape(word) for word in normalized.split(" "))
+
+def _merge_spans(spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+# ========= Highlighter ==========
+class Highlighter:
+    """
+    Marks LLM evidence sentences and key terms in one pass over an article.
+
+    Key terms are compiled once into a single word-bounded alternation. Evidence sentences
+    are matched ignoring case and whitespace/punctuation differences, so quotes the LLM
+    re-punctuated or re-spaced slightly still match; the first occurrence of each is marked.
+    Overlapping spans are merged, and spans inside text that is already tagged are skipped,
+    so tags are never nested, even when a highlighted text is highlighted again.
+    """
+
+    def __init__(self, key_terms: Iterable[str] = KEY_TERMS, open_tag: str = OPEN_TAG, close_tag: str = CLOSE_TAG):
+        self.open_tag = open_tag
+        self.close_tag = close_tag
+        self.tagged_pattern = re.compile(re.escape(open_tag) + ".*?" + re.escape(close_tag), re.DOTALL)
+        terms = sorted({t.strip() for t in key_terms if t.strip()}, key=len, reverse=True)
+        self.key_pattern = re.compile(r"\b(?:" + "|".join(re.escape(t) for t in terms) + r")\b",
+                                      re.IGNORECASE) if terms else None
+
+    def key_term_spans(self, text: str) -> List[Tuple[int, int]]:
+        if self.key_pattern is None:
+            return []
+        return [m.span() for m in self.key_pattern.finditer(text)]
+
+    def evidence_spans(self, text: str, highlights: Iterable[str]) -> List[Tuple[int, int]]:
+        targets = {normalize(h) for h in highlights if isinstance(h, str)}
+        targets = sorted((t for t in targets if t), key=len, reverse=True)
+        if not targets:
+            return []
+        # One alternation per article, matched on the original text so spans need no offset mapping
+        pattern = re.compile("|".join(_tolerant_pattern(t) for t in targets), re.IGNORECASE)
+        spans, used = [], set()
+        for m in pattern.finditer(text):
+            key = normalize(m.group())
+            if key in used:
+                continue
+            used.add(key)
+            spans.append(m.span())
+            if len(used) == len(targets):
+                break
+        return spans
+
+    def untagged(self, text: str, spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Drop spans that overlap an existing <highlight>…</highlight> region."""
+        tagged = [m.span() for m in self.tagged_pattern.finditer(text)]
+        if not tagged:
+            return spans
+        return [(start, end) for start, end in spans
+                if all(end <= t_start or start >= t_end for t_start, t_end in tagged)]
+
+    def mark(self, text: str, spans: List[Tuple[int, int]]) -> str:
+        parts, position = [], 0
+        for start, end in _merge_spans(spans):
+            parts.append(text[position:start])
+            parts.append(f"{self.open_tag}{text[start:end]}{self.close_tag}")
+            position = end
+        parts.append(text[position:])
+        return "".join(parts)
+
+    def highlight(self, text: str, highlights: Iterable[str] = (), key_terms: bool = True) -> str:
+        if not isinstance(text, str) or not text:
+            return text
+        spans = self.evidence_spans(text, highlights)
+        if key_terms:
+            spans += self.key_term_spans(text)
+        return self.mark(text, self.untagged(text, spans))
+
+    def highlight_dataframe(self, df: pd.DataFrame, text_column: str = "translated_text",
+                            evidence_column: Optional[str] = "llm_evidence", separator: str = "; ",
+                            output_column: str = "highlighted_text") -> pd.DataFrame:
+        """Highlight a whole batch; evidence is stored as one `separator`-joined string per row."""
+        df = df.copy()
+        evidence = df[evidence_column] if evidence_column else pd.Series("", index=df.index)
+        df[output_column] = [
+            self.highlight(text, ev.split(separator) if isinstance(ev, str) else [])
+            for text, ev in zip(df[text_column], evidence)
+        ]
+        return df
+
+# ========= Highlight Helpers ==========
+@lru_cache(maxsize=32)
+def get_highlighter(terms: Tuple[str, ...] = tuple(KEY_TERMS)) -> Highlighter:
+    """Shared highlighter per term list, so repeated calls do not recompile the pattern."""
+    return Highlighter(key_terms=terms)
+
+def highlight_translated_text(text: str, highlights: List[str]) -> str:
+    """Insert <highlight> tags around matched highlight sentences in the text."""
+    return get_highlighter(()).highlight(text, highlights, key_terms=False)
+
 def highlight_keywords(text: str, terms: List[str]) -> str:
-    for term in terms:
-        pattern = re.compile(rf"(?<!<highlight>)(\b{re.escape(term)}\b)", re.IGNORECASE)
-        text = pattern.sub(r"<highlight>\1</highlight>", text)
-    return text
+    return get_highlighter(tuple(terms)).highlight(text)
@@ -0,0 +1,160 @@
+import hashlib
+import pickle
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# ========= MinHash / LSH Near-Duplicate Detection ==========
+# Syndicated wire copy that differs only by a byline or a trailing sentence has a high
+# Jaccard similarity over word shingles. MinHash signatures estimate that similarity and
+# LSH banding finds candidate pairs without comparing every article with every other one.
+
+JACCARD_THRESHOLD = 0.8
+NUM_PERM = 128
+SHINGLE_SIZE = 3          # words per shingle
+SEED = 42
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD = re.compile(r"\w+")
+
+def _shingle_hashes(text: str, k: int) -> np.ndarray:
+    words = _WORD.findall(str(text).lower())
+    if len(words) < k:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingles),
+        dtype=np.uint64, count=len(shingles)
+    )
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """(bands, rows) with bands * rows == num_perm whose LSH S-curve crosses 50% closest to `threshold`."""
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        crossover = (1 / bands) ** (1 / rows)
+        if best is None or abs(crossover - threshold) < best[0]:
+            best = (abs(crossover - threshold), bands, rows)
+    return best[1], best[2]
+
+class NearDuplicateIndex:
+    """
+    Incremental MinHash + LSH index. `add` returns the key of the cluster representative:
+    the first article added to the cluster, or the new key itself if it has no near duplicate.
+    """
+
+    def __init__(self, threshold: float = JACCARD_THRESHOLD, num_perm: int = NUM_PERM,
+                 shingle_size: int = SHINGLE_SIZE, seed: int = SEED):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+
+        rng = np.random.default_rng(seed)
+        # a, b < 2^32 and shingle hashes < 2^32 keep a * h + b inside uint64
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self.signatures: Dict[object, np.ndarray] = {}
+        self.clusters: Dict[object, object] = {}      # key -> representative key
+        self._buckets = [defaultdict(list) for _ in range(self.bands)]
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = _shingle_hashes(text, self.shingle_size)
+        if hashes.size == 0:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        permuted = ((hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME) & _MAX_HASH
+        return permuted.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def query(self, text: str = None, signature: np.ndarray = None) -> List[Tuple[object, float]]:
+        """Indexed keys whose estimated Jaccard similarity with the text is at least the threshold."""
+        signature = self.signature(text) if signature is None else signature
+        candidates = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        matches = []
+        for key in candidates:
+            similarity = float(np.mean(self.signatures[key] == signature))
+            if similarity >= self.threshold:
+                matches.append((key, similarity))
+        return sorted(matches, key=lambda m: -m[1])
+
+    def add(self, key, text: str):
+        if key in self.clusters:
+            return self.clusters[key]
+        signature = self.signature(text)
+        matches = self.query(signature=signature)
+        representative = self.clusters[matches[0][0]] if matches else key
+
+        self.signatures[key] = signature
+        self.clusters[key] = representative
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self._buckets[band][band_key].append(key)
+        return representative
+
+    def members(self) -> Dict[object, List[object]]:
+        groups = defaultdict(list)
+        for key, representative in self.clusters.items():
+            groups[representative].append(key)
+        return dict(groups)
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(path: str) -> "NearDuplicateIndex":
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+# ========= DataFrame Helpers ==========
+
+def mark_near_duplicates(df: pd.DataFrame, text_column: str = "combined_text", key_column: str = "uri",
+                         by: Optional[str] = "country", threshold: float = JACCARD_THRESHOLD,
+                         indexes: Optional[Dict[object, NearDuplicateIndex]] = None) -> pd.DataFrame:
+    """
+    Add `near_dup_of` (the representative's key) and `is_representative` columns.
+    One index is kept per value of `by` (e.g. per country); pass `indexes` to keep
+    building on indexes from earlier batches.
+    """
+    df = df.copy()
+    indexes = {} if indexes is None else indexes
+    groups = df[by] if by else pd.Series("all", index=df.index)
+
+    representatives = []
+    for group, key, text in zip(groups, df[key_column], df[text_column]):
+        if group not in indexes:
+            indexes[group] = NearDuplicateIndex(threshold=threshold)
+        representatives.append(indexes[group].add(key, text))
+
+    df["near_dup_of"] = representatives
+    # A representative indexed in an earlier batch is not in this frame, so its members stand in for it
+    df["is_representative"] = (df["near_dup_of"] == df[key_column]) | ~df["near_dup_of"].isin(df[key_column])
+    n_dupes = int((~df["is_representative"]).sum())
+    print(f"🧬 Near-duplicates: {n_dupes} of {len(df)} articles map onto an earlier article")
+    return df
+
+def propagate_results(df: pd.DataFrame, columns: List[str], key_column: str = "uri",
+                      cluster_column: str = "near_dup_of") -> pd.DataFrame:
+    """
+    Copy `columns` from each cluster representative to all members of its cluster.
+    Rows whose representative is not in `df` keep their own values.
+    """
+    df = df.copy()
+    representatives = df[df[key_column] == df[cluster_column]].drop_duplicates(subset=[key_column])
+    lookup = representatives.set_index(key_column)[columns]
+    has_representative = df[cluster_column].isin(lookup.index)
+    for col in columns:
+        mapped = df[cluster_column].map(lookup[col])
+        df[col] = mapped.where(has_representative, df[col]) if col in df.columns else mapped
+    return df
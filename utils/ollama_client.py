@@ -0,0 +1,253 @@
+import asyncio
+import atexit
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, List, Optional
+
+import aiohttp
+
+from config import LLM_ENDPOINT
+from utils.telemetry import current_stage, record_event
+
+# ========= Ollama Client Configuration ==========
+DEFAULT_TIMEOUT = 120      # seconds per attempt
+MAX_CONCURRENCY = 8        # requests in flight against Ollama at once
+POOL_SIZE = 16             # keep-alive connections
+MAX_RETRIES = 3            # extra attempts after timeouts, connection errors and 5xx responses
+BACKOFF_BASE = 1.0         # seconds; doubled on every retry, plus jitter
+
+class OllamaError(Exception):
+    pass
+
+@dataclass
+class CallMetrics:
+    model: str
+    status: str
+    latency_s: float
+    queue_wait_s: float
+    retries: int
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    server_time_s: Optional[float] = None
+    stopped_early: bool = False
+    stage: str = "default"
+
+# ========= Client ==========
+class OllamaClient:
+    """
+    One asyncio client for every `/api/chat` call in the repo: a keep-alive connection
+    pool, a semaphore bounding concurrent requests, exponential-backoff retries and
+    per-call metrics. Async code awaits `achat`; synchronous code (and worker threads)
+    calls `chat`, which runs the request on the client's own background event loop.
+    """
+
+    def __init__(self, endpoint: str = LLM_ENDPOINT, max_concurrency: int = MAX_CONCURRENCY,
+                 pool_size: int = POOL_SIZE, max_retries: int = MAX_RETRIES,
+                 backoff_base: float = BACKOFF_BASE):
+        self.endpoint = endpoint
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.metrics: List[CallMetrics] = []
+        self._metrics_lock = threading.Lock()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+
+    # ----- async API -----
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def achat(self, model: str, messages: List[dict], timeout: float = DEFAULT_TIMEOUT,
+                    options: Optional[dict] = None, stop_when: Optional[Callable[[], Callable[[str], bool]]] = None,
+                    **payload) -> dict:
+        """
+        POST to /api/chat and return the decoded JSON response. With `stop_when`, the reply is
+        streamed: `stop_when()` makes a fresh stop condition for each attempt, which is fed every
+        streamed chunk, and the connection is dropped as soon as it returns True. That makes
+        Ollama stop generating; the returned dict then has `"stopped_early": True`.
+        """
+        session = await self._get_session()
+        body = {"model": model, "messages": messages, "stream": stop_when is not None, **payload}
+        if options:
+            body["options"] = options
+
+        queued = time.perf_counter()
+        async with self._semaphore:
+            started = time.perf_counter()
+            queue_wait = started - queued
+            retries = 0
+            while True:
+                try:
+                    async with session.post(self.endpoint, json=body,
+                                            timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                        if response.status >= 500:
+                            raise OllamaError(f"Server error {response.status}: {(await response.text())[:200]}")
+                        if response.status >= 400:
+                            text = await response.text()
+                            self._record(model, "error", started, queue_wait, retries)
+                            raise aiohttp.ClientResponseError(
+                                response.request_info, response.history,
+                                status=response.status, message=text[:200]
+                            )
+                        if stop_when is None:
+                            result = await response.json(content_type=None)
+                        else:
+                            result = await self._read_stream(response, stop_when)
+                    self._record(model, "ok", started, queue_wait, retries, result)
+                    return result
+                except (asyncio.TimeoutError, aiohttp.ClientConnectionError, OllamaError) as e:
+                    if retries >= self.max_retries:
+                        self._record(model, "error", started, queue_wait, retries)
+                        raise OllamaError(f"Giving up after {retries + 1} attempts: {e!r}") from e
+                    delay = self.backoff_base * (2 ** retries) * (1 + random.random() * 0.25)
+                    print(f"⚠️ Ollama call failed ({e!r}); retrying in {delay:.1f}s")
+                    retries += 1
+                    await asyncio.sleep(delay)
+
+    @staticmethod
+    async def _read_stream(response: aiohttp.ClientResponse, stop_when: Callable[[], Callable[[str], bool]]) -> dict:
+        """Consume Ollama's NDJSON stream until it is done or the stop condition is satisfied."""
+        is_complete = stop_when()
+        parts = []
+        last = {}
+        async for line in response.content:
+            line = line.strip()
+            if not line:
+                continue
+            last = json.loads(line)
+            if last.get("error"):
+                raise OllamaError(f"Stream error: {last['error']}")
+            chunk = last.get("message", {}).get("content", "")
+            parts.append(chunk)
+            if last.get("done"):
+                break
+            if is_complete(chunk):
+                response.close()  # drop the connection so the server stops decoding
+                return {"message": {"role": "assistant", "content": "".join(parts)},
+                        "done": False, "stopped_early": True,
+                        "eval_count": None}  # the server never sends its count; messages are not tokens
+        result = dict(last)
+        result["message"] = {"role": "assistant", "content": "".join(parts)}
+        result["stopped_early"] = False
+        return result
+
+    async def aclose(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    # ----- sync facade -----
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever, daemon=True,
+                                                     name="ollama-client-loop")
+                self._loop_thread.start()
+            return self._loop
+
+    def chat(self, model: str, messages: List[dict], timeout: float = DEFAULT_TIMEOUT,
+             options: Optional[dict] = None, stop_when: Optional[Callable[[], Callable[[str], bool]]] = None,
+             **payload) -> dict:
+        """Blocking version of `achat`; safe to call from many threads at once."""
+        future = asyncio.run_coroutine_threadsafe(
+            self.achat(model, messages, timeout=timeout, options=options, stop_when=stop_when, **payload),
+            self._ensure_loop()
+        )
+        return future.result()
+
+    def chat_content(self, model: str, messages: List[dict], **kwargs) -> str:
+        """Return only the stripped `message.content` of a chat response."""
+        result = self.chat(model, messages, **kwargs)
+        return result.get("message", {}).get("content", "").strip()
+
+    def close(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self.aclose(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+
+    # ----- metrics -----
+    def _record(self, model: str, status: str, started: float, queue_wait: float, retries: int,
+                result: Optional[dict] = None):
+        result = result or {}
+        total_duration = result.get("total_duration")
+        metric = CallMetrics(
+            model=model,
+            status=status,
+            latency_s=time.perf_counter() - started,
+            queue_wait_s=queue_wait,
+            retries=retries,
+            prompt_tokens=result.get("prompt_eval_count"),
+            completion_tokens=result.get("eval_count"),
+            server_time_s=total_duration / 1e9 if total_duration else None,
+            stopped_early=bool(result.get("stopped_early")),
+            stage=current_stage()
+        )
+        with self._metrics_lock:
+            self.metrics.append(metric)
+        record_event("llm_call", **asdict(metric))
+
+    def metrics_summary(self) -> dict:
+        with self._metrics_lock:
+            metrics = list(self.metrics)
+        ok = [m for m in metrics if m.status == "ok"]
+        latencies = sorted(m.latency_s for m in ok)
+        completion_tokens = sum(m.completion_tokens or 0 for m in ok)
+        total_latency = sum(latencies)
+        return {
+            "calls": len(metrics),
+            "errors": len(metrics) - len(ok),
+            "retries": sum(m.retries for m in metrics),
+            "mean_latency_s": total_latency / len(ok) if ok else None,
+            "p95_latency_s": latencies[int(0.95 * (len(latencies) - 1))] if latencies else None,
+            "prompt_tokens": sum(m.prompt_tokens or 0 for m in ok),
+            "completion_tokens": completion_tokens,
+        }
+
+    def report(self):
+        s = self.metrics_summary()
+        if not s["calls"]:
+            return
+        print(f"📡 Ollama: {s['calls']} calls ({s['errors']} errors, {s['retries']} retries), "
+              f"mean latency {s['mean_latency_s'] or 0:.2f}s, p95 {s['p95_latency_s'] or 0:.2f}s, "
+              f"{s['prompt_tokens']} prompt / {s['completion_tokens']} completion tokens")
+
+    def metrics_as_dicts(self) -> List[dict]:
+        with self._metrics_lock:
+            return [asdict(m) for m in self.metrics]
+
+# ========= Shared Instance ==========
+_default_client = None
+_default_lock = threading.Lock()
+
+def get_client() -> OllamaClient:
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = OllamaClient()
+            atexit.register(_default_client.close)
+        return _default_client
+
+def configure_client(**settings) -> OllamaClient:
+    """
+    Replace the shared client, e.g. `configure_client(endpoint=...)` to send every pipeline call
+    to another Ollama server; `settings` are OllamaClient arguments.
+    """
+    global _default_client
+    with _default_lock:
+        if _default_client is not None:
+            _default_client.close()
+        _default_client = OllamaClient(**settings)
+        atexit.register(_default_client.close)
+        return _default_client
@@ -0,0 +1,102 @@
+import hashlib
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+# ========= Frame Prompt Registry ==========
+# All frame prompts are read and validated once. Each prompt is versioned by the sha256 of
+# its content, and the registry as a whole by a hash over the frame names and prompt hashes,
+# so every annotated row can record exactly which instructions produced it.
+
+PROMPT_DIR = "prompts"
+VERSION_LENGTH = 12
+_PROMPT_FILE = re.compile(r"^frame_(\d+)_([\w-]+)\.txt$")
+
+class PromptError(ValueError):
+    pass
+
+def content_hash(text: str, length: int = VERSION_LENGTH) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:length]
+
+def frame_slug(frame_name: str) -> str:
+    return frame_name.lower().replace(" ", "_").replace("-", "")
+
+@dataclass(frozen=True)
+class FramePrompt:
+    index: int
+    name: str
+    path: str
+    text: str
+    sha256: str
+
+class PromptRegistry:
+    def __init__(self, frame_names: Sequence[str], prompt_dir: str = PROMPT_DIR):
+        self.prompt_dir = prompt_dir
+        self.frame_names = list(frame_names)
+        self.prompts: Dict[int, FramePrompt] = self._load()
+        fingerprint = "\n".join(f"{p.index}:{p.name}:{p.sha256}" for p in self.prompts.values())
+        self.version = content_hash(fingerprint)
+
+    def _load(self) -> Dict[int, FramePrompt]:
+        if not os.path.isdir(self.prompt_dir):
+            raise PromptError(f"❌ Prompt directory not found: {self.prompt_dir}")
+
+        files = {}
+        for filename in sorted(os.listdir(self.prompt_dir)):
+            match = _PROMPT_FILE.match(filename)
+            if match:
+                files.setdefault(int(match.group(1)), []).append(filename)
+
+        prompts = {}
+        for index, frame_name in enumerate(self.frame_names, 1):
+            expected = f"frame_{index}_{frame_slug(frame_name)}.txt"
+            candidates = files.pop(index, [])
+            if expected not in candidates:
+                raise PromptError(f"❌ Missing prompt for frame {index} ({frame_name}): expected {expected}, "
+                                  f"found {candidates or 'nothing'}")
+            if len(candidates) > 1:
+                raise PromptError(f"❌ Several prompt files for frame {index}: {candidates}")
+
+            path = os.path.join(self.prompt_dir, expected)
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read().strip()
+            if not text:
+                raise PromptError(f"❌ Prompt file is empty: {path}")
+            prompts[index] = FramePrompt(index, frame_name, path, text, hashlib.sha256(text.encode("utf-8")).hexdigest())
+
+        if files:
+            print(f"⚠️ Ignoring prompt files for unknown frames: {sorted(f for names in files.values() for f in names)}")
+        return prompts
+
+    def frame(self, index: int) -> FramePrompt:
+        return self.prompts[index]
+
+    def frame_version(self, index: int) -> str:
+        return self.prompts[index].sha256[:VERSION_LENGTH]
+
+    def report(self):
+        print(f"🗂️ Loaded {len(self.prompts)} frame prompts from {self.prompt_dir} (version {self.version})")
+
+# ========= Chat Messages ==========
+def build_messages(system_prompt: str, article_text: str) -> List[dict]:
+    """
+    Static instructions go first as the system message and the article last, so every request
+    shares the same prefix and Ollama can reuse its cached KV state for the instructions.
+    """
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": f"Article:\n{article_text}"},
+    ]
+
+# ========= Shared Instance ==========
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_registry(frame_names: Sequence[str], prompt_dir: str = PROMPT_DIR) -> PromptRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None or _registry.frame_names != list(frame_names) or _registry.prompt_dir != prompt_dir:
+            _registry = PromptRegistry(frame_names, prompt_dir)
+        return _registry
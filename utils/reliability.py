@@ -0,0 +1,263 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# ========= Vectorized Intercoder Reliability ==========
+# All annotations of one ICR round are encoded once into a coder x URI x frame integer tensor
+# (-1 = not coded). Krippendorff's alpha (nominal) is computed from coincidence matrices, and
+# pairwise alpha, Cohen's kappa and % agreement from coder-pair contingency tables, for every
+# frame and every coder pair in a few einsum calls instead of one pivot + alpha call per pair.
+#
+# Usage:
+#     python -m utils.reliability SESSION_FOLDER ... [--llm annotated.csv] [--reference Yara] [--bootstrap 1000]
+
+FRAME_LABELS = [
+    "Foreign influence threat_present",
+    "Systemic institutional corruption_present",
+    "Elite collusion_present",
+    "Politicized investigations_present",
+    "Authoritarian reformism_present",
+    "Judicial and institutional accountability failures_present",
+    "Mobilizing anti-corruption_present"
+]
+LABEL_CODES = {"Not Present": 0, "Present": 1}
+MISSING = -1
+
+# ========= Loading ==========
+def load_session_annotations(session_folder: str, allowed_annotators: Optional[Sequence[str]] = None,
+                             min_articles: int = 0) -> pd.DataFrame:
+    """
+    One row per (coder, article) from the `<coder>_session.json` files of the annotation tool.
+    Coders outside `allowed_annotators` or with fewer than `min_articles` URIs are dropped.
+    """
+    data = []
+    session_folder = os.path.expanduser(session_folder)
+    for filename in sorted(os.listdir(session_folder)):
+        if filename.endswith("_session.json"):
+            with open(os.path.join(session_folder, filename), "r", encoding="utf-8") as f:
+                for ann in json.load(f).get("annotations", []):
+                    ann["user_id"] = filename.replace("_session.json", "")
+                    data.append(ann)
+    df = pd.DataFrame(data)
+    if df.empty:
+        return df
+    if allowed_annotators is not None:
+        df = df[df["user_id"].isin(allowed_annotators)]
+    counts = df.groupby("user_id")["uri"].nunique()
+    return df[df["user_id"].isin(counts[counts >= min_articles].index)]
+
+def llm_annotations(df: pd.DataFrame, coder: str = "LLM", version_column: Optional[str] = "prompt_version") -> pd.DataFrame:
+    """
+    Turn `09_run_seven_frames.py` output (`frame_<i>_name`) into session-style annotations, so the
+    LLM can be added as a coder. With a `prompt_version` column, each version becomes its own coder.
+    """
+    out = pd.DataFrame({"uri": df["uri"]})
+    for i, label in enumerate(FRAME_LABELS, 1):
+        names = df[f"frame_{i}_name"]
+        present = names.notna() & ~names.astype(str).str.strip().isin(["", "None", "nan"])
+        out[label] = np.where(present, "Present", "Not Present")
+    if version_column and version_column in df.columns:
+        out["user_id"] = coder + "@" + df[version_column].astype(str)
+    else:
+        out["user_id"] = coder
+    return out
+
+# ========= Tensor ==========
+@dataclass
+class ReliabilityData:
+    tensor: np.ndarray        # int8, coders x uris x frames, MISSING where not coded
+    coders: List[str]
+    uris: List[str]
+    frames: List[str]
+    n_categories: int = 2
+
+    def one_hot(self) -> np.ndarray:
+        """Boolean coders x uris x frames x categories; all False where not coded."""
+        return self.tensor[..., None] == np.arange(self.n_categories)
+
+def build_tensor(annotations: pd.DataFrame, frame_labels: Sequence[str] = FRAME_LABELS,
+                 coder_column: str = "user_id", uri_column: str = "uri") -> ReliabilityData:
+    coder_codes, coders = pd.factorize(annotations[coder_column], sort=True)
+    uri_codes, uris = pd.factorize(annotations[uri_column], sort=True)
+    values = np.stack([annotations[label].map(LABEL_CODES).fillna(MISSING).to_numpy(dtype=np.int8)
+                       for label in frame_labels], axis=1)
+    tensor = np.full((len(coders), len(uris), len(frame_labels)), MISSING, dtype=np.int8)
+    tensor[coder_codes, uri_codes] = values  # a coder's later annotation of the same URI wins
+    return ReliabilityData(tensor, list(coders), list(uris), list(frame_labels), n_categories=len(LABEL_CODES))
+
+# ========= Coincidence Matrices ==========
+def unit_coincidences(data: ReliabilityData) -> np.ndarray:
+    """Per-unit coincidence contributions, uris x frames x k x k (zero for units with < 2 codes)."""
+    counts = data.one_hot().sum(axis=0, dtype=np.float64)          # uris x frames x k
+    pairable = counts.sum(axis=-1)
+    weight = np.divide(1.0, pairable - 1, out=np.zeros_like(pairable), where=pairable >= 2)
+    products = np.einsum("ufk,ufl->ufkl", counts, counts)
+    products -= counts[..., None] * np.eye(data.n_categories)      # n_uk * (n_ul - delta_kl)
+    return products * weight[..., None, None]
+
+def alpha_from_coincidences(coincidences: np.ndarray) -> np.ndarray:
+    """Nominal Krippendorff's alpha for a stack of k x k coincidence matrices (leading axes kept)."""
+    n_k = coincidences.sum(axis=-1)
+    n = n_k.sum(axis=-1)
+    observed = n - np.trace(coincidences, axis1=-2, axis2=-1)
+    expected = (n ** 2 - (n_k ** 2).sum(axis=-1)) / np.where(n > 1, n - 1, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        alpha = 1 - observed / expected
+    # A single category used throughout: perfect agreement by convention (as in the notebook)
+    alpha = np.where((expected == 0) & (n > 1), 1.0, alpha)
+    return np.where(n > 1, alpha, np.nan)
+
+def overall_alpha(data: ReliabilityData, complete_only: bool = False) -> np.ndarray:
+    """Alpha per frame over all pairable units, or only units coded by every coder."""
+    coincidences = unit_coincidences(data)
+    if complete_only:
+        complete = (data.tensor != MISSING).all(axis=0)            # uris x frames
+        coincidences = coincidences * complete[..., None, None]
+    return alpha_from_coincidences(coincidences.sum(axis=0))
+
+def pairwise_tables(data: ReliabilityData) -> np.ndarray:
+    """Contingency tables for every coder pair: coders x coders x frames x k x k."""
+    x = data.one_hot().astype(np.float64)
+    return np.einsum("aufk,bufl->abfkl", x, x, optimize=True)
+
+def pairwise_statistics(data: ReliabilityData) -> pd.DataFrame:
+    """% agreement, Cohen's kappa and alpha for every coder pair and frame."""
+    tables = pairwise_tables(data)
+    n = tables.sum(axis=(-2, -1))
+    agree = np.trace(tables, axis1=-2, axis2=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_observed = agree / n
+        p_expected = (tables.sum(axis=-1) * tables.sum(axis=-2)).sum(axis=-1) / n ** 2
+        kappa = np.where(p_expected < 1, (p_observed - p_expected) / (1 - p_expected), 1.0)
+    alpha = alpha_from_coincidences(tables + np.swapaxes(tables, -2, -1))
+
+    a, b = np.triu_indices(len(data.coders), k=1)
+    rows = []
+    for f, frame in enumerate(data.frames):
+        for i, j in zip(a, b):
+            rows.append({
+                "frame": frame,
+                "coder_a": data.coders[i],
+                "coder_b": data.coders[j],
+                "n_items": int(n[i, j, f]),
+                "% agreement": round(100 * p_observed[i, j, f], 2) if n[i, j, f] else np.nan,
+                "cohen_kappa": kappa[i, j, f] if n[i, j, f] else np.nan,
+                "alpha": alpha[i, j, f],
+            })
+    return pd.DataFrame(rows)
+
+def frame_reliability(data: ReliabilityData, complete_only: bool = False) -> pd.DataFrame:
+    """Per-frame summary in the shape of the notebook's results table."""
+    pairs = pairwise_statistics(data)
+    coded = data.tensor != MISSING
+    complete = coded.all(axis=0)
+    disagree = (data.tensor.max(axis=0) != np.where(coded, data.tensor, np.iinfo(np.int8).max).min(axis=0)) & complete
+    alphas = overall_alpha(data, complete_only)
+    rows = []
+    for f, frame in enumerate(data.frames):
+        frame_pairs = pairs[(pairs["frame"] == frame) & (pairs["n_items"] > 0)]
+        rows.append({
+            "frame": frame,
+            "overall_alpha": alphas[f],
+            "avg_pairwise_alpha": frame_pairs["alpha"].mean(),
+            "avg_cohen_kappa": frame_pairs["cohen_kappa"].mean(),
+            "avg_%_agreement": frame_pairs["% agreement"].mean(),
+            "num_disagreements": int(disagree[:, f].sum()),
+            "num_agreements": int((complete[:, f] & ~disagree[:, f]).sum()),
+            "num_articles_coded_by_all": int(complete[:, f].sum()),
+        })
+    return pd.DataFrame(rows)
+
+def agreement_with(data: ReliabilityData, reference: str) -> pd.DataFrame:
+    """Pairwise statistics of every coder against `reference` (e.g. the lead coder or the LLM)."""
+    pairs = pairwise_statistics(data)
+    pairs = pairs[(pairs["coder_a"] == reference) | (pairs["coder_b"] == reference)].copy()
+    pairs["annotator"] = np.where(pairs["coder_a"] == reference, pairs["coder_b"], pairs["coder_a"])
+    return pairs.drop(columns=["coder_a", "coder_b"])[["frame", "annotator", "n_items", "% agreement",
+                                                        "cohen_kappa", "alpha"]]
+
+# ========= Bootstrap Confidence Intervals ==========
+def _bootstrap_chunk(flat_coincidences: np.ndarray, shape: tuple, n_boot: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    n_units = flat_coincidences.shape[0]
+    counts = rng.multinomial(n_units, np.full(n_units, 1 / n_units), size=n_boot)   # resampled URIs
+    return alpha_from_coincidences((counts @ flat_coincidences).reshape((n_boot,) + shape))
+
+def bootstrap_alpha(data: ReliabilityData, n_boot: int = 1000, ci: float = 0.95, seed: int = 42,
+                    workers: Optional[int] = None, chunk_size: int = 250) -> pd.DataFrame:
+    """
+    Percentile bootstrap CI for the overall alpha per frame, resampling URIs with replacement.
+    Replicates are split into chunks computed on a process pool (`workers=1` runs inline).
+    """
+    per_unit = unit_coincidences(data)
+    shape = per_unit.shape[1:]
+    flat = per_unit.reshape(per_unit.shape[0], -1)
+    chunks = [min(chunk_size, n_boot - start) for start in range(0, n_boot, chunk_size)]
+    seeds = np.random.SeedSequence(seed).generate_state(len(chunks))
+
+    if workers == 1:
+        results = [_bootstrap_chunk(flat, shape, n, s) for n, s in zip(chunks, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_bootstrap_chunk, [flat] * len(chunks), [shape] * len(chunks),
+                                        chunks, [int(s) for s in seeds]))
+    alphas = np.concatenate(results)
+    tail = (1 - ci) / 2
+    return pd.DataFrame({
+        "frame": data.frames,
+        "overall_alpha": alpha_from_coincidences(per_unit.sum(axis=0)),
+        "ci_low": np.nanquantile(alphas, tail, axis=0),
+        "ci_high": np.nanquantile(alphas, 1 - tail, axis=0),
+        "n_boot": n_boot,
+    })
+
+# ========= Rounds ==========
+def compare_rounds(rounds: Dict[str, pd.DataFrame], n_boot: int = 0, **kwargs) -> pd.DataFrame:
+    """Per-frame reliability for several ICR rounds (or prompt versions), one block per label."""
+    tables = []
+    for label, annotations in rounds.items():
+        data = build_tensor(annotations)
+        table = frame_reliability(data, **kwargs)
+        if n_boot:
+            table = table.merge(bootstrap_alpha(data, n_boot)[["frame", "ci_low", "ci_high"]], on="frame")
+        table.insert(0, "round", label)
+        tables.append(table)
+    return pd.concat(tables, ignore_index=True)
+
+# ========= CLI ==========
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Intercoder reliability for one or more ICR session folders.")
+    parser.add_argument("session_folders", nargs="+", help="folders with <coder>_session.json files")
+    parser.add_argument("--annotators", nargs="*", help="only these coders (default: all)")
+    parser.add_argument("--min-articles", type=int, default=15)
+    parser.add_argument("--llm", nargs="*", default=[], help="09_run_seven_frames.py output CSVs to add as coder(s)")
+    parser.add_argument("--reference", help="also report agreement of every coder with this coder")
+    parser.add_argument("--bootstrap", type=int, default=0, help="number of bootstrap replicates for alpha CIs")
+    parser.add_argument("--complete-only", action="store_true", help="overall alpha on URIs coded by every coder")
+    parser.add_argument("--output", help="optional CSV path for the per-frame table")
+    args = parser.parse_args()
+
+    llm = pd.concat([llm_annotations(pd.read_csv(os.path.expanduser(p))) for p in args.llm]) if args.llm else None
+    rounds = {}
+    for folder in args.session_folders:
+        annotations = load_session_annotations(folder, args.annotators, args.min_articles)
+        if llm is not None:
+            annotations = pd.concat([annotations, llm[llm["uri"].isin(annotations["uri"])]], ignore_index=True)
+        rounds[os.path.basename(os.path.normpath(folder))] = annotations
+        print(f"✅ {folder}: coders {sorted(annotations['user_id'].unique())}")
+
+    summary = compare_rounds(rounds, n_boot=args.bootstrap, complete_only=args.complete_only)
+    print(summary.to_string(index=False))
+    if args.reference:
+        for label, annotations in rounds.items():
+            print(f"\n=== Agreement with {args.reference} ({label}) ===")
+            print(agreement_with(build_tensor(annotations), args.reference).to_string(index=False))
+    if args.output:
+        summary.to_csv(args.output, index=False)
+        print(f"\n✅ Results saved to {args.output}")
@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Set, Union
+
+import numpy as np
+import pandas as pd
+
+from config import SAMPLE_LEDGER_PATH
+
+# ========= Sample Ledger ==========
+# Records, per article `uri`, which draw and round it was sampled into and which coder got it.
+# New draws exclude earlier ones with a set lookup per uri, instead of comparing translated
+# texts against every earlier sample CSV, and are reproducible from their seed: the pool is
+# ordered by uri before sampling, so the result does not depend on the row order of the input.
+
+class SampleLedger:
+    def __init__(self, path: str = SAMPLE_LEDGER_PATH):
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS draws (
+                   uri TEXT NOT NULL,
+                   draw TEXT NOT NULL,
+                   round TEXT NOT NULL,
+                   coder TEXT NOT NULL DEFAULT '',
+                   country TEXT,
+                   seed INTEGER,
+                   drawn_at REAL NOT NULL,
+                   PRIMARY KEY (uri, draw, coder)
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_draws_draw ON draws(draw)")
+        self._conn.commit()
+
+    # ----- reading -----
+    def used_uris(self, rounds: Optional[Iterable[str]] = None) -> Set[str]:
+        """Every uri already drawn (optionally only in `rounds`)."""
+        query, params = "SELECT DISTINCT uri FROM draws", ()
+        if rounds is not None:
+            rounds = list(rounds)
+            query += f" WHERE round IN ({','.join('?' * len(rounds))})"
+            params = tuple(rounds)
+        with self._lock:
+            return {row[0] for row in self._conn.execute(query, params)}
+
+    def members(self, draw: str) -> pd.DataFrame:
+        with self._lock:
+            return pd.read_sql_query("SELECT * FROM draws WHERE draw = ? ORDER BY rowid", self._conn, params=(draw,))
+
+    def summary(self) -> pd.DataFrame:
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT round, draw, coder, country, COUNT(*) AS articles, MIN(seed) AS seed "
+                "FROM draws GROUP BY round, draw, coder, country ORDER BY MIN(drawn_at)", self._conn)
+
+    # ----- writing -----
+    def record(self, df: pd.DataFrame, draw: str, round: str, seed: Optional[int] = None,
+               coder: Union[str, Dict[str, str], None] = None, country_column: str = "country"):
+        """Add the articles of `df` to the ledger; `coder` is one name or a {country: coder} map."""
+        countries = df[country_column] if country_column in df.columns else pd.Series(None, index=df.index)
+        if isinstance(coder, dict):
+            coders = countries.map(coder).fillna("")
+        else:
+            coders = pd.Series(coder or "", index=df.index)
+        now = time.time()
+        rows = [(str(uri), draw, round, c, country, seed, now)
+                for uri, c, country in zip(df["uri"], coders, countries)]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO draws (uri, draw, round, coder, country, seed, drawn_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def import_sample(self, path: str, draw: str, round: str, **kwargs):
+        """Backfill the ledger from an earlier sample CSV (needs a `uri` column)."""
+        self.record(pd.read_csv(os.path.expanduser(path)), draw, round, **kwargs)
+
+    # ----- drawing -----
+    def exclude(self, df: pd.DataFrame, rounds: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        return df[~df["uri"].astype(str).isin(self.used_uris(rounds))]
+
+    def draw(self, df: pd.DataFrame, n: Union[int, Dict[str, int]], draw: str, round: str, seed: int,
+             by: Optional[str] = None, coder: Union[str, Dict[str, str], None] = None,
+             exclude_rounds: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Draw `n` articles (per value of `by` when given; a dict gives per-group sizes) that are not
+        in the ledger yet, and record them. Re-running an existing draw returns its recorded articles.
+        """
+        existing = self.members(draw)
+        if not existing.empty:
+            print(f"🔁 Draw '{draw}' already in the ledger ({len(existing)} articles); returning it.")
+            unique = df.drop_duplicates(subset="uri")
+            keyed = unique.set_index(unique["uri"].astype(str))
+            uris = [uri for uri in existing["uri"].drop_duplicates() if uri in keyed.index]
+            return keyed.loc[uris].reset_index(drop=True)
+
+        pool = self.exclude(df, exclude_rounds)
+        pool = pool.drop_duplicates(subset="uri").sort_values("uri", kind="stable")
+        rng = np.random.default_rng(seed)
+
+        groups = [(None, pool)] if by is None else list(pool.groupby(by, sort=True))
+        sampled = []
+        for group, subset in groups:
+            size = n.get(group, 0) if isinstance(n, dict) else n
+            if len(subset) < size:
+                print(f"⚠️ Not enough articles for {group or 'draw'} (needed {size}, found {len(subset)})")
+                size = len(subset)
+            sampled.append(subset.iloc[np.sort(rng.choice(len(subset), size=size, replace=False))])
+
+        result = pd.concat(sampled).reset_index(drop=True) if sampled else pool.iloc[:0]
+        self.record(result, draw, round, seed=seed, coder=coder)
+        print(f"🎯 Draw '{draw}' ({round}): {len(result)} articles from a pool of {len(pool)}")
+        return result
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def equal_split(n_total: int, groups: Iterable[str]) -> Dict[str, int]:
+    """`n_total` spread evenly over `groups`, the remainder going to the first groups (as in ICR 2)."""
+    groups = list(groups)
+    base, extra = divmod(n_total, len(groups))
+    return {g: base + (1 if i < extra else 0) for i, g in enumerate(groups)}
@@ -0,0 +1,168 @@
+import json
+import threading
+import time
+from collections import Counter
+from typing import Any
+
+from utils.telemetry import record_event
+
+# ========= Structured Output Schemas ==========
+# Passed to Ollama as `format`, which constrains decoding to JSON matching the schema.
+# The same schemas are used to validate the replies, so a reply either parses into the
+# expected fields or is counted as a parse failure; there is no text-scraping fallback.
+
+CONFIDENCE = {"type": "integer", "minimum": 0, "maximum": 100}
+
+FRAME_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "frame": {"type": "string"},
+        "rationale": {"type": "string"},
+        "confidence": CONFIDENCE,
+        "evidence": {"type": "string"},
+    },
+    "required": ["frame", "rationale", "confidence", "evidence"],
+    "additionalProperties": False,
+}
+
+MULTI_FRAME_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "frames": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"frame_index": {"type": "integer", "minimum": 1}, **FRAME_SCHEMA["properties"]},
+                "required": ["frame_index"] + FRAME_SCHEMA["required"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["frames"],
+    "additionalProperties": False,
+}
+
+CLASSIFIER_LABELS = ["Yes", "Mentioned but not central", "No", "Unsure"]
+
+CLASSIFIER_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "highlights": {"type": "array", "items": {"type": "string"}},
+        "label": {"type": "string", "enum": CLASSIFIER_LABELS},
+        "rationale": {"type": "string"},
+        "confidence": CONFIDENCE,
+    },
+    "required": ["highlights", "label", "rationale", "confidence"],
+    "additionalProperties": False,
+}
+
+class StructuredOutputError(ValueError):
+    pass
+
+# ========= Strict Validation ==========
+_TYPES = {"object": dict, "array": list, "string": str, "boolean": bool}
+
+def validate(value: Any, schema: dict, path: str = "$") -> Any:
+    """
+    Check `value` against the JSON-schema subset used above and return it; integral floats
+    are converted to int. Raises StructuredOutputError naming the offending path.
+    """
+    expected = schema.get("type")
+    if expected in ("integer", "number"):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise StructuredOutputError(f"{path}: expected {expected}, got {type(value).__name__}")
+        if expected == "integer":
+            if isinstance(value, float) and not value.is_integer():
+                raise StructuredOutputError(f"{path}: expected integer, got {value}")
+            value = int(value)
+        if "minimum" in schema and value < schema["minimum"]:
+            raise StructuredOutputError(f"{path}: {value} is below {schema['minimum']}")
+        if "maximum" in schema and value > schema["maximum"]:
+            raise StructuredOutputError(f"{path}: {value} is above {schema['maximum']}")
+    elif expected in _TYPES and not isinstance(value, _TYPES[expected]):
+        raise StructuredOutputError(f"{path}: expected {expected}, got {type(value).__name__}")
+
+    if "enum" in schema and value not in schema["enum"]:
+        raise StructuredOutputError(f"{path}: {value!r} is not one of {schema['enum']}")
+
+    if expected == "object":
+        properties = schema.get("properties", {})
+        missing = [key for key in schema.get("required", []) if key not in value]
+        if missing:
+            raise StructuredOutputError(f"{path}: missing {missing}")
+        extra = [key for key in value if key not in properties]
+        if extra and schema.get("additionalProperties") is False:
+            raise StructuredOutputError(f"{path}: unexpected {extra}")
+        value = {key: validate(item, properties[key], f"{path}.{key}") if key in properties else item
+                 for key, item in value.items()}
+    elif expected == "array" and "items" in schema:
+        value = [validate(item, schema["items"], f"{path}[{i}]") for i, item in enumerate(value)]
+    return value
+
+# ========= Parsing With Failure Counts ==========
+_failures = Counter()
+_parsed = Counter()
+_lock = threading.Lock()
+
+def parse_structured(content: str, schema: dict, name: str) -> Any:
+    """Decode and validate one structured reply; failures are counted under `name` and re-raised."""
+    started = time.perf_counter()
+    try:
+        value = validate(json.loads(content), schema)
+    except (json.JSONDecodeError, StructuredOutputError) as e:
+        with _lock:
+            _failures[name] += 1
+        record_event("parse", parser=name, ok=False, duration_s=time.perf_counter() - started)
+        raise StructuredOutputError(f"Invalid {name} output: {e}") from e
+    with _lock:
+        _parsed[name] += 1
+    record_event("parse", parser=name, ok=True, duration_s=time.perf_counter() - started)
+    return value
+
+def parse_failures() -> dict:
+    with _lock:
+        return dict(_failures)
+
+def report_parse_failures():
+    with _lock:
+        names = sorted(set(_parsed) | set(_failures))
+        lines = [f"{name}: {_failures[name]} failed / {_parsed[name] + _failures[name]}" for name in names]
+    if lines:
+        print("🧾 Structured output parse failures — " + ", ".join(lines))
+
+# ========= Streaming Stop Condition ==========
+class JsonValueScanner:
+    """
+    Streaming stop condition: feed it the reply chunk by chunk; it returns True once the first
+    top-level JSON object or array has been closed. Brackets inside strings are ignored, and the
+    scan state is kept across chunks, so each character is looked at once. Stops trailing
+    whitespace some models emit after JSON mode output. Use one scanner per reply.
+    """
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+
+    def __call__(self, chunk: str) -> bool:
+        for ch in chunk:
+            if not self.started:
+                if ch not in "[{":
+                    continue
+                self.started = True
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "[{":
+                self.depth += 1
+            elif ch in "]}":
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
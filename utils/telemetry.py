@@ -0,0 +1,186 @@
+import argparse
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import pandas as pd
+
+from config import TELEMETRY_PATH, USE_TELEMETRY
+
+# ========= Structured Telemetry ==========
+# Every LLM call, parse step, I/O step and finished batch of articles is appended as one JSON
+# line to TELEMETRY_PATH, tagged with the current pipeline stage and a per-process run id.
+# Recording is off unless the pipeline runs with USE_TELEMETRY=1 in the environment.
+# `python -m utils.telemetry` summarizes the file per stage and model for capacity planning.
+#
+# Event kinds:
+#   llm_call  model, status, latency_s, queue_wait_s, server_time_s, retries, prompt/completion tokens
+#             (completion tokens are null for replies stopped early)
+#   parse     parser, ok, duration_s
+#   io        op, path, duration_s, rows
+#   articles  count (articles finished by the stage)
+
+RUN_ID = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+class TelemetryWriter:
+    def __init__(self, path: str = TELEMETRY_PATH):
+        self.path = os.path.expanduser(path)
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def write(self, event: dict):
+        line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+# ========= Shared Instance ==========
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_telemetry() -> Optional[TelemetryWriter]:
+    """Return the process-wide writer, or None when telemetry is disabled in config."""
+    global _writer
+    if not USE_TELEMETRY:
+        return None
+    with _writer_lock:
+        if _writer is None:
+            _writer = TelemetryWriter()
+        return _writer
+
+# ========= Stages ==========
+# One pipeline stage runs at a time per process, and LLM calls are recorded on the client's
+# event-loop thread, so the stage is process-wide rather than thread- or context-local.
+_stage = "default"
+
+@contextmanager
+def stage(name: str):
+    global _stage
+    previous, _stage = _stage, name
+    try:
+        yield
+    finally:
+        _stage = previous
+
+def current_stage() -> str:
+    return _stage
+
+# ========= Recording ==========
+def record_event(kind: str, **fields):
+    writer = get_telemetry()
+    if writer is None:
+        return
+    writer.write({"ts": time.time(), "run": RUN_ID, "stage": fields.pop("stage", _stage), "kind": kind, **fields})
+
+@contextmanager
+def timer(kind: str, **fields):
+    """Record `kind` with the block's `duration_s`; the yielded dict can add fields (e.g. `rows`)."""
+    extra = {}
+    started = time.perf_counter()
+    try:
+        yield extra
+    finally:
+        record_event(kind, duration_s=time.perf_counter() - started, **fields, **extra)
+
+def record_articles(count: int, **fields):
+    record_event("articles", count=count, **fields)
+
+# ========= Summary ==========
+def load_events(path: str = TELEMETRY_PATH, run: Optional[str] = None) -> pd.DataFrame:
+    """Read the telemetry file; `run="last"` keeps only the most recent run."""
+    records = []
+    with open(os.path.expanduser(path), "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    events = pd.DataFrame(records)
+    if run and not events.empty:
+        run = events["run"].iloc[-1] if run == "last" else run
+        events = events[events["run"] == run]
+    return events
+
+def _p(series: pd.Series, q: float) -> float:
+    series = series.dropna()
+    return float(series.quantile(q)) if len(series) else float("nan")
+
+def summarize_llm_calls(events: pd.DataFrame) -> pd.DataFrame:
+    calls = events[events["kind"] == "llm_call"]
+    rows = []
+    for (stage_name, model), group in calls.groupby(["stage", "model"]):
+        ok = group[group["status"] == "ok"]
+        # Tokens/s per call on the server's clock, or on the wall clock when it did not report one.
+        # Calls stopped early report no token count and are left out of the rate.
+        counted = ok[ok["completion_tokens"].notna()]
+        seconds = counted["server_time_s"].fillna(counted["latency_s"]) if "server_time_s" in counted else counted["latency_s"]
+        completion = counted["completion_tokens"]
+        rows.append({
+            "stage": stage_name,
+            "model": model,
+            "calls": len(group),
+            "errors": len(group) - len(ok),
+            "retries": int(group["retries"].sum()),
+            "p50_latency_s": _p(ok["latency_s"], 0.5),
+            "p95_latency_s": _p(ok["latency_s"], 0.95),
+            "p95_queue_wait_s": _p(ok["queue_wait_s"], 0.95),
+            "prompt_tokens": int(ok["prompt_tokens"].fillna(0).sum()),
+            "completion_tokens": int(completion.sum()),
+            "tokens_per_s": completion.sum() / seconds.sum() if seconds.sum() > 0 else float("nan"),
+        })
+    return pd.DataFrame(rows)
+
+def summarize_steps(events: pd.DataFrame, kind: str, key: str) -> pd.DataFrame:
+    steps = events[events["kind"] == kind]
+    if steps.empty:
+        return pd.DataFrame()
+    grouped = steps.groupby(["stage", key])["duration_s"]
+    return pd.DataFrame({
+        "count": grouped.size(),
+        "total_s": grouped.sum(),
+        "p50_s": grouped.quantile(0.5),
+        "p95_s": grouped.quantile(0.95),
+    }).reset_index()
+
+def summarize_throughput(events: pd.DataFrame) -> pd.DataFrame:
+    """Articles/hour per stage and run: finished articles over the span of the stage's events."""
+    rows = []
+    for (run, stage_name), group in events.groupby(["run", "stage"]):
+        articles = group.loc[group["kind"] == "articles", "count"].sum() if "count" in group else 0
+        span = group["ts"].max() - group["ts"].min()
+        if articles:
+            rows.append({"run": run, "stage": stage_name, "articles": int(articles), "hours": span / 3600,
+                         "articles_per_hour": articles / span * 3600 if span > 0 else float("nan")})
+    return pd.DataFrame(rows)
+
+def print_summary(path: str = TELEMETRY_PATH, run: Optional[str] = None):
+    events = load_events(path, run)
+    if events.empty:
+        print(f"⚠️ No telemetry events in {path}")
+        return
+    print(f"📒 {len(events)} events from {events['run'].nunique()} run(s) in {path}")
+    with pd.option_context("display.width", 200, "display.max_columns", 20, "display.float_format", "{:.3f}".format):
+        for title, table in [("📡 LLM calls per stage and model", summarize_llm_calls(events)),
+                             ("🧾 Parsing", summarize_steps(events, "parse", "parser")),
+                             ("💾 I/O", summarize_steps(events, "io", "op")),
+                             ("🏁 Throughput", summarize_throughput(events))]:
+            if not table.empty:
+                print(f"\n{title}")
+                print(table.to_string(index=False))
+
+# ========= CLI ==========
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize the pipeline telemetry file.")
+    parser.add_argument("path", nargs="?", default=TELEMETRY_PATH)
+    parser.add_argument("--run", help='only this run id, or "last" for the most recent run')
+    args = parser.parse_args()
+    print_summary(args.path, args.run)
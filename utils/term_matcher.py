@@ -0,0 +1,83 @@
+import re
+from collections import Counter
+from typing import Dict, List
+
+import pandas as pd
+
+from config import COUNTRY_TERMS
+
+# ========= Dictionary Term Matcher ==========
+# Each term list is compiled once into a single alternation, so an article is scanned
+# once per category instead of once per term. Matching follows the attention notebook:
+# case-insensitive substring matches on the lowercased text.
+
+def compile_terms(terms: List[str]) -> re.Pattern:
+    # Longest terms first, so "prime minister" wins over "minister" at the same position
+    alternation = "|".join(re.escape(t.lower()) for t in sorted(set(terms), key=len, reverse=True))
+    return re.compile(alternation)
+
+class TermMatcher:
+    def __init__(self, political_terms: List[str], corruption_terms: List[str]):
+        self.political_terms = [t.lower() for t in political_terms]
+        self.corruption_terms = [t.lower() for t in corruption_terms]
+        self.political_pattern = compile_terms(self.political_terms)
+        self.corruption_pattern = compile_terms(self.corruption_terms)
+        # Zero-width lookahead finds a match at every start position, so nested terms
+        # ("minister" inside "prime minister") are both counted
+        all_terms = self.political_terms + self.corruption_terms
+        self.count_pattern = re.compile(f"(?=({compile_terms(all_terms).pattern}))")
+
+    # ----- single article -----
+    def is_corruption_article(self, text) -> bool:
+        text = str(text).lower()
+        return bool(self.political_pattern.search(text)) and bool(self.corruption_pattern.search(text))
+
+    def term_counts(self, text) -> Counter:
+        return Counter(self.count_pattern.findall(str(text).lower()))
+
+    # ----- batches -----
+    @staticmethod
+    def _normalize(texts: pd.Series) -> pd.Series:
+        return texts.astype(str).str.lower()
+
+    def match_series(self, texts: pd.Series) -> pd.Series:
+        """Boolean Series: article mentions at least one political and one corruption term."""
+        lowered = self._normalize(texts)
+        has_political = lowered.str.contains(self.political_pattern, regex=True)
+        has_corruption = lowered.str.contains(self.corruption_pattern, regex=True)
+        return has_political & has_corruption
+
+    def count_series(self, texts: pd.Series) -> pd.DataFrame:
+        """Per-article hit counts, one column per term (aligned with the index of `texts`)."""
+        hits = self._normalize(texts).str.findall(self.count_pattern).explode().dropna()
+        terms = self.political_terms + self.corruption_terms
+        if hits.empty:
+            return pd.DataFrame(0, index=texts.index, columns=terms)
+        counts = hits.groupby([hits.index, hits.values]).size().unstack(fill_value=0)
+        return counts.reindex(index=texts.index, columns=terms, fill_value=0)
+
+def build_country_matchers(country_terms: Dict[str, Dict[str, List[str]]] = COUNTRY_TERMS) -> Dict[str, TermMatcher]:
+    return {
+        country: TermMatcher(terms["political"], terms["corruption"])
+        for country, terms in country_terms.items()
+    }
+
+def weekly_corruption_counts(df: pd.DataFrame, matcher: TermMatcher,
+                             text_column: str = "body", date_column: str = "dateTime") -> pd.DataFrame:
+    """
+    Weekly number of corruption articles plus per-term hit totals (`hits_<term>`) over those
+    articles. Weeks start on Monday, like `to_period("W").start_time` in the notebook.
+    """
+    dates = pd.to_datetime(df[date_column], errors="coerce")
+    df = df.loc[dates.notna()]
+    dates = dates[dates.notna()]
+    if getattr(dates.dt, "tz", None) is not None:
+        dates = dates.dt.tz_localize(None)
+    week = dates.dt.to_period("W").dt.start_time
+
+    is_corruption = matcher.match_series(df[text_column])
+    hits = matcher.count_series(df.loc[is_corruption, text_column]).add_prefix("hits_")
+    hits["corruption_count"] = 1
+    weekly = hits.groupby(week[is_corruption]).sum()
+    weekly.index.name = "week"
+    return weekly.reset_index()